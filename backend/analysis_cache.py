@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+🍳 Analysis Cache - Content-Addressed Recipe Analysis Cache for Cooking Ethos AI
+
+This module caches finished recipe analyses in two tiers: an in-memory LRU in
+front of an on-disk sqlite store shared by every process. Entries are keyed by
+a hash of the normalized recipe text, the analysis type and the version of the
+knowledge data the analysis was computed from, so re-imports and repeated views
+of the same recipe are served from the cache, while changed ingredient or
+technique data simply stops matching old entries.
+"""
+
+import os
+import json
+import logging
+import asyncio
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional, Any
+
+from result_cache import ResultCache, content_digest
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of analysis results changes, so old entries stop matching
+ANALYSIS_CACHE_SCHEMA = 3
+
+
+def normalize_recipe_text(recipe_text: str) -> str:
+    """Normalize recipe text so formatting-only differences share a cache entry"""
+    text = unicodedata.normalize("NFC", recipe_text).replace("\r\n", "\n").replace("\r", "\n")
+    # Lines are stripped and blank lines skipped by the parser anyway
+    return "\n".join(line.strip() for line in text.split("\n") if line.strip())
+
+
+def knowledge_version(*databases: Dict[str, Any]) -> str:
+    """Fingerprint the knowledge data (ingredient, technique databases) analyses depend on"""
+    return content_digest(json.dumps(databases, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def analysis_key(recipe_text: str, analysis_type: str, version: str) -> str:
+    """Cache key for one analysis of a recipe against one version of the knowledge data"""
+    return content_digest(
+        f"{ANALYSIS_CACHE_SCHEMA}\0{version}\0{analysis_type}\0{normalize_recipe_text(recipe_text)}"
+    )
+
+
+class AnalysisCache:
+    """
+    Two-tier (memory LRU + sqlite) cache of recipe analyses.
+
+    This class handles:
+    - Serving analyses from memory, then from the sqlite store
+    - Storing new analyses in both tiers
+    - Keeping the sqlite store bounded by evicting the oldest entries
+    - Degrading to a miss when the store cannot be read or written
+    """
+
+    def __init__(self, db_path: Optional[str] = "data/analysis_cache.sqlite3", memory_size: int = 1024,
+                 max_disk_entries: int = 200000):
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        # Analyses are kept serialized, so every hit hands out an independent copy
+        self.memory = ResultCache(memory_size)
+        self.disk_hits = 0
+        self._connection = None
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+    async def open(self):
+        """Open (creating if needed) the sqlite store; without a db_path only memory is used"""
+        if self.db_path is None or self._connection is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            self._connection = await loop.run_in_executor(None, self._connect)
+            logger.info(f"✅ Analysis cache store at {self.db_path}")
+        except Exception as e:
+            logger.error(f"❌ Error opening analysis cache store: {str(e)}")
+
+    async def close(self):
+        """Close the sqlite store and drop the memory tier"""
+        self.memory.clear()
+        if self._connection is None:
+            return
+
+        connection, self._connection = self._connection, None
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._locked, connection.close)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the cached analysis for key, or None"""
+        payload = self.memory.get(key)
+        if payload is None and self._connection is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                payload = await loop.run_in_executor(None, self._locked, self._read, key)
+            except Exception as e:
+                logger.warning(f"⚠️ Error reading analysis cache: {str(e)}")
+            if payload is not None:
+                self.disk_hits += 1
+                self.memory.put(key, payload)
+
+        return json.loads(payload) if payload is not None else None
+
+    async def put(self, key: str, analysis: Dict[str, Any]):
+        """Store an analysis under key in both tiers"""
+        try:
+            payload = json.dumps(analysis, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Analysis is not cacheable: {str(e)}")
+            return
+
+        self.memory.put(key, payload)
+        if self._connection is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._locked, self._write, key, payload)
+            except Exception as e:
+                logger.warning(f"⚠️ Error writing analysis cache: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get memory tier statistics and the number of hits served from disk"""
+        return {"memory": self.memory.stats(), "disk_hits": self.disk_hits, "disk": self._connection is not None}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the sqlite store, shared with other processes through WAL mode"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        connection = sqlite3.connect(self.db_path, timeout=10.0, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, analysis TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS analyses_created_at ON analyses (created_at)")
+        connection.commit()
+        return connection
+
+    def _locked(self, function, *args) -> Any:
+        """Run a store operation while holding the connection lock"""
+        with self._lock:
+            return function(*args)
+
+    def _read(self, key: str) -> Optional[str]:
+        """Read a serialized analysis from the store"""
+        row = self._connection.execute("SELECT analysis FROM analyses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _write(self, key: str, payload: str):
+        """Write a serialized analysis to the store, pruning old entries now and then"""
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO analyses (key, analysis, created_at) VALUES (?, ?, ?)",
+                (key, payload, time.time())
+            )
+
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= 1000:
+            self._writes_since_prune = 0
+            self._prune()
+
+    def _prune(self):
+        """Evict the oldest entries beyond max_disk_entries"""
+        count = self._connection.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            with self._connection:
+                self._connection.execute(
+                    "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY created_at LIMIT ?)",
+                    (excess,)
+                )
+            logger.info(f"🧹 Evicted {excess} old analyses from the cache store")
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+🍳 Analyze Corpus - Offline Batch Recipe Analysis for Cooking Ethos AI
+
+Runs every RecipeAnalyzer analysis type over a JSONL or CSV recipe corpus on
+all CPU cores, writing one JSONL line per recipe plus a columnar summary
+(parquet when pyarrow is installed, numpy .npz otherwise). Interrupted runs
+resume from the records already in the output file. With --dedup,
+near-duplicates of earlier recipes are recorded but not analyzed. Run from
+the backend directory:
+
+    python analyze_corpus.py recipes.jsonl --output analyses.jsonl
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+import numpy as np
+
+from recipe_analyzer import RecipeAnalyzer, ANALYSIS_TYPES
+from analysis_cache import AnalysisCache
+from recipe_dedup import RecipeDedupIndex
+from recipe_corpus import read_corpus
+from recipe_parser import RecipeParser
+from result_cache import ResultCache
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Columns of the columnar summary, by type
+TEXT_COLUMNS = ("id", "difficulty", "cuisine_type", "estimated_time", "dietary_info")
+COUNT_COLUMNS = ("ingredients_count", "steps_count", "techniques_count")
+NUTRIENT_COLUMNS = ("calories", "protein", "carbs", "fat", "fiber")
+
+# Per-process analyzer, built once by the pool initializer
+_worker_analyzer = None
+_worker_loop = None
+
+
+def _init_worker():
+    """Build the recipe analyzer for a worker process"""
+    global _worker_analyzer, _worker_loop
+    logging.getLogger().setLevel(logging.WARNING)
+    _worker_loop = asyncio.new_event_loop()
+    # Chunks are analyzed below analyze_recipe, so the shared analysis store is not used
+    _worker_analyzer = RecipeAnalyzer(analysis_cache=AnalysisCache(db_path=None))
+    _worker_loop.run_until_complete(_worker_analyzer.initialize())
+
+
+def _analyze_chunk(chunk: List[Tuple[str, str]]) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """
+    Parse each recipe once and run every analysis type on it
+
+    Returns:
+        Result records and the seconds spent in each stage
+    """
+    results = []
+    stage_seconds = dict.fromkeys(["parse"] + ANALYSIS_TYPES, 0.0)
+
+    for recipe_id, recipe_text in chunk:
+        if not recipe_text.strip():
+            results.append({"id": recipe_id, "error": "recipe_text is required"})
+            continue
+        try:
+            start = time.perf_counter()
+            parsed_recipe = _worker_loop.run_until_complete(_worker_analyzer._parse_recipe(recipe_text))
+            stage_seconds["parse"] += time.perf_counter() - start
+
+            analyses = {}
+            for analysis_type in ANALYSIS_TYPES:
+                start = time.perf_counter()
+                analyses[analysis_type] = _worker_loop.run_until_complete(
+                    _worker_analyzer.analyze_parsed_recipe(parsed_recipe, analysis_type)
+                )
+                stage_seconds[analysis_type] += time.perf_counter() - start
+
+            results.append({"id": recipe_id, "analyses": analyses})
+        except Exception as e:
+            results.append({"id": recipe_id, "error": str(e)})
+
+    return results, stage_seconds
+
+
+def load_completed_ids(output_path: str) -> set:
+    """Collect ids already written to the output, dropping a torn final line"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    good_offset = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                completed.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                break
+            good_offset += len(line)
+
+    # Truncate anything after the last complete record so appends stay valid
+    if good_offset != os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(good_offset)
+
+    return completed
+
+
+def write_columnar(output_path: str, columnar_path: str) -> int:
+    """Write a columnar summary of every analyzed recipe in the JSONL output"""
+    columns = {name: [] for name in TEXT_COLUMNS + COUNT_COLUMNS + NUTRIENT_COLUMNS}
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            analyses = record.get("analyses")
+            if not analyses:
+                continue
+            general = analyses["general"]
+            nutrition = analyses["nutrition"]["estimated_nutrition"]
+
+            columns["id"].append(record["id"])
+            columns["difficulty"].append(general["difficulty"])
+            columns["cuisine_type"].append(general["cuisine_type"])
+            columns["estimated_time"].append(general["estimated_time"])
+            columns["dietary_info"].append(",".join(general["dietary_info"]))
+            columns["ingredients_count"].append(general["ingredients_count"])
+            columns["steps_count"].append(general["steps_count"])
+            columns["techniques_count"].append(len(analyses["techniques"]["techniques"]))
+            for nutrient in NUTRIENT_COLUMNS:
+                columns[nutrient].append(nutrition.get(nutrient, 0))
+
+    arrays = {name: np.asarray(columns[name], dtype=np.str_) for name in TEXT_COLUMNS}
+    arrays.update({name: np.asarray(columns[name], dtype=np.int32) for name in COUNT_COLUMNS})
+    arrays.update({name: np.asarray(columns[name], dtype=np.float64) for name in NUTRIENT_COLUMNS})
+
+    if columnar_path.endswith(".parquet"):
+        pq.write_table(pa.table(arrays), columnar_path)
+    else:
+        np.savez_compressed(columnar_path, **arrays)
+
+    return len(columns["id"])
+
+
+def analyze_corpus(input_path: str, output_path: str, columnar_path: str,
+                   text_field: str = "recipe_text", id_field: str = "id",
+                   workers: Optional[int] = None, chunk_size: int = 64, dedup: bool = False) -> Dict[str, Any]:
+    """
+    Analyze a recipe corpus, resuming from any records already in the output
+
+    With dedup, recipes that near-duplicate an earlier one are written as
+    {"id", "duplicate_of", "similarity"} records instead of being analyzed.
+
+    Returns:
+        Run report with per-stage timings and throughput
+    """
+    workers = workers or os.cpu_count() or 1
+    completed = load_completed_ids(output_path)
+    if completed:
+        logger.info(f"↩️ Resuming: {len(completed)} recipes already analyzed")
+
+    stage_seconds = dict.fromkeys(["read", "dedup", "parse"] + ANALYSIS_TYPES + ["write", "columnar"], 0.0)
+    counts = {"analyzed": 0, "failed": 0, "duplicates": 0, "skipped": len(completed)}
+    run_start = time.perf_counter()
+    dedup_index = RecipeDedupIndex() if dedup else None
+    dedup_parser = RecipeParser(ResultCache())
+    duplicates = []
+
+    def is_duplicate(recipe_id: str, recipe_text: str) -> bool:
+        # Recipes from earlier runs are indexed too, so resumed runs still catch their duplicates
+        start = time.perf_counter()
+        parsed_recipe = dedup_parser.parse(recipe_text)
+        if recipe_id in completed:
+            dedup_index.add(recipe_id, parsed_recipe)
+            duplicate = None
+        else:
+            duplicate = dedup_index.find_or_add(recipe_id, parsed_recipe)
+        stage_seconds["dedup"] += time.perf_counter() - start
+
+        if duplicate is None:
+            return False
+        duplicates.append({"id": recipe_id, "duplicate_of": duplicate[0], "similarity": round(duplicate[1], 3)})
+        return True
+
+    def chunks() -> Iterator[List[Tuple[str, str]]]:
+        chunk = []
+        records = read_corpus(input_path, text_field, id_field)
+        while True:
+            start = time.perf_counter()
+            record = next(records, None)
+            stage_seconds["read"] += time.perf_counter() - start
+            if record is None:
+                break
+            if dedup_index is not None and record[1].strip() and is_duplicate(*record):
+                continue
+            if record[0] in completed:
+                continue
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker
+    )
+    # Keep a couple of chunks queued per worker without reading the whole corpus ahead
+    max_in_flight = workers * 2
+    in_flight = set()
+
+    with executor, open(output_path, "a", encoding="utf-8") as output:
+        pending_chunks = chunks()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                chunk = next(pending_chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    in_flight.add(executor.submit(_analyze_chunk, chunk))
+            if not in_flight and not duplicates:
+                break
+
+            if duplicates:
+                start = time.perf_counter()
+                output.write("".join(json.dumps(duplicate, ensure_ascii=False) + "\n" for duplicate in duplicates))
+                stage_seconds["write"] += time.perf_counter() - start
+                counts["duplicates"] += len(duplicates)
+                duplicates.clear()
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                results, chunk_seconds = future.result()
+                for stage, seconds in chunk_seconds.items():
+                    stage_seconds[stage] += seconds
+
+                start = time.perf_counter()
+                output.write("".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results))
+                output.flush()
+                stage_seconds["write"] += time.perf_counter() - start
+
+                for result in results:
+                    counts["failed" if "error" in result else "analyzed"] += 1
+            logger.info(f"📊 Analyzed {counts['analyzed'] + counts['failed']} recipes")
+
+    start = time.perf_counter()
+    rows = write_columnar(output_path, columnar_path)
+    stage_seconds["columnar"] = time.perf_counter() - start
+    elapsed = time.perf_counter() - run_start
+
+    processed = counts["analyzed"] + counts["failed"]
+    return {
+        **counts,
+        "columnar_rows": rows,
+        "workers": workers,
+        "elapsed_seconds": elapsed,
+        "recipes_per_sec": processed / elapsed if elapsed else 0.0,
+        # Worker stages are summed CPU-side seconds across all workers
+        "stages": {
+            stage: {
+                "seconds": seconds,
+                "recipes_per_sec": (rows if stage == "columnar" else processed) / seconds if seconds else None
+            }
+            for stage, seconds in stage_seconds.items()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a JSONL or CSV recipe corpus with every analysis type")
+    parser.add_argument("input", help="Recipe corpus (.jsonl or .csv)")
+    parser.add_argument("--output", required=True, help="JSONL output; existing records are skipped on resume")
+    parser.add_argument("--columnar", help="Columnar output (default: output path with .parquet, or .npz without pyarrow)")
+    parser.add_argument("--text-field", default="recipe_text", help="Field holding the recipe text")
+    parser.add_argument("--id-field", default="id", help="Field holding the recipe id")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Recipes sent to a worker at a time")
+    parser.add_argument("--dedup", action="store_true", help="Skip analyzing near-duplicates of earlier recipes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    columnar_path = args.columnar or os.path.splitext(args.output)[0] + (".parquet" if pa is not None else ".npz")
+    if columnar_path.endswith(".parquet") and pa is None:
+        parser.error("writing parquet requires pyarrow; use a .npz path instead")
+
+    report = analyze_corpus(
+        args.input, args.output, columnar_path,
+        text_field=args.text_field, id_field=args.id_field,
+        workers=args.workers, chunk_size=args.chunk_size, dedup=args.dedup
+    )
+
+    print(f"analyzed={report['analyzed']} failed={report['failed']} duplicates={report['duplicates']} "
+          f"skipped={report['skipped']} "
+          f"workers={report['workers']} elapsed={report['elapsed_seconds']:.1f}s "
+          f"throughput={report['recipes_per_sec']:,.1f} recipes/sec")
+    for stage, stats in report["stages"].items():
+        rate = f"{stats['recipes_per_sec']:,.1f} recipes/sec" if stats["recipes_per_sec"] else "-"
+        print(f"  {stage:<12} {stats['seconds']:>9.2f}s  {rate}")
+    print(f"columnar: {columnar_path} ({report['columnar_rows']} rows)")
+
+
+if __name__ == "__main__":
+    main()
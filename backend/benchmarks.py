@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+🍳 Benchmarks - Performance Benchmarks for Cooking Ethos AI
+
+Micro-benchmarks for the hot paths of the cooking backend. Run from the
+backend directory:
+
+    python benchmarks.py                   # every benchmark
+    python benchmarks.py chat nutrition    # selected benchmarks
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Dict, List, Any, Callable
+
+CHAT_MESSAGES = [
+    "How do I cook chicken breast so it stays juicy?",
+    "What's a good recipe for pasta with garlic?",
+    "How long should I bake salmon at 400 degrees?",
+    "What can I substitute for butter in cookies?",
+    "Is it safe to eat chicken left out overnight?",
+    "What temperature should pork be cooked to?",
+    "What is the best way to store fresh herbs?",
+    "Any tips for a beginner cook?",
+    "How to make rice fluffy?",
+    "What is flour made from?"
+]
+
+RECIPE_TEXTS = [
+    """Classic Pancakes
+Ingredients:
+2 cups flour
+2 large eggs
+1.5 cups milk
+2 tbsp sugar
+1 tsp baking powder
+salt to taste
+
+Instructions:
+1. Whisk the flour, sugar, baking powder and salt.
+2. Beat in the eggs and milk until smooth.
+3. Cook on a hot griddle for 3 minutes per side.
+Servings: 4""",
+    """Garlic Chicken Stir Fry
+Ingredients: 1 lb chicken breast
+3 cloves garlic
+2 tbsp soy sauce
+1 tbsp olive oil
+Directions:
+Step 1: Slice the chicken and mince the garlic.
+Step 2: Heat the oil in a wok over high heat.
+Step 3: Stir fry the chicken for 8 minutes, add garlic and soy sauce.""",
+    """## Ingredients
+- 400 g spaghetti
+- 4 tomatoes
+- 2 tbsp olive oil
+- fresh basil
+## Method
+1) Boil the spaghetti for 10 mins.
+2) Saute the tomatoes in olive oil.
+3) Toss with the pasta and basil.
+Yield: 2 servings"""
+]
+
+
+def measure(fn: Callable[[Any], Any], items: List[Any], repeat: int = 5) -> Dict[str, float]:
+    """
+    Measure CPU time and traced allocations of fn over items
+
+    Returns:
+        Dictionary with per-item CPU time (µs), throughput (items/sec) and
+        per-item allocated memory (bytes)
+    """
+    # Warm up caches and lazily built structures
+    for item in items:
+        fn(item)
+
+    start = time.process_time()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    elapsed = time.process_time() - start
+    count = repeat * len(items)
+
+    # Peak memory allocated while handling each item, averaged over items
+    tracemalloc.start()
+    peak_total = 0
+    for item in items:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn(item)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - before
+    tracemalloc.stop()
+
+    return {
+        "items": count,
+        "cpu_us_per_item": elapsed / count * 1e6,
+        "items_per_sec": count / elapsed if elapsed else float("inf"),
+        "peak_bytes_per_item": peak_total / len(items)
+    }
+
+
+# One loop for every benchmark, so loop setup stays out of the measurements
+_EVENT_LOOP = asyncio.new_event_loop()
+
+
+def run_sync(coroutine) -> Any:
+    """Run a coroutine to completion on the shared benchmark event loop"""
+    return _EVENT_LOOP.run_until_complete(coroutine)
+
+
+def benchmark_chat(repeat: int) -> Dict[str, float]:
+    """Benchmark message classification and handling in the chat interface"""
+    from cooking_chat import CookingChatInterface
+
+    chat = CookingChatInterface()
+
+    def handle(message: str):
+        run_sync(chat.process_message(message))
+        chat.clear_conversation_history()
+
+    return measure(handle, CHAT_MESSAGES, repeat)
+
+
+def benchmark_chat_routing(repeat: int) -> Dict[str, float]:
+    """Benchmark feature extraction, classification and handler dispatch only"""
+    from cooking_chat import CookingChatInterface
+
+    chat = CookingChatInterface()
+
+    def route(message: str):
+        run_sync(chat._dispatch_message(chat.feature_extractor.extract(message)))
+
+    return measure(route, CHAT_MESSAGES, repeat)
+
+
+def benchmark_recipe_parser(repeat: int) -> Dict[str, float]:
+    """Benchmark recipe parsing throughput (recipes/sec)"""
+    from recipe_parser import RecipeParser
+
+    parser = RecipeParser()
+    return measure(parser.parse, RECIPE_TEXTS, repeat)
+
+
+def benchmark_technique_matcher(repeat: int) -> Dict[str, float]:
+    """Benchmark technique detection per recipe against a vocabulary of thousands of techniques"""
+    from recipe_parser import RecipeParser
+    from technique_matcher import TechniqueMatcher
+
+    technique_database = {
+        name: {"description": name, "tips": [], "equipment": ["pan"]}
+        for name in ["baking", "sautéing", "frying", "boiling", "roasting", "whisking", "tossing"]
+    }
+    # Synthetic vocabulary so the index size resembles a full technique catalogue
+    for i in range(5000):
+        technique_database[f"technique{i} method{i % 50}"] = {"description": "", "tips": [], "equipment": []}
+
+    matcher = TechniqueMatcher(technique_database)
+    parser = RecipeParser()
+    instructions = [parser.parse(recipe_text)["instructions"] for recipe_text in RECIPE_TEXTS]
+    return measure(matcher.analyze, instructions, repeat)
+
+
+def benchmark_recipe_reanalysis(repeat: int) -> Dict[str, float]:
+    """Benchmark every analysis type on successive one-line edits of a long recipe (versions/sec)"""
+    from analysis_cache import AnalysisCache
+    from recipe_analyzer import ANALYSIS_TYPES, RecipeAnalyzer
+
+    analyzer = RecipeAnalyzer(analysis_cache=AnalysisCache(db_path=None))
+    run_sync(analyzer.initialize())
+    ingredients = [f"{i % 4 + 1} cups flour blend {i}" for i in range(100)]
+    instructions = [f"{i + 1}. Saute the onions, then bake for {i + 5} minutes" for i in range(100)]
+    edits = iter(range(10 ** 9))
+
+    def analyze_next_version(_):
+        # Each version changes one ingredient amount of the previous one
+        edit = next(edits)
+        lines = list(ingredients)
+        lines[edit % len(lines)] = f"{edit} tbsp butter"
+        recipe_text = "Ingredients:\n" + "\n".join(lines) + "\nInstructions:\n" + "\n".join(instructions)
+        for analysis_type in ANALYSIS_TYPES:
+            run_sync(analyzer.analyze_recipe(recipe_text, analysis_type))
+
+    return measure(analyze_next_version, [None] * 10, max(1, repeat // 10))
+
+
+def benchmark_analysis_cache(repeat: int) -> Dict[str, float]:
+    """Benchmark analyze_recipe served from the in-memory analysis cache (analyses/sec)"""
+    from analysis_cache import AnalysisCache
+    from recipe_analyzer import ANALYSIS_TYPES, RecipeAnalyzer
+
+    analyzer = RecipeAnalyzer(analysis_cache=AnalysisCache(db_path=None))
+    requests = [(recipe_text, analysis_type) for recipe_text in RECIPE_TEXTS for analysis_type in ANALYSIS_TYPES]
+    return measure(lambda request: run_sync(analyzer.analyze_recipe(*request)), requests, repeat)
+
+
+def _nutrition_engine_and_recipes():
+    """Build a nutrition engine from the basic ingredient database and parsed benchmark recipes"""
+    from recipe_analyzer import RecipeAnalyzer
+    from recipe_parser import RecipeParser
+    from nutrition_engine import NutritionEngine
+
+    engine = NutritionEngine(RecipeAnalyzer()._create_basic_ingredient_db())
+    parser = RecipeParser()
+    return engine, [parser.parse(recipe_text)["ingredients"] for recipe_text in RECIPE_TEXTS]
+
+
+def benchmark_nutrition(repeat: int) -> Dict[str, float]:
+    """Benchmark per-recipe nutrition estimates (recipes/sec)"""
+    engine, recipes = _nutrition_engine_and_recipes()
+    return measure(engine.analyze, recipes, repeat)
+
+
+def benchmark_nutrition_batch(repeat: int, batch_size: int = 1000) -> Dict[str, float]:
+    """Benchmark batched nutrition totals, reported per recipe"""
+    engine, recipes = _nutrition_engine_and_recipes()
+    batch = (recipes * (batch_size // len(recipes) + 1))[:batch_size]
+    return _per_batch_item(measure(engine.analyze_batch, [batch], max(1, repeat // 10)), batch_size)
+
+
+def _per_batch_item(result: Dict[str, float], batch_size: int) -> Dict[str, float]:
+    """Report a measurement over whole batches per item of the batch"""
+    return {
+        "items": result["items"] * batch_size,
+        "cpu_us_per_item": result["cpu_us_per_item"] / batch_size,
+        "items_per_sec": result["items_per_sec"] * batch_size,
+        "peak_bytes_per_item": result["peak_bytes_per_item"] / batch_size
+    }
+
+
+def ingredient_line_corpus(size: int = 10000) -> List[str]:
+    """Build a corpus of distinct ingredient lines covering the quantity formats"""
+    amounts = ["1", "2", "1/2", "1 1/2", "½", "1½", "2-3", "1 to 2", "0.25", ".5", "200"]
+    units = ["cups", "cup", "tbsp", "T", "tsp", "t", "tablespoons", "g", "grams", "oz", "lbs.", "ml", "cloves", ""]
+    names = ["flour", "sugar", "olive oil", "butter", "milk", "garlic", "large eggs", "chicken breast", "salt", "water"]
+    lines = []
+    for i in range(size):
+        amount = amounts[i % len(amounts)]
+        unit = units[(i // len(amounts)) % len(units)]
+        name = names[(i // (len(amounts) * len(units))) % len(names)]
+        lines.append(f"{amount} {unit} {name} #{i}".replace("  ", " "))
+    return lines
+
+
+def benchmark_quantity_parser(repeat: int) -> Dict[str, float]:
+    """Benchmark uncached quantity lexing over distinct ingredient lines"""
+    from quantity_parser import lex_quantity
+
+    return measure(lex_quantity, ingredient_line_corpus(), max(1, repeat // 20))
+
+
+def benchmark_recipe_scaler(repeat: int, batch_size: int = 1000) -> Dict[str, float]:
+    """Benchmark bulk scaling with metric conversion, reported per recipe"""
+    from recipe_parser import RecipeParser
+    from recipe_scaler import RecipeScaler
+
+    parser = RecipeParser()
+    recipes = [
+        {"ingredients": parser.parse(text)["ingredients"], "servings": 4, "target_servings": 6 + i % 5}
+        for i, text in enumerate(RECIPE_TEXTS * (batch_size // len(RECIPE_TEXTS) + 1))
+    ][:batch_size]
+    scaler = RecipeScaler()
+    result = measure(lambda batch: scaler.scale_recipes(batch, unit_system="metric"), [recipes],
+                     max(1, repeat // 10))
+    return _per_batch_item(result, batch_size)
+
+
+def benchmark_ingredient_resolver(repeat: int) -> Dict[str, float]:
+    """Benchmark fuzzy ingredient resolution against a vocabulary of 100k+ names (lookups/sec)"""
+    from ingredient_resolver import IngredientResolver
+
+    # Synthetic vocabulary so the index size resembles a full ingredient catalogue
+    modifiers = ["red", "green", "smoked", "sweet", "wild", "baby", "roasted", "pickled", "black", "white", "yellow"]
+    stems = [f"{head}{tail}" for head in ["bra", "cro", "lem", "pap", "quin", "sal", "tur", "vel", "zar", "mor"]
+             for tail in ["nia", "bor", "tal", "ane", "ola", "ette", "ino", "ush", "ard", "ika"]]
+    forms = ["", " sauce", " paste", " powder", " oil", " flakes", " seed", " leaf", " stock", " puree"]
+    names = ["chicken", "chicken breast", "broccoli", "flour", "all-purpose flour", "eggs", "olive oil", "cinnamon"]
+    names += [f"{first} {second} {stem}{form}" for first in modifiers for second in modifiers if first != second
+              for stem in stems for form in forms]
+    # Uncached, so every lookup searches the indexes
+    resolver = IngredientResolver(names, cache_size=0)
+    queries = [
+        "2 boneless chicken breasts, cut into strips", "fresh brocoli florets", "1 cup all purpose flour",
+        "3 large eggs", "1 tsp cinammon", "2 tbsp smoked red bratal paste", "wild quinola powder, divided",
+        "1 lb sweet zarush"
+    ]
+    result = measure(resolver.resolve, queries, repeat)
+    result["names"] = len(resolver.canonical_names)
+    return result
+
+
+def _near_duplicate_corpus(size: int) -> List[Any]:
+    """Build (id, parsed recipe) pairs where every recipe has a few rescaled, reformatted copies"""
+    from recipe_parser import RecipeParser
+
+    parser = RecipeParser()
+    words = ["flour", "sugar", "eggs", "milk", "butter", "rice", "beans", "onion", "garlic", "tomato",
+             "mix", "stir", "bake", "fry", "simmer", "chop", "whisk", "fold", "roast", "season"]
+    recipes = []
+    for i in range(size):
+        base = i // 4
+        # Parsed names and shingles ignore digits, so each base recipe gets a letter tag
+        tag = "".join(chr(ord("a") + int(digit)) for digit in str(base))
+        ingredients = "\n".join(f"{i % 4 + 1} cups {words[(base + k * 7) % 20]} {tag}{k}" for k in range(6))
+        steps = "\n".join(
+            f"{k + 1}. " + " ".join(words[(base * 3 + k * 5 + j) % 20] for j in range(8)) + f" the {tag} batch."
+            for k in range(5)
+        )
+        recipes.append((f"recipe{i}", parser.parse(f"Ingredients:\n{ingredients}\nInstructions:\n{steps}")))
+    return recipes
+
+
+def benchmark_recipe_dedup(repeat: int, corpus_size: int = 20000) -> Dict[str, float]:
+    """Benchmark near-duplicate queries against an indexed corpus (queries/sec)"""
+    from recipe_dedup import RecipeDedupIndex
+
+    recipes = _near_duplicate_corpus(corpus_size)
+    index = RecipeDedupIndex()
+    index.cluster(recipes)
+    result = measure(index.query, [parsed_recipe for _, parsed_recipe in recipes[:200]], max(1, repeat // 10))
+    result["indexed"] = len(index)
+    return result
+
+
+def benchmark_recipe_clustering(repeat: int, corpus_size: int = 20000) -> Dict[str, float]:
+    """Benchmark clustering a whole corpus into near-duplicate groups, reported per recipe"""
+    from recipe_dedup import RecipeDedupIndex
+
+    recipes = _near_duplicate_corpus(corpus_size)
+    result = measure(lambda corpus: RecipeDedupIndex().cluster(corpus), [recipes], max(1, repeat // 100))
+    return _per_batch_item(result, corpus_size)
+
+
+def benchmark_recipe_recommender(repeat: int, corpus_size: int = 100000) -> Dict[str, float]:
+    """Benchmark uncached recommendations over a large recipe corpus (requests/sec)"""
+    import random
+    from recipe_recommender import RecipeRecommender
+
+    generator = random.Random(0)
+    # Synthetic vocabulary with a long tail, like real ingredient frequencies
+    vocabulary = [f"ingredient {chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i // 676)}" for i in range(5000)]
+    frequency = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    recipes = [
+        {
+            "name": f"Recipe {i}",
+            "ingredients": generator.choices(vocabulary, frequency, k=10),
+            "cuisine": generator.choice(["italian", "french", "thai", "mexican"]),
+            "difficulty": generator.choice(["easy", "medium", "hard"]),
+            "cooking_time": f"{generator.randint(10, 120)} minutes",
+            "dietary": generator.sample(["vegan", "vegetarian", "gluten-free"], generator.randint(0, 2))
+        }
+        for i in range(corpus_size)
+    ]
+    recommender = RecipeRecommender(recipes, cache_ttl=0.0)
+    requests = [
+        (generator.choices(vocabulary, frequency, k=8),
+         {"dietary_restrictions": ["vegetarian"], "favorite_cuisines": ["thai"], "skill_level": "beginner",
+          "allergies": [vocabulary[3]], "max_cooking_time": 60})
+        for _ in range(50)
+    ]
+    return measure(lambda request: recommender.recommend(*request), requests, max(1, repeat // 10))
+
+
+def benchmark_pantry_index(repeat: int, corpus_size: int = 100000) -> Dict[str, float]:
+    """Benchmark "what can I make with ..." queries over a large recipe corpus (queries/sec)"""
+    import random
+    from pantry_index import PantryIndex
+
+    generator = random.Random(0)
+    vocabulary = [f"ingredient {chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i // 676)}" for i in range(5000)]
+    frequency = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    index = PantryIndex({"name": f"Recipe {i}", "ingredients": generator.choices(vocabulary, frequency, k=8)}
+                        for i in range(corpus_size))
+    pantries = [generator.choices(vocabulary, frequency, k=12) for _ in range(50)]
+    return measure(lambda pantry: index.find(pantry, max_missing=2, limit=10), pantries, max(1, repeat // 10))
+
+
+def benchmark_dietary_filter(repeat: int, corpus_size: int = 100000) -> Dict[str, float]:
+    """Benchmark filtering a large recipe corpus by dietary restrictions (requests/sec)"""
+    import random
+    from dietary_index import DietaryIndex, preference_mask
+
+    generator = random.Random(0)
+    ingredients = ["chicken breast", "2 tbsp butter", "olive oil", "1 cup flour", "gluten-free pasta", "2 eggs",
+                   "coconut milk", "walnuts", "garlic", "rice", "tofu", "spinach", "parmesan cheese", "honey"]
+    index = DietaryIndex({"name": f"Recipe {i}", "ingredients": generator.sample(ingredients, 6)}
+                         for i in range(corpus_size))
+    requests = [
+        {"dietary_restrictions": generator.sample(["vegetarian", "vegan", "gluten free", "dairy-free"], 2),
+         "allergies": generator.sample(["peanuts", "eggs", "shellfish"], 1)}
+        for _ in range(50)
+    ]
+    return measure(lambda preferences: index.allowed(preference_mask(preferences)), requests, repeat)
+
+
+def benchmark_cuisine_classifier(repeat: int, batch_size: int = 4096) -> Dict[str, float]:
+    """Benchmark batch cuisine scoring with the keyword model (recipes/sec)"""
+    from cuisine_classifier import CuisineClassifier
+
+    classifier = CuisineClassifier.from_keywords()
+    texts = (RECIPE_TEXTS * (batch_size // len(RECIPE_TEXTS) + 1))[:batch_size]
+    result = measure(classifier.predict_proba_batch, [texts], max(1, repeat // 20))
+    return _per_batch_item(result, batch_size)
+
+
+def benchmark_ingredient_pairing(repeat: int, corpus_size: int = 100000) -> Dict[str, float]:
+    """Benchmark "what goes with X (and Y)" queries over a large recipe corpus (queries/sec)"""
+    import random
+    from itertools import accumulate
+    from ingredient_pairing import IngredientPairing
+
+    generator = random.Random(0)
+    vocabulary = [f"ingredient {chr(97 + i % 26)}{chr(97 + i // 26 % 26)}{chr(97 + i // 676)}" for i in range(5000)]
+    frequency = list(accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    pairing = IngredientPairing(({"ingredients": generator.choices(vocabulary, cum_weights=frequency, k=10)}
+                                 for _ in range(corpus_size)), min_count=3)
+    queries = [generator.choices(vocabulary, cum_weights=frequency, k=generator.randint(1, 2)) for _ in range(50)]
+    return measure(lambda query: pairing.pairings(query, limit=10), queries, max(1, repeat // 10))
+
+
+def benchmark_ingredient_cascade(repeat: int) -> Dict[str, float]:
+    """Benchmark the deterministic stage of ingredient extraction (lines/sec) and the share of lines it handles"""
+    from recipe_parser import RecipeParser
+
+    parser = RecipeParser()
+    lines = [line for text in RECIPE_TEXTS for line in parser.ingredient_lines(text)]
+    result = measure(parser.parse_ingredient_line_confidently, lines, repeat)
+    parsed = sum(parser.parse_ingredient_line_confidently(line) is not None for line in lines)
+    result["parser_lines_pct"] = 100.0 * parsed / len(lines)
+    return result
+
+
+def benchmark_recipe_validator(repeat: int, batch_size: int = 4096) -> Dict[str, float]:
+    """Benchmark batch validation of parsed recipes against the cooking rules (recipes/sec)"""
+    from recipe_parser import RecipeParser
+    from recipe_validator import RecipeValidator
+
+    parser = RecipeParser()
+    validator = RecipeValidator()
+    parsed = [parser.parse(text) for text in RECIPE_TEXTS]
+    recipes = (parsed * (batch_size // len(parsed) + 1))[:batch_size]
+    result = measure(validator.validate_batch, [recipes], max(1, repeat // 20))
+    return _per_batch_item(result, batch_size)
+
+
+BENCHMARKS = {
+    "chat": benchmark_chat,
+    "chat_routing": benchmark_chat_routing,
+    "recipe_parser": benchmark_recipe_parser,
+    "recipe_reanalysis": benchmark_recipe_reanalysis,
+    "analysis_cache": benchmark_analysis_cache,
+    "technique_matcher": benchmark_technique_matcher,
+    "nutrition": benchmark_nutrition,
+    "nutrition_batch": benchmark_nutrition_batch,
+    "quantity_parser": benchmark_quantity_parser,
+    "recipe_scaler": benchmark_recipe_scaler,
+    "ingredient_resolver": benchmark_ingredient_resolver,
+    "recipe_dedup": benchmark_recipe_dedup,
+    "recipe_clustering": benchmark_recipe_clustering,
+    "recipe_recommender": benchmark_recipe_recommender,
+    "pantry_index": benchmark_pantry_index,
+    "dietary_filter": benchmark_dietary_filter,
+    "cuisine_classifier": benchmark_cuisine_classifier,
+    "ingredient_pairing": benchmark_ingredient_pairing,
+    "ingredient_cascade": benchmark_ingredient_cascade,
+    "recipe_validator": benchmark_recipe_validator
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cooking Ethos AI benchmarks")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                        help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the benchmark corpus")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    for name in args.benchmarks or list(BENCHMARKS):
+        result = BENCHMARKS[name](args.repeat)
+        print(f"{name:<18} " + "  ".join(
+            f"{key}={value:,.1f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in result.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
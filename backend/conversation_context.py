@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+🍳 Conversation Context - Bounded Conversation Context for Cooking Ethos AI
+
+This module keeps cooking conversations within a token budget. Recent turns are
+kept verbatim, while older turns are collapsed into compact cooking facts
+(ingredients on hand, dietary restrictions, dish in progress).
+"""
+
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+_INGREDIENTS_ON_HAND_PATTERN = re.compile(
+    r"\b(?:i have|i've got|i got|i bought|we have|using|left ?over)\s+(?:some\s+)?([a-z ,'-]+?)(?:[.?!]|\bwhat\b|\bhow\b|\bcan\b|$)"
+)
+_DISH_PATTERN = re.compile(
+    r"\b(?:making|cooking|baking|preparing|recipe for|how to make|how to cook|how do i make)\s+(?:a |an |some |the )?([a-z '-]+?)(?:[.?!,]|\bfor\b|\bwith\b|\btonight\b|$)"
+)
+_LIST_SPLIT_PATTERN = re.compile(r"\s*(?:,|\band\b|&)\s*")
+
+_DIETARY_KEYWORDS = {
+    "vegetarian": ["vegetarian", "no meat"],
+    "vegan": ["vegan", "plant-based", "plant based"],
+    "gluten-free": ["gluten-free", "gluten free", "celiac", "coeliac"],
+    "dairy-free": ["dairy-free", "dairy free", "lactose", "no dairy"],
+    "nut-free": ["nut-free", "nut free", "nut allergy", "peanut allergy"],
+    "low-carb": ["low-carb", "low carb", "keto"],
+    "pescatarian": ["pescatarian"],
+    "halal": ["halal"],
+    "kosher": ["kosher"]
+}
+_DIETARY_PATTERN = re.compile(
+    "|".join(
+        f"(?P<{diet.replace('-', '_')}>{'|'.join(re.escape(keyword) for keyword in keywords)})"
+        for diet, keywords in _DIETARY_KEYWORDS.items()
+    )
+)
+
+
+def approximate_token_count(text: str) -> int:
+    """Approximate a token count by counting words and punctuation"""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class ConversationContextManager:
+    """
+    Keeps conversation context within a token budget.
+
+    This class handles:
+    - Extracting compact cooking facts from user messages
+    - Trimming stored history once it exceeds its token budget
+    - Building a per-turn prompt context of facts plus recent verbatim turns
+    - Caching token counts so turn lengths are only computed once
+    """
+
+    def __init__(self, prompt_token_budget: int = 384, history_token_budget: int = 2048,
+                 min_recent_turns: int = 2, token_counter: Optional[Callable[[str], int]] = None,
+                 token_cache_size: int = 4096, tokenizer_identity: Optional[Callable[[], Any]] = None):
+        self.prompt_token_budget = prompt_token_budget
+        self.history_token_budget = history_token_budget
+        self.min_recent_turns = min_recent_turns
+        self.token_counter = token_counter or approximate_token_count
+        # Names the tokenizer token_counter currently uses, so counts made before
+        # a tokenizer loads (or approximated without one) are not reused after
+        self.tokenizer_identity = tokenizer_identity or (lambda: None)
+        self.token_cache_size = token_cache_size
+        self._token_counts = OrderedDict()
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens in text, reusing cached counts for text seen before"""
+        key = (self.tokenizer_identity(), text)
+        count = self._token_counts.get(key)
+        if count is not None:
+            self._token_counts.move_to_end(key)
+            return count
+
+        count = self.token_counter(text)
+        self._token_counts[key] = count
+        if len(self._token_counts) > self.token_cache_size:
+            self._token_counts.popitem(last=False)
+        return count
+
+    def new_facts(self) -> Dict[str, Any]:
+        """Create an empty set of conversation facts"""
+        return {
+            "ingredients_on_hand": [],
+            "dietary_restrictions": [],
+            "dish_in_progress": None
+        }
+
+    def update_facts(self, facts: Dict[str, Any], message: str):
+        """Fold the cooking facts mentioned in a user message into facts"""
+        message_lower = message.lower()
+
+        for match in _INGREDIENTS_ON_HAND_PATTERN.finditer(message_lower):
+            for ingredient in _LIST_SPLIT_PATTERN.split(match.group(1)):
+                ingredient = ingredient.strip(" '-")
+                if ingredient and ingredient not in facts["ingredients_on_hand"]:
+                    facts["ingredients_on_hand"].append(ingredient)
+
+        for match in _DIETARY_PATTERN.finditer(message_lower):
+            diet = match.lastgroup.replace("_", "-")
+            if diet not in facts["dietary_restrictions"]:
+                facts["dietary_restrictions"].append(diet)
+
+        dish_match = _DISH_PATTERN.search(message_lower)
+        if dish_match:
+            dish = dish_match.group(1).strip(" '-")
+            if dish and dish not in ("it", "this", "that", "something"):
+                facts["dish_in_progress"] = dish
+
+    def summarize_facts(self, facts: Dict[str, Any]) -> str:
+        """Render conversation facts as a compact prompt fragment"""
+        parts = []
+        if facts.get("dish_in_progress"):
+            parts.append(f"Dish in progress: {facts['dish_in_progress']}.")
+        if facts.get("ingredients_on_hand"):
+            parts.append(f"Ingredients on hand: {', '.join(facts['ingredients_on_hand'])}.")
+        if facts.get("dietary_restrictions"):
+            parts.append(f"Dietary restrictions: {', '.join(facts['dietary_restrictions'])}.")
+        return " ".join(parts)
+
+    def record_turn(self, session: Dict[str, Any], turn: Dict[str, Any]):
+        """Account for a new turn in the session and compact its stored history"""
+        session.setdefault("facts", self.new_facts())
+        if turn["role"] == "user":
+            self.update_facts(session["facts"], turn["content"])
+
+        session["history_tokens"] = session.get("history_tokens", 0) + self.count_tokens(turn["content"])
+        self.compact(session)
+
+    def compact(self, session: Dict[str, Any]):
+        """Drop the oldest turns once stored history exceeds its token budget"""
+        history = session["history"]
+        dropped = 0
+
+        while (session.get("history_tokens", 0) > self.history_token_budget
+               and len(history) - dropped > self.min_recent_turns):
+            session["history_tokens"] -= self.count_tokens(history[dropped]["content"])
+            dropped += 1
+
+        if dropped:
+            # Facts were extracted as turns arrived, so old turns can simply be released
+            del history[:dropped]
+            session["compacted_turns"] = session.get("compacted_turns", 0) + dropped
+
+    def build_prompt_context(self, session: Dict[str, Any], skip_latest_user_turn: bool = True) -> Dict[str, Any]:
+        """
+        Build the conversation context for the next prompt within the prompt token budget
+
+        Args:
+            session: Session state holding "history" and "facts"
+            skip_latest_user_turn: Leave out the trailing user turn, which is
+                normally the prompt being answered
+
+        Returns:
+            Dictionary with a "conversation_facts" summary and the "recent_turns"
+            that fit the remaining budget, oldest first
+        """
+        facts_summary = self.summarize_facts(session.get("facts") or self.new_facts())
+        remaining = self.prompt_token_budget - self.count_tokens(facts_summary)
+
+        history = session["history"]
+        end = len(history)
+        if skip_latest_user_turn and history and history[-1]["role"] == "user":
+            end -= 1
+
+        recent_turns = []
+        for index in range(end - 1, -1, -1):
+            turn = history[index]
+            tokens = self.count_tokens(turn["content"])
+            if tokens > remaining:
+                break
+            recent_turns.append({"role": turn["role"], "content": turn["content"]})
+            remaining -= tokens
+        recent_turns.reverse()
+
+        return {
+            "conversation_facts": facts_summary,
+            "recent_turns": recent_turns
+        }
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+🍳 Conversation Log - Durable Conversation Logs for Cooking Ethos AI
+
+This module persists cooking conversations as append-only, per-session JSONL
+logs. Writes are queued on the request path and flushed by a background task,
+and logs are compacted periodically so cleared history does not pile up.
+Records stay pending until their write completes, and disk work in progress
+is finished rather than cancelled when the log stops.
+"""
+
+import os
+import json
+import logging
+import asyncio
+import hashlib
+import re
+from typing import Dict, List, Any, Iterator, Awaitable, Set
+
+logger = logging.getLogger(__name__)
+
+_SAFE_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class ConversationLog:
+    """
+    Append-only conversation log store.
+
+    This class handles:
+    - Queueing conversation turns without blocking the chat request path
+    - Flushing queued turns to per-session JSONL files in the background
+    - Recording history clears as tombstones
+    - Periodic compaction of logs with cleared or excess records
+    - Reading session logs back for restarts, analytics and cache warming
+    """
+
+    def __init__(self, log_dir: str = "data/conversations", flush_interval: float = 0.5,
+                 compaction_interval: float = 300.0, max_records_per_session: int = 10000):
+        self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.compaction_interval = compaction_interval
+        self.max_records_per_session = max_records_per_session
+        self.is_running = False
+
+        self._queue = None
+        self._writer_task = None
+        self._compaction_task = None
+        self._io_lock = None
+        self._pending = []      # records taken from the queue and not yet written
+        self._io_tasks = set()  # flushes and compactions in progress
+        self._sessions_to_compact = set()
+
+    async def start(self):
+        """Start the background writer and compaction tasks"""
+        logger.info("📒 Starting conversation log...")
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._queue = asyncio.Queue()
+        self._io_lock = asyncio.Lock()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        self._compaction_task = asyncio.create_task(self._compaction_loop())
+        self.is_running = True
+
+        logger.info(f"✅ Conversation log writing to {self.log_dir}")
+
+    async def stop(self):
+        """Flush pending turns and stop the background tasks"""
+        if not self.is_running:
+            return
+
+        logger.info("📒 Stopping conversation log...")
+        self.is_running = False
+
+        for task in (self._writer_task, self._compaction_task):
+            task.cancel()
+        await asyncio.gather(self._writer_task, self._compaction_task, return_exceptions=True)
+        # A write or compaction already on disk finishes rather than racing the final flush
+        await asyncio.gather(*self._io_tasks, return_exceptions=True)
+
+        # Write out anything still pending or queued
+        self._pending.extend(self._drain_queue())
+        await self._flush()
+        logger.info("✅ Conversation log stopped")
+
+    def append(self, session_id: str, turn: Dict[str, Any]):
+        """Queue a conversation turn for writing; never blocks on disk"""
+        if not self.is_running:
+            return
+        self._queue.put_nowait((session_id, {"type": "turn", **turn}))
+
+    def clear(self, session_id: str):
+        """Queue a tombstone marking the session's history as cleared"""
+        if not self.is_running:
+            return
+        self._queue.put_nowait((session_id, {"type": "clear"}))
+        self._sessions_to_compact.add(session_id)
+
+    def session_path(self, session_id: str) -> str:
+        """Get the log file path for a session"""
+        if not _SAFE_SESSION_ID.match(session_id):
+            session_id = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.log_dir, f"{session_id}.jsonl")
+
+    def has_session(self, session_id: str) -> bool:
+        """Check whether a session has a log on disk"""
+        return os.path.exists(self.session_path(session_id))
+
+    def iter_session_ids(self) -> Iterator[str]:
+        """Iterate over the sessions that have logs on disk"""
+        if not os.path.isdir(self.log_dir):
+            return
+        for file_name in os.listdir(self.log_dir):
+            if file_name.endswith(".jsonl"):
+                yield file_name[:-len(".jsonl")]
+
+    async def flush(self):
+        """Write every queued record now, so reads see the latest turns"""
+        if not self.is_running:
+            return
+        self._pending.extend(self._drain_queue())
+        await self._run_to_completion(self._flush())
+
+    async def read_session(self, session_id: str) -> List[Dict[str, Any]]:
+        """Read the live turns of a session log (everything after the last clear)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._read_turns, self.session_path(session_id))
+
+    async def compact(self):
+        """Rewrite the logs of sessions that have cleared or excess records"""
+        sessions = list(self._sessions_to_compact)
+        self._sessions_to_compact.clear()
+        if not sessions:
+            return
+
+        loop = asyncio.get_running_loop()
+        async with self._io_lock:
+            for session_id in sessions:
+                try:
+                    await loop.run_in_executor(None, self._compact_file, self.session_path(session_id))
+                except Exception as e:
+                    logger.error(f"❌ Error compacting conversation log {session_id}: {str(e)}")
+
+        logger.info(f"🗜️ Compacted {len(sessions)} conversation logs")
+
+    async def _writer_loop(self):
+        """Flush queued turns to disk in batches"""
+        while True:
+            self._pending.append(await self._queue.get())
+            # Let a batch accumulate before touching the disk
+            await asyncio.sleep(self.flush_interval)
+            self._pending.extend(self._drain_queue())
+            await self._run_to_completion(self._flush())
+
+    async def _compaction_loop(self):
+        """Compact logs periodically"""
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            await self._run_to_completion(self.compact())
+
+    async def _run_to_completion(self, work: Awaitable[None]):
+        """Run disk work that cancelling the caller does not interrupt; stop() waits for it"""
+        task = asyncio.ensure_future(work)
+        self._io_tasks.add(task)
+        task.add_done_callback(self._io_tasks.discard)
+        await asyncio.shield(task)
+
+    def _drain_queue(self) -> List[Any]:
+        """Take every record currently queued"""
+        records = []
+        while not self._queue.empty():
+            records.append(self._queue.get_nowait())
+        return records
+
+    async def _flush(self):
+        """Write the pending records, grouped by session; they stay pending until written"""
+        loop = asyncio.get_running_loop()
+        async with self._io_lock:
+            count = len(self._pending)
+            if not count:
+                return
+
+            by_session = {}
+            for session_id, record in self._pending[:count]:
+                by_session.setdefault(session_id, []).append(record)
+
+            try:
+                oversized = await loop.run_in_executor(None, self._write_batch, by_session)
+                # Oversized logs get trimmed at the next compaction
+                self._sessions_to_compact.update(oversized)
+            except Exception as e:
+                logger.error(f"❌ Error writing conversation log: {str(e)}")
+            # Records queued during the write stay for the next flush
+            del self._pending[:count]
+
+    def _write_batch(self, by_session: Dict[str, List[Dict[str, Any]]]) -> Set[str]:
+        """Append records to their session logs, returning the sessions whose logs are oversized"""
+        oversized = set()
+        for session_id, records in by_session.items():
+            path = self.session_path(session_id)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+            if os.path.getsize(path) > self.max_records_per_session * 256:
+                oversized.add(session_id)
+        return oversized
+
+    def _read_turns(self, path: str) -> List[Dict[str, Any]]:
+        """Read the turns after the last clear from a log file"""
+        turns = []
+        if not os.path.exists(path):
+            return turns
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted write
+                    continue
+                if record.get("type") == "clear":
+                    turns = []
+                else:
+                    record.pop("type", None)
+                    turns.append(record)
+
+        return turns
+
+    def _compact_file(self, path: str):
+        """Rewrite a log keeping only the most recent live turns"""
+        turns = self._read_turns(path)[-self.max_records_per_session:]
+
+        temp_path = f"{path}.compacting"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps({"type": "turn", **turn}, ensure_ascii=False) + "\n" for turn in turns))
+        os.replace(temp_path, path)
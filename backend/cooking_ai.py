@@ -22,6 +22,15 @@ import torch
 # Cooking-specific imports
 from cooking_prompts import COOKING_PROMPTS
 from cooking_models import CookingModels
+from recipe_parser import RecipeParser
+from technique_matcher import TechniqueMatcher
+from nutrition_engine import NutritionEngine
+from ingredient_resolver import IngredientResolver
+from recipe_recommender import RecipeRecommender
+from pantry_index import PantryIndex
+from dietary_index import DietaryIndex, dietary_labels, preference_mask
+from cuisine_classifier import CuisineClassifier
+from ingredient_pairing import IngredientPairing
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +52,18 @@ class CookingAI:
         self.is_initialized = False
         self.cooking_knowledge = {}
         self.recipe_patterns = {}
+        self.recipe_parser = RecipeParser()
         self.ingredient_database = {}
+        self.ingredient_resolver = IngredientResolver({})
+        self.nutrition_engine = NutritionEngine({}, self.ingredient_resolver)
         self.technique_database = {}
+        self.technique_matcher = TechniqueMatcher({})
+        self.cuisine_classifier = CuisineClassifier.from_keywords()
+        self.recipe_database = []
+        self.dietary_index = DietaryIndex()
+        self.recipe_recommender = RecipeRecommender([])
+        self.pantry_index = PantryIndex()
+        self.ingredient_pairing = IngredientPairing()
         
         # Cooking-specific configurations
         self.cooking_context = {
@@ -80,9 +99,24 @@ class CookingAI:
             
             # Load ingredient database
             await self._load_ingredient_database()
+            self.ingredient_resolver = IngredientResolver.from_database(self.ingredient_database)
+            self.nutrition_engine = NutritionEngine(self.ingredient_database, self.ingredient_resolver)
             
             # Load technique database
             await self._load_technique_database()
+            self.technique_matcher = TechniqueMatcher(self.technique_database)
+            
+            # Load cuisine model
+            await self._load_cuisine_model()
+            
+            # Load recipe corpus for suggestions
+            await self._load_recipe_database()
+            self.dietary_index = DietaryIndex(self.recipe_database)
+            self.recipe_recommender = RecipeRecommender(self.recipe_database, self.ingredient_resolver,
+                                                        dietary_index=self.dietary_index)
+            self.pantry_index = PantryIndex(self.recipe_database, normalize=self.recipe_recommender.ingredient_term)
+            # The recipe corpus is curated, so even a single shared recipe is a real pairing
+            self.ingredient_pairing = IngredientPairing(self.recipe_database, min_count=1)
             
             self.is_initialized = True
             logger.info("✅ Cooking AI initialized successfully!")
@@ -103,7 +137,16 @@ class CookingAI:
             self.cooking_knowledge.clear()
             self.recipe_patterns.clear()
             self.ingredient_database.clear()
+            self.ingredient_resolver = IngredientResolver({})
+            self.nutrition_engine = NutritionEngine({}, self.ingredient_resolver)
             self.technique_database.clear()
+            self.technique_matcher = TechniqueMatcher({})
+            self.cuisine_classifier = CuisineClassifier.from_keywords()
+            self.recipe_database = []
+            self.dietary_index = DietaryIndex()
+            self.recipe_recommender = RecipeRecommender([])
+            self.pantry_index = PantryIndex()
+            self.ingredient_pairing = IngredientPairing()
             
             self.is_initialized = False
             logger.info("✅ Cooking AI cleanup complete!")
@@ -183,6 +226,23 @@ class CookingAI:
             logger.error(f"❌ Error loading ingredient database: {str(e)}")
             self.ingredient_database = self._create_basic_ingredient_db()
     
+    async def _load_cuisine_model(self):
+        """Load the trained cuisine model"""
+        logger.info("🌍 Loading cuisine model...")
+        
+        # Load from file if available
+        model_file = "data/cuisine_model.npz"
+        try:
+            if os.path.exists(model_file):
+                self.cuisine_classifier = CuisineClassifier.load(model_file)
+                logger.info(f"✅ Loaded cuisine model ({len(self.cuisine_classifier.cuisines)} cuisines)")
+            else:
+                logger.warning(f"⚠️ Cuisine model not found: {model_file}")
+                self.cuisine_classifier = CuisineClassifier.from_keywords()
+        except Exception as e:
+            logger.error(f"❌ Error loading cuisine model: {str(e)}")
+            self.cuisine_classifier = CuisineClassifier.from_keywords()
+    
     async def _load_technique_database(self):
         """Load cooking technique database"""
         logger.info("👨‍🍳 Loading cooking technique database...")
@@ -231,6 +291,125 @@ class CookingAI:
             }
         }
     
+    async def _load_recipe_database(self):
+        """Load recipe corpus"""
+        logger.info("📖 Loading recipe database...")
+        
+        recipe_file = "data/recipes.json"
+        try:
+            if os.path.exists(recipe_file):
+                with open(recipe_file, 'r', encoding='utf-8') as f:
+                    self.recipe_database = json.load(f)
+                    logger.info(f"✅ Loaded {len(self.recipe_database)} recipes")
+            else:
+                logger.warning(f"⚠️ Recipe database not found: {recipe_file}")
+                # Create basic recipe database
+                self.recipe_database = self._create_basic_recipe_db()
+        except Exception as e:
+            logger.error(f"❌ Error loading recipe database: {str(e)}")
+            self.recipe_database = self._create_basic_recipe_db()
+    
+    def _create_basic_recipe_db(self) -> List[Dict[str, Any]]:
+        """Create basic recipe database"""
+        return [
+            {
+                "name": "Garlic Butter Chicken",
+                "ingredients": ["chicken breast", "butter", "garlic", "parsley", "salt", "pepper"],
+                "cuisine": "american",
+                "difficulty": "easy",
+                "cooking_time": "25 minutes",
+                "dietary": ["gluten-free"]
+            },
+            {
+                "name": "Chicken Stir Fry",
+                "ingredients": ["chicken breast", "bell pepper", "broccoli", "soy sauce", "garlic", "ginger", "rice"],
+                "cuisine": "chinese",
+                "difficulty": "easy",
+                "cooking_time": "20 minutes",
+                "dietary": ["dairy-free"]
+            },
+            {
+                "name": "Classic Pancakes",
+                "ingredients": ["flour", "eggs", "milk", "butter", "sugar", "baking powder", "salt"],
+                "cuisine": "american",
+                "difficulty": "easy",
+                "cooking_time": "20 minutes",
+                "dietary": ["vegetarian"]
+            },
+            {
+                "name": "Spaghetti Aglio e Olio",
+                "ingredients": ["spaghetti", "olive oil", "garlic", "red pepper flakes", "parsley"],
+                "cuisine": "italian",
+                "difficulty": "easy",
+                "cooking_time": "15 minutes",
+                "dietary": ["vegetarian", "vegan", "dairy-free"]
+            },
+            {
+                "name": "Tomato Basil Pasta",
+                "ingredients": ["pasta", "tomato", "basil", "garlic", "olive oil", "parmesan cheese"],
+                "cuisine": "italian",
+                "difficulty": "easy",
+                "cooking_time": "25 minutes",
+                "dietary": ["vegetarian"]
+            },
+            {
+                "name": "Vegetable Curry",
+                "ingredients": ["chickpeas", "coconut milk", "onion", "garlic", "curry powder", "spinach", "rice"],
+                "cuisine": "indian",
+                "difficulty": "intermediate",
+                "cooking_time": "40 minutes",
+                "dietary": ["vegetarian", "vegan", "gluten-free", "dairy-free"]
+            },
+            {
+                "name": "Beef Tacos",
+                "ingredients": ["ground beef", "tortillas", "onion", "tomato", "lettuce", "cheddar cheese", "cumin"],
+                "cuisine": "mexican",
+                "difficulty": "easy",
+                "cooking_time": "25 minutes",
+                "dietary": []
+            },
+            {
+                "name": "Greek Salad",
+                "ingredients": ["tomato", "cucumber", "red onion", "feta cheese", "olives", "olive oil"],
+                "cuisine": "greek",
+                "difficulty": "easy",
+                "cooking_time": "10 minutes",
+                "dietary": ["vegetarian", "gluten-free"]
+            },
+            {
+                "name": "Mushroom Risotto",
+                "ingredients": ["arborio rice", "mushrooms", "onion", "butter", "parmesan cheese", "vegetable broth"],
+                "cuisine": "italian",
+                "difficulty": "intermediate",
+                "cooking_time": "45 minutes",
+                "dietary": ["vegetarian", "gluten-free"]
+            },
+            {
+                "name": "Baked Salmon",
+                "ingredients": ["salmon", "lemon", "olive oil", "garlic", "dill", "salt"],
+                "cuisine": "mediterranean",
+                "difficulty": "easy",
+                "cooking_time": "20 minutes",
+                "dietary": ["pescatarian", "gluten-free", "dairy-free"]
+            },
+            {
+                "name": "Beef Bourguignon",
+                "ingredients": ["beef", "red wine", "carrots", "onion", "mushrooms", "bacon", "garlic"],
+                "cuisine": "french",
+                "difficulty": "advanced",
+                "cooking_time": "3 hours",
+                "dietary": ["dairy-free"]
+            },
+            {
+                "name": "Vegetable Omelette",
+                "ingredients": ["eggs", "bell pepper", "onion", "spinach", "cheddar cheese", "butter"],
+                "cuisine": "french",
+                "difficulty": "easy",
+                "cooking_time": "15 minutes",
+                "dietary": ["vegetarian", "gluten-free"]
+            }
+        ]
+    
     def _create_basic_technique_db(self) -> Dict[str, Any]:
         """Create basic cooking technique database"""
         return {
@@ -307,33 +486,7 @@ class CookingAI:
     
     async def _parse_recipe(self, recipe_text: str) -> Dict[str, Any]:
         """Parse recipe text into structured components"""
-        parsed = {
-            "ingredients": [],
-            "instructions": [],
-            "cooking_time": None,
-            "difficulty": "intermediate",
-            "cuisine_type": "general",
-            "dietary_info": []
-        }
-        
-        # Extract ingredients
-        ingredients_match = re.search(r"ingredients?:(.*?)(?=instructions?|directions?|steps?|$)", 
-                                    recipe_text, re.IGNORECASE | re.DOTALL)
-        if ingredients_match:
-            ingredients_text = ingredients_match.group(1).strip()
-            parsed["ingredients"] = self._parse_ingredients(ingredients_text)
-        
-        # Extract instructions
-        instructions_match = re.search(r"instructions?|directions?|steps?:(.*?)(?=servings?|yield|$)", 
-                                     recipe_text, re.IGNORECASE | re.DOTALL)
-        if instructions_match:
-            instructions_text = instructions_match.group(1).strip()
-            parsed["instructions"] = self._parse_instructions(instructions_text)
-        
-        # Extract cooking time
-        time_match = re.search(r"(\d+)\s*(?:minutes?|mins?|hours?|hrs?)", recipe_text, re.IGNORECASE)
-        if time_match:
-            parsed["cooking_time"] = time_match.group(0)
+        parsed = self.recipe_parser.parse(recipe_text)
         
         # Determine difficulty based on complexity
         parsed["difficulty"] = self._determine_difficulty(parsed)
@@ -346,67 +499,6 @@ class CookingAI:
         
         return parsed
     
-    def _parse_ingredients(self, ingredients_text: str) -> List[Dict[str, Any]]:
-        """Parse ingredients text into structured format"""
-        ingredients = []
-        lines = ingredients_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Try to match ingredient patterns
-            for pattern in self.recipe_patterns["ingredients"]:
-                match = re.match(pattern, line, re.IGNORECASE)
-                if match:
-                    if len(match.groups()) == 3:
-                        amount, unit, name = match.groups()
-                        ingredients.append({
-                            "amount": float(amount) if amount else None,
-                            "unit": unit.lower(),
-                            "name": name.strip(),
-                            "original": line
-                        })
-                    elif len(match.groups()) == 2:
-                        amount, name = match.groups()
-                        ingredients.append({
-                            "amount": float(amount) if amount else None,
-                            "unit": None,
-                            "name": name.strip(),
-                            "original": line
-                        })
-                    break
-            else:
-                # No pattern matched, treat as ingredient name only
-                ingredients.append({
-                    "amount": None,
-                    "unit": None,
-                    "name": line,
-                    "original": line
-                })
-        
-        return ingredients
-    
-    def _parse_instructions(self, instructions_text: str) -> List[str]:
-        """Parse instructions text into steps"""
-        instructions = []
-        lines = instructions_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Remove step numbers and clean up
-            line = re.sub(r'^\d+\.\s*', '', line)
-            line = re.sub(r'^Step\s+\d+:\s*', '', line)
-            
-            if line:
-                instructions.append(line)
-        
-        return instructions
-    
     def _determine_difficulty(self, parsed_recipe: Dict[str, Any]) -> str:
         """Determine recipe difficulty based on various factors"""
         score = 0
@@ -443,42 +535,11 @@ class CookingAI:
     
     def _determine_cuisine_type(self, recipe_text: str) -> str:
         """Determine cuisine type based on ingredients and terminology"""
-        text_lower = recipe_text.lower()
-        
-        cuisine_keywords = {
-            "italian": ["pasta", "basil", "oregano", "parmesan", "olive oil", "tomato"],
-            "french": ["butter", "wine", "shallots", "herbs de provence", "dijon"],
-            "chinese": ["soy sauce", "ginger", "sesame oil", "rice wine", "five spice"],
-            "japanese": ["miso", "dashi", "mirin", "sake", "wasabi", "nori"],
-            "indian": ["curry", "cumin", "turmeric", "cardamom", "garam masala"],
-            "mexican": ["chili", "lime", "cilantro", "tortilla", "queso", "salsa"]
-        }
-        
-        for cuisine, keywords in cuisine_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return cuisine
-        
-        return "general"
+        return self.cuisine_classifier.predict(recipe_text)
     
     def _extract_dietary_info(self, recipe_text: str) -> List[str]:
         """Extract dietary information from recipe text"""
-        text_lower = recipe_text.lower()
-        dietary_info = []
-        
-        dietary_keywords = {
-            "vegetarian": ["vegetarian", "veggie", "no meat"],
-            "vegan": ["vegan", "plant-based", "no dairy"],
-            "gluten-free": ["gluten-free", "gluten free", "gf"],
-            "dairy-free": ["dairy-free", "dairy free", "lactose-free"],
-            "low-carb": ["low-carb", "low carb", "keto"],
-            "healthy": ["healthy", "light", "low-fat"]
-        }
-        
-        for diet, keywords in dietary_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                dietary_info.append(diet)
-        
-        return dietary_info
+        return dietary_labels(recipe_text)
     
     async def _general_recipe_analysis(self, parsed_recipe: Dict[str, Any]) -> Dict[str, Any]:
         """Perform general recipe analysis"""
@@ -523,11 +584,14 @@ class CookingAI:
         }
         
         for ingredient in parsed_recipe["ingredients"]:
+            name = ingredient["name"].lower()
+            canonical_name = name if name in self.ingredient_database else self.ingredient_resolver.resolve_one(name)
             ingredient_info = {
                 "name": ingredient["name"],
+                "canonical_name": canonical_name,
                 "amount": ingredient["amount"],
                 "unit": ingredient["unit"],
-                "info": self.ingredient_database.get(ingredient["name"].lower(), {}),
+                "info": self.ingredient_database.get(canonical_name, {}) if canonical_name else {},
                 "substitutes": []
             }
             
@@ -549,47 +613,18 @@ class CookingAI:
             "skill_requirements": []
         }
         
-        # Analyze instructions for cooking techniques
-        for instruction in parsed_recipe["instructions"]:
-            instruction_lower = instruction.lower()
-            
-            for technique_name, technique_info in self.technique_database.items():
-                if technique_name in instruction_lower:
-                    analysis["techniques"].append({
-                        "name": technique_name,
-                        "description": technique_info["description"],
-                        "tips": technique_info["tips"],
-                        "equipment": technique_info["equipment"]
-                    })
-                    analysis["equipment_needed"].extend(technique_info["equipment"])
+        # Find techniques with the inverted index built from the technique database
+        techniques, equipment_needed = self.technique_matcher.analyze(parsed_recipe["instructions"])
+        analysis["techniques"] = techniques
+        analysis["equipment_needed"] = equipment_needed
         
         return analysis
     
     async def _nutritional_analysis(self, parsed_recipe: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze nutritional content of recipe"""
-        analysis = {
-            "estimated_nutrition": {
-                "calories": 0,
-                "protein": 0,
-                "carbs": 0,
-                "fat": 0,
-                "fiber": 0
-            },
-            "ingredient_breakdown": [],
-            "health_notes": []
-        }
-        
-        # Calculate estimated nutrition based on ingredients
-        for ingredient in parsed_recipe["ingredients"]:
-            ingredient_info = self.ingredient_database.get(ingredient["name"].lower(), {})
-            if ingredient_info and "nutrition" in ingredient_info:
-                nutrition = ingredient_info["nutrition"]
-                amount = ingredient["amount"] or 1
-                
-                # Simple calculation (in real implementation, would be more sophisticated)
-                for nutrient, value in nutrition.items():
-                    if nutrient in analysis["estimated_nutrition"]:
-                        analysis["estimated_nutrition"][nutrient] += value * amount
+        # Amounts are converted to grams and multiplied through the nutrient matrix
+        analysis = self.nutrition_engine.analyze(parsed_recipe["ingredients"])
+        analysis["health_notes"] = []
         
         return analysis
     
@@ -598,16 +633,24 @@ class CookingAI:
         """Get personalized recipe suggestions"""
         suggestions = []
         
-        # Generate suggestions based on context and preferences
-        if context and "available_ingredients" in context:
-            ingredients = context["available_ingredients"]
-            suggestions.append(f"Try a recipe using {', '.join(ingredients[:3])}")
-        
-        if user_preferences and "dietary_restrictions" in user_preferences:
+        # Rank the recipe corpus by available ingredients and preferences
+        available_ingredients = (context or {}).get("available_ingredients") or []
+        recipes = self.recipe_recommender.recommend(available_ingredients, user_preferences, limit=5)
+        for recipe in recipes:
+            suggestion = recipe["name"]
+            if recipe["matched"]:
+                suggestion += f" - uses your {', '.join(recipe['matched'])}"
+                if recipe["missing"]:
+                    suggestion += f"; you'll also need {', '.join(recipe['missing'])}"
+            elif recipe.get("cooking_time"):
+                suggestion += f" ({recipe['cooking_time']})"
+            suggestions.append(suggestion)
+        
+        if not suggestions and user_preferences and user_preferences.get("dietary_restrictions"):
             restrictions = user_preferences["dietary_restrictions"]
-            suggestions.append(f"Explore {restrictions[0]} recipes")
+            suggestions.append(f"Explore {restrictions[0] if isinstance(restrictions, list) else restrictions} recipes")
         
-        # Add general suggestions
+        # Fill up with general suggestions
         suggestions.extend([
             "Try a quick 30-minute meal",
             "Explore seasonal ingredients",
@@ -615,3 +658,34 @@ class CookingAI:
         ])
         
         return suggestions[:5]  # Return top 5 suggestions
+    
+    def find_recipes_for_pantry(self, pantry: List[str], max_missing: int = 2, limit: int = 10,
+                                user_preferences: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Answer "what can I make with X, Y, Z"
+        
+        Args:
+            pantry: Ingredients the user has
+            max_missing: Most ingredients a recipe may still need
+            limit: Most recipes returned
+            user_preferences: Dietary restrictions and allergies the recipes must respect
+            
+        Returns:
+            {"recipe", "matched", "missing"} records, fewest missing ingredients first
+        """
+        required = preference_mask(user_preferences)
+        allowed = self.dietary_index.allowed_bits(required) if required else None
+        return self.pantry_index.find(pantry, max_missing=max_missing, limit=limit, allowed=allowed)
+    
+    def get_ingredient_pairings(self, ingredients: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Answer "what goes with X (and Y)" from the recipe corpus
+        
+        Args:
+            ingredients: Ingredients to pair with
+            limit: Most partners returned
+            
+        Returns:
+            {"ingredient", "score", "count"} records, best first
+        """
+        return self.ingredient_pairing.pairings(ingredients, limit=limit)
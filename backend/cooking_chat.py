@@ -10,9 +10,11 @@ import os
 import json
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
 from datetime import datetime
-import re
+import uuid
+from itertools import islice
+from collections import OrderedDict
 
 # AI/ML imports
 import numpy as np
@@ -22,9 +24,24 @@ import torch
 # Cooking-specific imports
 from cooking_prompts import COOKING_PROMPTS
 from cooking_models import CookingModels
+from conversation_context import ConversationContextManager
+from conversation_log import ConversationLog
+from message_features import MessageFeatures, MessageFeatureExtractor
+from ingredient_pairing import IngredientPairing
 
 logger = logging.getLogger(__name__)
 
+# Session id of the shared session used by messages without one; clients may not use it
+DEFAULT_SESSION_ID = "default"
+
+
+def check_session_id(session_id: Optional[str]) -> Optional[str]:
+    """Reject client session ids that would share the default session's log"""
+    if session_id == DEFAULT_SESSION_ID:
+        raise ValueError(f"Session id \"{DEFAULT_SESSION_ID}\" is reserved")
+    return session_id
+
+
 class CookingChatInterface:
     """
     Specialized chat interface for cooking-related conversations.
@@ -40,10 +57,23 @@ class CookingChatInterface:
     
     def __init__(self):
         self.models = CookingModels()
+        self.context_manager = ConversationContextManager(token_counter=self.models.count_tokens,
+                                                          tokenizer_identity=self.models.tokenizer_identity)
+        self.conversation_log = ConversationLog()
         self.is_initialized = False
         self.conversation_history = []
         self.cooking_context = {}
         self.user_preferences = {}
+        # Sessions by id, least recently used first; evicted ones are restored from the log
+        self.sessions = OrderedDict()
+        self.max_sessions = 4096
+        # Open sockets per session id; sessions in use are neither evicted nor closed early
+        self.session_sockets = {}
+        # Sessions whose history is being read from the log, so concurrent messages wait for it
+        self._session_loads = {}
+        self.default_session = self._new_default_session()
+        # Co-occurrence statistics of the recipe corpus; shared with CookingAI at startup
+        self.ingredient_pairing = IngredientPairing()
         
         # Cooking-specific conversation patterns
         self.cooking_patterns = {
@@ -65,7 +95,10 @@ class CookingChatInterface:
                 r"substitute.*",
                 r"alternative.*to.*",
                 r"where.*buy.*",
-                r"how.*store.*"
+                r"how.*store.*",
+                r"goes?\s+(?:well\s+)?with",
+                r"pair.*with",
+                r"complement.*"
             ],
             "safety_questions": [
                 r"safe.*to.*eat.*",
@@ -106,6 +139,11 @@ class CookingChatInterface:
                 }
             }
         }
+        
+        # Entity vocabularies matched once per message
+        self.food_items = ["chicken", "beef", "pork", "fish", "pasta", "rice", "vegetables", "soup", "salad"]
+        self.recipe_words = ["cook", "make", "recipe", "ingredients", "instructions", "steps"]
+        self.feature_extractor = self._build_feature_extractor()
     
     async def initialize(self):
         """Initialize the cooking chat interface"""
@@ -117,11 +155,17 @@ class CookingChatInterface:
             
             # Load cooking knowledge
             await self._load_cooking_knowledge()
+            self.feature_extractor = self._build_feature_extractor()
+            
+            # Start the durable conversation log
+            await self.conversation_log.start()
             
             # Initialize conversation context
             self.conversation_history = []
             self.cooking_context = {}
             self.user_preferences = {}
+            self.sessions = OrderedDict()
+            self.default_session = self._new_default_session()
             
             self.is_initialized = True
             logger.info("✅ Cooking Chat Interface initialized successfully!")
@@ -138,10 +182,14 @@ class CookingChatInterface:
             # Cleanup models
             await self.models.cleanup()
             
+            # Flush the conversation log
+            await self.conversation_log.stop()
+            
             # Clear conversation data
             self.conversation_history.clear()
             self.cooking_context.clear()
             self.user_preferences.clear()
+            self.sessions.clear()
             
             self.is_initialized = False
             logger.info("✅ Cooking Chat Interface cleanup complete!")
@@ -177,8 +225,138 @@ class CookingChatInterface:
             except Exception as e:
                 logger.error(f"❌ Error loading {file_path}: {str(e)}")
     
+    def _build_feature_extractor(self) -> MessageFeatureExtractor:
+        """Compile message patterns and entity vocabularies for feature extraction"""
+        return MessageFeatureExtractor(
+            intent_patterns=self.cooking_patterns,
+            vocabularies={
+                "food_items": self.food_items,
+                "techniques": list(self.cooking_knowledge["basic_techniques"].keys()),
+                "ingredients": list(self.cooking_knowledge["common_substitutions"].keys()),
+                "recipe_keywords": self.recipe_words
+            }
+        )
+    
+    def _new_default_session(self) -> Dict[str, Any]:
+        """Create the shared session used by messages without a session id"""
+        return {
+            "session_id": DEFAULT_SESSION_ID,
+            "history": self.conversation_history,
+            "context": self.cooking_context,
+            "user_preferences": self.user_preferences,
+            "facts": self.context_manager.new_facts(),
+            "history_tokens": 0
+        }
+    
+    def _get_session(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get the conversation state for a session (the shared default when no id is given)"""
+        if session_id is None:
+            return self.default_session
+        
+        if session_id in self.sessions:
+            self.sessions.move_to_end(session_id)
+        else:
+            self.sessions[session_id] = {
+                "session_id": session_id,
+                "history": [],
+                "context": {},
+                "user_preferences": {},
+                "facts": self.context_manager.new_facts(),
+                "history_tokens": 0
+            }
+            self._evict_sessions()
+        return self.sessions[session_id]
+    
+    def _evict_sessions(self):
+        """Drop the least recently used sessions beyond max_sessions; their history stays in the log"""
+        if len(self.sessions) <= self.max_sessions:
+            return
+        idle = [session_id for session_id in self.sessions if session_id not in self.session_sockets]
+        for session_id in idle[:len(self.sessions) - self.max_sessions]:
+            del self.sessions[session_id]
+    
+    async def _load_session(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get a session, restoring its history from the conversation log if it is not in memory"""
+        check_session_id(session_id)
+        if session_id is None or session_id in self.sessions:
+            return self._get_session(session_id)
+        
+        # One log read per session; messages arriving meanwhile wait for it instead of
+        # recording turns ahead of the restored history
+        loading = self._session_loads.get(session_id)
+        if loading is None:
+            loading = asyncio.ensure_future(self._restore_session(session_id))
+            self._session_loads[session_id] = loading
+            loading.add_done_callback(lambda _: self._session_loads.pop(session_id, None))
+        return await asyncio.shield(loading)
+    
+    async def _restore_session(self, session_id: str) -> Dict[str, Any]:
+        """Read a session's turns from the conversation log, then register it"""
+        turns = []
+        if self.conversation_log.has_session(session_id):
+            turns = await self.conversation_log.read_session(session_id)
+        
+        # Registered only after the read, so nothing is recorded ahead of the restored turns
+        restored = session_id not in self.sessions
+        session = self._get_session(session_id)
+        if restored and turns:
+            for turn in turns:
+                session["history"].append(turn)
+                self.context_manager.record_turn(session, turn)
+            logger.info(f"📒 Restored {len(turns)} turns for session {session_id}")
+        return session
+    
+    async def open_session(self, session_id: Optional[str] = None) -> str:
+        """Open a conversation session, generating an id when none is given"""
+        session_id = check_session_id(session_id) or uuid.uuid4().hex
+        self.session_sockets[session_id] = self.session_sockets.get(session_id, 0) + 1
+        await self._load_session(session_id)
+        logger.info(f"🔌 Opened chat session {session_id}")
+        return session_id
+    
+    def close_session(self, session_id: str):
+        """Release the in-memory state of a conversation session once no socket uses it"""
+        sockets = self.session_sockets.get(session_id, 0) - 1
+        if sockets > 0:
+            self.session_sockets[session_id] = sockets
+            logger.info(f"🔌 Closed a socket on chat session {session_id}; {sockets} still open")
+            return
+        self.session_sockets.pop(session_id, None)
+        self.sessions.pop(session_id, None)
+        logger.info(f"🔌 Closed chat session {session_id}")
+    
+    def _record_user_message(self, session: Dict[str, Any], message: str,
+                             context: Optional[Dict[str, Any]] = None,
+                             user_preferences: Optional[Dict[str, Any]] = None):
+        """Update session context and preferences and add the user message to its history"""
+        if context:
+            session["context"].update(context)
+        if user_preferences:
+            session["user_preferences"].update(user_preferences)
+        
+        turn = {
+            "role": "user",
+            "content": message,
+            "timestamp": datetime.now().isoformat()
+        }
+        session["history"].append(turn)
+        self.context_manager.record_turn(session, turn)
+        self.conversation_log.append(session["session_id"], turn)
+    
+    def _record_assistant_response(self, session: Dict[str, Any], response: Dict[str, Any]):
+        """Add an assistant response to the session history"""
+        turn = {
+            "role": "assistant",
+            "content": response["response"],
+            "timestamp": datetime.now().isoformat()
+        }
+        session["history"].append(turn)
+        self.context_manager.record_turn(session, turn)
+        self.conversation_log.append(session["session_id"], turn)
+    
     async def process_message(self, message: str, context: Optional[Dict[str, Any]] = None,
-                            user_preferences: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                            user_preferences: Optional[Dict[str, Any]] = None,
+                            session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a cooking-related message and generate a response
         
@@ -186,6 +364,7 @@ class CookingChatInterface:
             message: User's cooking-related question or message
             context: Additional context (recipe, ingredients, etc.)
             user_preferences: User's cooking preferences
+            session_id: Optional conversation session id
         
         Returns:
             Dictionary containing response and additional information
@@ -193,88 +372,224 @@ class CookingChatInterface:
         logger.info(f"💬 Processing cooking message: {message[:50]}...")
         
         try:
-            # Update context and preferences
-            if context:
-                self.cooking_context.update(context)
-            if user_preferences:
-                self.user_preferences.update(user_preferences)
+            session = await self._load_session(session_id)
             
-            # Add message to conversation history
-            self.conversation_history.append({
-                "role": "user",
-                "content": message,
-                "timestamp": datetime.now().isoformat()
-            })
+            # Update context and preferences, add message to conversation history
+            self._record_user_message(session, message, context, user_preferences)
             
-            # Analyze message type
-            message_type = self._analyze_message_type(message)
+            # Normalize and analyze the message once for every handler
+            features = self.feature_extractor.extract(message)
             
-            # Generate response based on message type
-            if message_type == "recipe_question":
-                response = await self._handle_recipe_question(message)
-            elif message_type == "technique_question":
-                response = await self._handle_technique_question(message)
-            elif message_type == "ingredient_question":
-                response = await self._handle_ingredient_question(message)
-            elif message_type == "safety_question":
-                response = await self._handle_safety_question(message)
+            # Generate response based on message type; general questions use the model when it is loaded
+            if self._uses_model(features):
+                response = (await self._generate_general_responses([session], [message], [features]))[0]
             else:
-                response = await self._handle_general_cooking_question(message)
+                response = await self._dispatch_message(features)
             
             # Add response to conversation history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": response["response"],
-                "timestamp": datetime.now().isoformat()
-            })
+            self._record_assistant_response(session, response)
             
             return response
             
         except Exception as e:
             logger.error(f"❌ Error processing cooking message: {str(e)}")
-            return {
-                "response": "I'm sorry, I'm having trouble processing your cooking question right now. Please try again!",
-                "suggestions": ["Ask about a specific recipe", "Ask about cooking techniques", "Ask about ingredients"],
-                "confidence": 0.0,
-                "related_topics": ["cooking basics", "recipe help", "ingredient information"]
-            }
+            return self._error_response()
     
-    def _analyze_message_type(self, message: str) -> str:
-        """Analyze the type of cooking question being asked"""
-        message_lower = message.lower()
+    async def stream_message(self, message: str, context: Optional[Dict[str, Any]] = None,
+                             user_preferences: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a cooking message, yielding response text as it is produced
+        
+        Args:
+            message: User's cooking-related question or message
+            context: Additional context (recipe, ingredients, etc.)
+            user_preferences: User's cooking preferences
+            session_id: Optional conversation session id
         
-        # Check for recipe-related questions
-        for pattern in self.cooking_patterns["recipe_questions"]:
-            if re.search(pattern, message_lower):
-                return "recipe_question"
+        Yields:
+            {"type": "token", "text": ...} events followed by a final
+            {"type": "done", ...} (or {"type": "error", ...}) event carrying the full response
+        """
+        logger.info(f"💬 Streaming cooking message: {message[:50]}...")
         
-        # Check for technique-related questions
-        for pattern in self.cooking_patterns["technique_questions"]:
-            if re.search(pattern, message_lower):
-                return "technique_question"
+        try:
+            session = await self._load_session(session_id)
+            self._record_user_message(session, message, context, user_preferences)
+            
+            features = self.feature_extractor.extract(message)
+            
+            if self._uses_model(features):
+                # Push model output to the client token by token
+                prompt_context = {**session["context"], **self.context_manager.build_prompt_context(session)}
+                chunks = []
+                async for chunk in self.models.stream_cooking_response(message, prompt_context):
+                    chunks.append(chunk)
+                    yield {"type": "token", "text": chunk}
+                
+                response = await self._handle_general_cooking_question(features)
+                generated_text = "".join(chunks).strip()
+                if generated_text:
+                    response["response"] = generated_text
+            else:
+                # Knowledge-backed answers are produced in one piece
+                response = await self._dispatch_message(features)
+                yield {"type": "token", "text": response["response"]}
+            
+            self._record_assistant_response(session, response)
+            
+            yield {"type": "done", **response}
+            
+        except Exception as e:
+            logger.error(f"❌ Error streaming cooking message: {str(e)}")
+            yield {"type": "error", **self._error_response()}
+    
+    async def process_messages(self, items: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a batch of cooking messages, yielding responses in input order
         
-        # Check for ingredient-related questions
-        for pattern in self.cooking_patterns["ingredient_questions"]:
-            if re.search(pattern, message_lower):
-                return "ingredient_question"
+        Classification runs for the whole batch up front. Each run of
+        consecutive general questions that need the conversation model is
+        answered by a single batched generation call; a run holds at most one
+        message per session, so every prompt is built after all earlier turns
+        of its session have been recorded. Sessions are restored from the log
+        as their messages come up, and a message that fails (including its
+        session's restore) yields an error response with an "error" field.
         
-        # Check for safety-related questions
-        for pattern in self.cooking_patterns["safety_questions"]:
-            if re.search(pattern, message_lower):
-                return "safety_question"
+        Args:
+            items: Dictionaries with "message" and optional "session_id",
+                "context" and "user_preferences"
         
-        return "general_cooking"
+        Yields:
+            Response dictionaries, one per item, in the same order as items
+        """
+        logger.info(f"💬 Processing batch of {len(items)} cooking messages...")
+        
+        # Normalize and classify the whole batch in one pass
+        batch_features = [self.feature_extractor.extract(item["message"]) for item in items]
+        
+        index = 0
+        while index < len(items):
+            if not self._uses_model(batch_features[index]):
+                yield await self._process_batch_item(index, items[index], batch_features[index])
+                index += 1
+                continue
+            
+            # At most max_sessions per run, so loading one run's sessions never evicts another of them
+            run = [index]
+            run_sessions = {items[index].get("session_id")}
+            while (run[-1] + 1 < len(items) and len(run) < self.max_sessions
+                   and self._uses_model(batch_features[run[-1] + 1])
+                   and items[run[-1] + 1].get("session_id") not in run_sessions):
+                run.append(run[-1] + 1)
+                run_sessions.add(items[run[-1]].get("session_id"))
+            
+            for response in await self._process_general_run(run, [items[i] for i in run], [batch_features[i] for i in run]):
+                yield response
+            index = run[-1] + 1
     
-    async def _handle_recipe_question(self, message: str) -> Dict[str, Any]:
-        """Handle recipe-related questions"""
-        message_lower = message.lower()
+    async def _process_batch_item(self, index: int, item: Dict[str, Any], features: MessageFeatures) -> Dict[str, Any]:
+        """Answer one batched message with its knowledge-backed handler"""
+        try:
+            session = await self._load_session(item.get("session_id"))
+            self._record_user_message(session, item["message"], item.get("context"), item.get("user_preferences"))
+            response = await self._dispatch_message(features)
+            self._record_assistant_response(session, response)
+            return response
+        except Exception as e:
+            logger.error(f"❌ Error processing batched cooking message {index}: {str(e)}")
+            return self._error_response(e)
+    
+    async def _process_general_run(self, indices: List[int], items: List[Dict[str, Any]],
+                                   batch_features: List[MessageFeatures]) -> List[Dict[str, Any]]:
+        """Answer a run of general questions from distinct sessions with one model call"""
+        responses = [None] * len(items)
+        sessions, ready = [], []
+        for position, item in enumerate(items):
+            # Restore each session just before its turn is recorded; a failed one only fails its own line
+            try:
+                session = await self._load_session(item.get("session_id"))
+                self._record_user_message(session, item["message"], item.get("context"), item.get("user_preferences"))
+            except Exception as e:
+                logger.error(f"❌ Error processing batched cooking message {indices[position]}: {str(e)}")
+                responses[position] = self._error_response(e)
+                continue
+            sessions.append(session)
+            ready.append(position)
         
+        if ready:
+            try:
+                generated = await self._generate_general_responses(sessions, [items[i]["message"] for i in ready],
+                                                                   [batch_features[i] for i in ready])
+                for session, position, response in zip(sessions, ready, generated):
+                    self._record_assistant_response(session, response)
+                    responses[position] = response
+            except Exception as e:
+                logger.error(f"❌ Error processing batched general cooking messages: {str(e)}")
+                for position in ready:
+                    responses[position] = self._error_response(e)
+        return responses
+    
+    def _uses_model(self, features: MessageFeatures) -> bool:
+        """Check whether a message is answered by the conversation model rather than a handler"""
+        return features.message_type == "general_cooking" and "cooking_conversation" in self.models.models
+    
+    async def _generate_general_responses(self, sessions: List[Dict[str, Any]], messages: List[str],
+                                          batch_features: List[MessageFeatures]) -> List[Dict[str, Any]]:
+        """Answer general cooking questions, already recorded in their sessions, with one model call"""
+        # Bound each prompt with compacted facts plus the recent turns that fit the budget
+        contexts = [{**session["context"], **self.context_manager.build_prompt_context(session)}
+                    for session in sessions]
+        
+        texts = await self.models.generate_cooking_responses(messages, contexts)
+        
+        responses = []
+        for features, text in zip(batch_features, texts):
+            response = await self._handle_general_cooking_question(features)
+            if text:
+                response["response"] = text
+            responses.append(response)
+        
+        return responses
+    
+    async def _dispatch_message(self, features: MessageFeatures) -> Dict[str, Any]:
+        """Route a classified message to its handler"""
+        message_type = features.message_type
+        if message_type == "recipe_question":
+            return await self._handle_recipe_question(features)
+        elif message_type == "technique_question":
+            return await self._handle_technique_question(features)
+        elif message_type == "ingredient_question":
+            return await self._handle_ingredient_question(features)
+        elif message_type == "safety_question":
+            return await self._handle_safety_question(features)
+        else:
+            return await self._handle_general_cooking_question(features)
+    
+    def _error_response(self, error: Optional[Exception] = None) -> Dict[str, Any]:
+        """Response returned when a message cannot be processed (with the error, for batch lines)"""
+        response = {
+            "response": "I'm sorry, I'm having trouble processing your cooking question right now. Please try again!",
+            "suggestions": ["Ask about a specific recipe", "Ask about cooking techniques", "Ask about ingredients"],
+            "confidence": 0.0,
+            "related_topics": ["cooking basics", "recipe help", "ingredient information"]
+        }
+        if error is not None:
+            response["error"] = str(error)
+        return response
+    
+    def _analyze_message_type(self, message: str) -> str:
+        """Analyze the type of cooking question being asked"""
+        return self.feature_extractor.extract(message).message_type
+    
+    async def _handle_recipe_question(self, features: MessageFeatures) -> Dict[str, Any]:
+        """Handle recipe-related questions"""
         # Extract recipe-related keywords
-        recipe_keywords = self._extract_recipe_keywords(message)
+        recipe_keywords = self._extract_recipe_keywords(features)
         
         # Generate recipe-focused response
-        if "how to cook" in message_lower or "how to make" in message_lower:
-            food_item = self._extract_food_item(message)
+        if features.contains("how to cook", "how to make"):
+            food_item = self._extract_food_item(features)
             response = f"To cook {food_item}, here's a basic approach:\n\n"
             response += await self._get_cooking_instructions(food_item)
             
@@ -284,8 +599,8 @@ class CookingChatInterface:
                 "Consider pairing with complementary ingredients"
             ]
             
-        elif "recipe for" in message_lower:
-            food_item = self._extract_food_item(message)
+        elif features.contains("recipe for"):
+            food_item = self._extract_food_item(features)
             response = f"Here's a simple recipe for {food_item}:\n\n"
             response += await self._get_recipe_suggestion(food_item)
             
@@ -310,12 +625,10 @@ class CookingChatInterface:
             "related_topics": ["cooking techniques", "ingredient preparation", "recipe variations"]
         }
     
-    async def _handle_technique_question(self, message: str) -> Dict[str, Any]:
+    async def _handle_technique_question(self, features: MessageFeatures) -> Dict[str, Any]:
         """Handle cooking technique questions"""
-        message_lower = message.lower()
-        
         # Extract technique keywords
-        technique = self._extract_cooking_technique(message)
+        technique = self._extract_cooking_technique(features)
         
         if technique and technique in self.cooking_knowledge["basic_techniques"]:
             description = self.cooking_knowledge["basic_techniques"][technique]
@@ -344,14 +657,37 @@ class CookingChatInterface:
             "related_topics": ["cooking methods", "equipment", "temperature control"]
         }
     
-    async def _handle_ingredient_question(self, message: str) -> Dict[str, Any]:
+    async def _handle_ingredient_question(self, features: MessageFeatures) -> Dict[str, Any]:
         """Handle ingredient-related questions"""
-        message_lower = message.lower()
-        
         # Extract ingredient keywords
-        ingredient = self._extract_ingredient(message)
+        ingredient = self._extract_ingredient(features)
+        
+        if features.contains("go with", "goes with", "go well with", "goes well with", "pair", "complement"):
+            ingredients = self.ingredient_pairing.ingredients_in(features.text_lower)
+            pairings = self.ingredient_pairing.pairings(ingredients, limit=5) if ingredients else []
+            if pairings:
+                response = f"Ingredients that go well with {' and '.join(ingredients)}:\n"
+                for pairing in pairings:
+                    if len(ingredients) == 1:
+                        recipes = "recipe" if pairing["count"] == 1 else "recipes"
+                        response += f"• {pairing['ingredient']} (used together in {pairing['count']} {recipes})\n"
+                    else:
+                        response += f"• {pairing['ingredient']}\n"
+                
+                suggestions = [
+                    f"Find recipes with {ingredients[0]} and {pairings[0]['ingredient']}",
+                    "Balance rich ingredients with acid or fresh herbs",
+                    "Taste as you combine new flavors"
+                ]
+            else:
+                response = "I can suggest flavor pairings! Which ingredient would you like to pair?"
+                suggestions = [
+                    "Ask what goes with tomato",
+                    "Ask what goes with chicken",
+                    "Ask what pairs with garlic and lemon"
+                ]
         
-        if "substitute" in message_lower or "alternative" in message_lower:
+        elif features.contains("substitute", "alternative"):
             if ingredient and ingredient in self.cooking_knowledge["common_substitutions"]:
                 substitutes = self.cooking_knowledge["common_substitutions"][ingredient]
                 response = f"For {ingredient}, you can substitute with:\n"
@@ -371,7 +707,7 @@ class CookingChatInterface:
                     "Ask about flour substitutes"
                 ]
         
-        elif "what is" in message_lower:
+        elif features.contains("what is"):
             if ingredient:
                 response = f"**{ingredient.title()}** is a common ingredient used in cooking. "
                 response += await self._get_ingredient_description(ingredient)
@@ -404,12 +740,10 @@ class CookingChatInterface:
             "related_topics": ["ingredient properties", "substitutions", "storage tips"]
         }
     
-    async def _handle_safety_question(self, message: str) -> Dict[str, Any]:
+    async def _handle_safety_question(self, features: MessageFeatures) -> Dict[str, Any]:
         """Handle food safety questions"""
-        message_lower = message.lower()
-        
-        if "temperature" in message_lower:
-            food_item = self._extract_food_item(message)
+        if features.contains("temperature"):
+            food_item = self._extract_food_item(features)
             if food_item and food_item in self.cooking_knowledge["food_safety"]["meat_temperature"]:
                 temp = self.cooking_knowledge["food_safety"]["meat_temperature"][food_item]
                 response = f"For {food_item}, the safe internal temperature is **{temp}**. "
@@ -433,7 +767,7 @@ class CookingChatInterface:
                     "When in doubt, cook longer"
                 ]
         
-        elif "expired" in message_lower or "spoiled" in message_lower:
+        elif features.contains("expired", "spoiled"):
             response = "**When in doubt, throw it out!** This is the golden rule of food safety. "
             response += "If you're unsure about food safety, it's better to be safe than sorry. "
             response += "Look for signs of spoilage like unusual odors, colors, or textures."
@@ -464,7 +798,7 @@ class CookingChatInterface:
             "related_topics": ["food safety", "cooking temperatures", "food storage"]
         }
     
-    async def _handle_general_cooking_question(self, message: str) -> Dict[str, Any]:
+    async def _handle_general_cooking_question(self, features: MessageFeatures) -> Dict[str, Any]:
         """Handle general cooking questions"""
         response = "I'm here to help with all your cooking questions! I can assist with:\n\n"
         response += "• **Recipes**: How to cook specific dishes\n"
@@ -488,48 +822,23 @@ class CookingChatInterface:
             "related_topics": ["cooking basics", "recipe help", "cooking tips"]
         }
     
-    def _extract_recipe_keywords(self, message: str) -> List[str]:
+    def _extract_recipe_keywords(self, features: MessageFeatures) -> List[str]:
         """Extract recipe-related keywords from message"""
-        keywords = []
-        recipe_words = ["cook", "make", "recipe", "ingredients", "instructions", "steps"]
-        
-        for word in recipe_words:
-            if word in message.lower():
-                keywords.append(word)
-        
-        return keywords
+        return features.entities("recipe_keywords")
     
-    def _extract_food_item(self, message: str) -> str:
+    def _extract_food_item(self, features: MessageFeatures) -> str:
         """Extract food item from message"""
         # Simple extraction - in a real implementation, this would be more sophisticated
-        food_items = ["chicken", "beef", "pork", "fish", "pasta", "rice", "vegetables", "soup", "salad"]
-        
-        for food in food_items:
-            if food in message.lower():
-                return food
-        
-        return "this dish"
+        return features.first_entity("food_items", "this dish")
     
-    def _extract_cooking_technique(self, message: str) -> str:
+    def _extract_cooking_technique(self, features: MessageFeatures) -> str:
         """Extract cooking technique from message"""
-        techniques = list(self.cooking_knowledge["basic_techniques"].keys())
-        
-        for technique in techniques:
-            if technique in message.lower():
-                return technique
-        
-        return ""
+        return features.first_entity("techniques")
     
-    def _extract_ingredient(self, message: str) -> str:
+    def _extract_ingredient(self, features: MessageFeatures) -> str:
         """Extract ingredient from message"""
         # Simple extraction - in a real implementation, this would be more sophisticated
-        ingredients = list(self.cooking_knowledge["common_substitutions"].keys())
-        
-        for ingredient in ingredients:
-            if ingredient in message.lower():
-                return ingredient
-        
-        return ""
+        return features.first_entity("ingredients")
     
     async def _get_cooking_instructions(self, food_item: str) -> str:
         """Get basic cooking instructions for a food item"""
@@ -571,11 +880,49 @@ class CookingChatInterface:
         
         return descriptions.get(ingredient, f"a common ingredient used in various recipes and cooking techniques.")
     
-    def get_conversation_history(self) -> List[Dict[str, Any]]:
-        """Get conversation history"""
-        return self.conversation_history.copy()
+    async def get_conversation_history(self, session_id: Optional[str] = None, offset: int = 0,
+                                       limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get a page of conversation history
+        
+        Args:
+            session_id: Optional conversation session id
+            offset: Index of the first turn to return
+            limit: Maximum number of turns to return (all remaining when None)
+        
+        Returns:
+            The requested turns, oldest first. Turns compacted out of memory are
+            read from the conversation log; only the page is copied
+        """
+        check_session_id(session_id)
+        if session_id is not None and session_id not in self.sessions \
+                and not self.conversation_log.has_session(session_id):
+            return []
+        # Sessions not in memory (after a restart or eviction) are restored from the log
+        session = await self._load_session(session_id)
+        history = session["history"]
+        stop = offset + limit if limit is not None else None
+        
+        # In memory are the turns from index start on; earlier ones were compacted away
+        start = session.get("compacted_turns", 0)
+        page = []
+        if offset < start:
+            await self.conversation_log.flush()
+            logged = await self.conversation_log.read_session(session["session_id"])
+            # The log holds the latest turns; any it trimmed itself are gone
+            first = start + len(history) - len(logged)
+            end = start if stop is None else min(stop, start)
+            page = logged[max(offset - first, 0):max(end - first, 0)]
+        if stop is None or stop > start:
+            page.extend(islice(history, max(offset - start, 0), None if stop is None else stop - start))
+        return page
     
-    def clear_conversation_history(self):
+    def clear_conversation_history(self, session_id: Optional[str] = None):
         """Clear conversation history"""
-        self.conversation_history.clear()
+        session = self._get_session(session_id)
+        session["history"].clear()
+        session["facts"] = self.context_manager.new_facts()
+        session["history_tokens"] = 0
+        session["compacted_turns"] = 0
+        self.conversation_log.clear(session["session_id"])
         logger.info("🗑️ Conversation history cleared")
@@ -15,6 +15,8 @@ from datetime import datetime
 import sqlite3
 from pathlib import Path
 
+from ingredient_resolver import IngredientResolver
+
 logger = logging.getLogger(__name__)
 
 class CookingKnowledgeBase:
@@ -47,6 +49,7 @@ class CookingKnowledgeBase:
             "recipes": {},
             "substitutions": {}
         }
+        self.ingredient_resolver = IngredientResolver({})
     
     async def initialize(self):
         """Initialize the cooking knowledge base"""
@@ -86,6 +89,7 @@ class CookingKnowledgeBase:
             self.knowledge_data.clear()
             for category in self.categories:
                 self.categories[category].clear()
+            self.ingredient_resolver = IngredientResolver({})
             
             self.is_initialized = False
             logger.info("✅ Cooking Knowledge Base cleanup complete!")
@@ -243,6 +247,7 @@ class CookingKnowledgeBase:
         ingredients = self.knowledge_data.get("ingredients", {})
         for ingredient_name, ingredient_data in ingredients.items():
             self.categories["ingredients"][ingredient_name.lower()] = ingredient_data
+        self.ingredient_resolver = IngredientResolver.from_database(self.categories["ingredients"])
         
         logger.info(f"✅ Loaded {len(self.categories['ingredients'])} ingredients")
     
@@ -303,6 +308,11 @@ class CookingKnowledgeBase:
         if ingredient_lower in self.categories["ingredients"]:
             return self.categories["ingredients"][ingredient_lower]
         
+        # "2 tbsp unsalted butter, melted" -> "butter"
+        canonical_name = self.ingredient_resolver.resolve_one(ingredient_name)
+        if canonical_name:
+            return self.categories["ingredients"][canonical_name]
+        
         # Try to find similar ingredients
         similar_ingredients = self._find_similar_ingredients(ingredient_name)
         
@@ -394,14 +404,8 @@ class CookingKnowledgeBase:
     
     def _find_similar_ingredients(self, ingredient_name: str) -> List[str]:
         """Find similar ingredients"""
-        similar = []
-        ingredient_lower = ingredient_name.lower()
-        
-        for name in self.categories["ingredients"].keys():
-            if ingredient_lower in name or name in ingredient_lower:
-                similar.append(name)
-        
-        return similar[:5]  # Return top 5 similar ingredients
+        # Top 5 similar ingredients, best match first
+        return [name for name, _ in self.ingredient_resolver.resolve(ingredient_name, limit=5)]
     
     def _get_common_substitutions(self, ingredient_name: str) -> List[str]:
         """Get common substitutions based on ingredient type"""
@@ -10,12 +10,31 @@ import os
 import json
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
 import torch
-from transformers import pipeline, AutoTokenizer, AutoModel, AutoProcessor
+from transformers import pipeline, AutoTokenizer, AutoModel, AutoProcessor, TextIteratorStreamer
+
+from conversation_context import approximate_token_count
+from recipe_parser import RecipeParser, recipe_windows
+from recipe_recommender import cooking_minutes
 
 logger = logging.getLogger(__name__)
 
+def enable_batching(generator):
+    """
+    Let a text-generation pipeline pad a batch of prompts
+
+    GPT-2 style tokenizers (DialoGPT) have no pad token, and a pipeline
+    without one refuses to batch. Pad with end-of-text, on the left so every
+    prompt still ends right where generation starts.
+    """
+    tokenizer = generator.tokenizer
+    if tokenizer.pad_token_id is None:
+        tokenizer.pad_token_id = tokenizer.eos_token_id
+    tokenizer.padding_side = "left"
+    generator.model.generation_config.pad_token_id = tokenizer.pad_token_id
+
+
 class CookingModels:
     """
     Manages AI models for cooking-specific tasks.
@@ -39,7 +58,10 @@ class CookingModels:
                 "model_name": "microsoft/DialoGPT-medium",
                 "task": "text-generation",
                 "max_length": 512,
-                "temperature": 0.7
+                "temperature": 0.7,
+                # Longer prompts are analyzed in windows of this many tokens, in batches of batch_size
+                "chunk_tokens": 320,
+                "batch_size": 8
             },
             "food_recognition": {
                 "model_name": "microsoft/beit-base-patch16-224-pt22k-ft22k",
@@ -50,16 +72,21 @@ class CookingModels:
                 "model_name": "microsoft/DialoGPT-small",
                 "task": "text-generation",
                 "max_length": 256,
-                "temperature": 0.5
+                "temperature": 0.5,
+                "batch_size": 16
             },
             "cooking_conversation": {
                 "model_name": "microsoft/DialoGPT-medium",
                 "task": "text-generation",
                 "max_length": 1024,
-                "temperature": 0.8
+                "temperature": 0.8,
+                "batch_size": 8
             }
         }
         
+        # Deterministic ingredient parsing runs before any extraction model
+        self.recipe_parser = RecipeParser()
+        
         # Cooking-specific model paths (for fine-tuned models)
         self.cooking_model_paths = {
             "recipe_analyzer": "models/cooking/recipe_analyzer",
@@ -133,6 +160,7 @@ class CookingModels:
                         model=config["model_name"],
                         device=0 if torch.cuda.is_available() else -1
                     )
+                    enable_batching(model)
                     self.models[task_name] = model
                     
                 elif config["task"] == "image-classification":
@@ -228,35 +256,161 @@ class CookingModels:
         except Exception as e:
             logger.error(f"❌ Error generating cooking response: {str(e)}")
             return self._fallback_cooking_response(prompt)
+
+    async def generate_cooking_responses(self, prompts: List[str],
+                                         contexts: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[str]:
+        """
+        Generate cooking-focused responses for many prompts in one batched model call
+
+        Args:
+            prompts: User cooking questions or prompts
+            contexts: Optional per-prompt context, aligned with prompts
+
+        Returns:
+            Generated cooking responses, in the same order as prompts
+        """
+        if not prompts:
+            return []
+
+        try:
+            if "cooking_conversation" not in self.models:
+                return [self._fallback_cooking_response(prompt) for prompt in prompts]
+
+            contexts = contexts or [None] * len(prompts)
+            cooking_prompts = [
+                self._prepare_cooking_prompt(prompt, context)
+                for prompt, context in zip(prompts, contexts)
+            ]
+
+            # Run the whole batch through the pipeline at once
+            config = self.model_configs["cooking_conversation"]
+            loop = asyncio.get_running_loop()
+            responses = await loop.run_in_executor(
+                None,
+                lambda: self.models["cooking_conversation"](
+                    cooking_prompts,
+                    max_length=config["max_length"],
+                    temperature=config["temperature"],
+                    do_sample=True,
+                    batch_size=config.get("batch_size", 8)
+                )
+            )
+
+            # Extract and clean each response
+            results = []
+            for prompt, response in zip(prompts, responses):
+                # Pipelines return a list of candidates per input when given a list
+                candidate = response[0] if isinstance(response, list) else response
+                results.append(self._extract_cooking_response(candidate["generated_text"], prompt))
+
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ Error generating batched cooking responses: {str(e)}")
+            return [self._fallback_cooking_response(prompt) for prompt in prompts]
+
+    async def stream_cooking_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """
+        Stream a cooking-focused response from the conversation model as text is produced
+        
+        Args:
+            prompt: User's cooking question or prompt
+            context: Additional context for the response
+        
+        Yields:
+            Chunks of the generated response
+        """
+        if "cooking_conversation" not in self.models:
+            yield self._fallback_cooking_response(prompt)
+            return
+        
+        try:
+            generator = self.models["cooking_conversation"]
+            config = self.model_configs["cooking_conversation"]
+            cooking_prompt = self._prepare_cooking_prompt(prompt, context)
+            
+            # Generation runs in a worker thread and hands text over through the streamer
+            streamer = TextIteratorStreamer(generator.tokenizer, skip_prompt=True, skip_special_tokens=True)
+            inputs = generator.tokenizer(cooking_prompt, return_tensors="pt").to(generator.model.device)
+            
+            def generate():
+                try:
+                    generator.model.generate(
+                        **inputs,
+                        streamer=streamer,
+                        max_length=config["max_length"],
+                        temperature=config["temperature"],
+                        do_sample=True,
+                        pad_token_id=generator.tokenizer.eos_token_id
+                    )
+                except BaseException:
+                    # generate ends the stream when it finishes; a failed one must too, or the reader blocks forever
+                    streamer.end()
+                    raise
+            
+            loop = asyncio.get_running_loop()
+            generation = loop.run_in_executor(None, generate)
+            
+            chunks = iter(streamer)
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    yield chunk
+            
+            await generation
+            
+        except Exception as e:
+            logger.error(f"❌ Error streaming cooking response: {str(e)}")
+            yield self._fallback_cooking_response(prompt)
     
-    async def analyze_recipe_text(self, recipe_text: str) -> Dict[str, Any]:
+    async def analyze_recipe_text(self, recipe_text: str, chunked: Optional[bool] = None) -> Dict[str, Any]:
         """
         Analyze recipe text using the recipe analysis model
         
+        Recipes longer than the "chunk_tokens" budget are split into
+        section-aware windows that are analyzed in one batched model call and
+        merged, so long recipes are neither truncated nor slower per call.
+        
         Args:
             recipe_text: Recipe text to analyze
+            chunked: Force (True) or disable (False) windowed analysis; by default
+                only recipes over the budget are split
         
         Returns:
-            Analysis results
+            Analysis results, with "chunks" (model calls merged) and "truncated"
+            (the recipe did not fit a single, unchunked prompt)
         """
         try:
             if "recipe_analysis" not in self.models:
                 return self._fallback_recipe_analysis(recipe_text)
             
+            config = self.model_configs["recipe_analysis"]
+            budget = config.get("chunk_tokens", config["max_length"])
+            fits = self.count_tokens(recipe_text, "recipe_analysis") <= budget
+            if chunked or (chunked is None and not fits):
+                windows = recipe_windows(recipe_text, budget, lambda line: self.count_tokens(line, "recipe_analysis"))
+                return await self._analyze_recipe_windows(windows)
+            
             # Prepare recipe for analysis
             analysis_prompt = f"Analyze this recipe:\n\n{recipe_text}\n\nAnalysis:"
+            if not fits:
+                logger.warning("⚠️ Recipe exceeds the analysis prompt budget and will be truncated")
             
             # Generate analysis
             response = self.models["recipe_analysis"](
                 analysis_prompt,
-                max_length=self.model_configs["recipe_analysis"]["max_length"],
-                temperature=self.model_configs["recipe_analysis"]["temperature"],
+                max_length=config["max_length"],
+                temperature=config["temperature"],
                 do_sample=True
             )
             
             # Parse analysis results
             analysis_text = response[0]["generated_text"]
             analysis = self._parse_recipe_analysis(analysis_text)
+            analysis["chunks"] = 1
+            analysis["truncated"] = not fits
             
             return analysis
             
@@ -264,40 +418,161 @@ class CookingModels:
             logger.error(f"❌ Error analyzing recipe: {str(e)}")
             return self._fallback_recipe_analysis(recipe_text)
     
+    async def _analyze_recipe_windows(self, windows: List[str]) -> Dict[str, Any]:
+        """Analyze recipe windows in one batched model call and merge the results"""
+        config = self.model_configs["recipe_analysis"]
+        prompts = [
+            f"Analyze this recipe (part {number} of {len(windows)}):\n\n{window}\n\nAnalysis:"
+            for number, window in enumerate(windows, 1)
+        ]
+        
+        loop = asyncio.get_running_loop()
+        responses = await loop.run_in_executor(
+            None,
+            lambda: self.models["recipe_analysis"](
+                prompts,
+                max_length=config["max_length"],
+                temperature=config["temperature"],
+                do_sample=True,
+                batch_size=config.get("batch_size", 8)
+            )
+        )
+        
+        analyses = []
+        for response in responses:
+            # Pipelines return a list of candidates per input when given a list
+            candidate = response[0] if isinstance(response, list) else response
+            analyses.append(self._parse_recipe_analysis(candidate["generated_text"]))
+        return self._merge_recipe_analyses(analyses)
+    
+    def _merge_recipe_analyses(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge per-window analyses: hardest difficulty, longest time, summed counts, combined advice"""
+        defaults = self._parse_recipe_analysis("")
+        difficulty_order = ["easy", "intermediate", "hard"]
+        merged = dict(defaults, suggestions=[], tips=[], chunks=len(analyses), truncated=False)
+        
+        times = [a["cooking_time"] for a in analyses if a["cooking_time"] != defaults["cooking_time"]]
+        if times:
+            merged["cooking_time"] = max(times, key=lambda time: cooking_minutes(time) or 0.0)
+        merged["difficulty"] = max((a["difficulty"] for a in analyses), key=difficulty_order.index,
+                                   default=defaults["difficulty"])
+        merged["cuisine_type"] = next(
+            (a["cuisine_type"] for a in analyses if a["cuisine_type"] != defaults["cuisine_type"]),
+            defaults["cuisine_type"]
+        )
+        
+        for analysis in analyses:
+            merged["ingredients_count"] += analysis["ingredients_count"]
+            merged["steps_count"] += analysis["steps_count"]
+            for key in ("suggestions", "tips"):
+                merged[key].extend(item for item in analysis[key] if item not in merged[key])
+        return merged
+    
     async def extract_ingredients(self, text: str) -> List[Dict[str, Any]]:
         """
-        Extract ingredients from text using the ingredient extraction model
+        Extract ingredients from text, parsing lines deterministically and using the model only for the rest
         
         Args:
             text: Text containing ingredient information
         
         Returns:
-            List of extracted ingredients
+            List of extracted ingredients, each with its "source" and "line"
         """
+        return (await self.extract_ingredients_with_report(text))["ingredients"]
+    
+    async def extract_ingredients_with_report(self, text: str) -> Dict[str, Any]:
+        """
+        Extract ingredients line by line in a cascade
+        
+        Every line the recipe parser can read with confidence ("2 cups flour",
+        "salt to taste") is taken from the parser. Only the remaining lines,
+        including any the parser fails on, go to the ingredient extraction
+        model, all in one batched call; when the model is not loaded or fails
+        they get the fallback extraction.
+        
+        Args:
+            text: Text containing ingredient information
+        
+        Returns:
+            Dictionary with "ingredients" (each tagged with its "source" -
+            parser, model or fallback - and the index of its "line") and a
+            "report" of how many lines each stage handled and the model work saved
+        """
+        lines = self.recipe_parser.ingredient_lines(text)
+        ingredients = []
+        leftovers = []
+        for index, line in enumerate(lines):
+            try:
+                ingredient = self.recipe_parser.parse_ingredient_line_confidently(line)
+            except Exception as e:
+                # One odd line should not cost the whole recipe its ingredients
+                logger.warning(f"⚠️ Recipe parser failed on ingredient line {index}: {str(e)}")
+                ingredient = None
+            if ingredient:
+                ingredients.append(dict(ingredient, source="parser", line=index))
+            else:
+                leftovers.append((index, line))
+        
+        extracted, source = await self._extract_ingredient_lines([line for _, line in leftovers])
+        unparsed = 0
+        for (index, _), line_ingredients in zip(leftovers, extracted):
+            unparsed += not line_ingredients
+            ingredients.extend(dict(ingredient, source=source, line=index) for ingredient in line_ingredients)
+        ingredients.sort(key=lambda ingredient: ingredient["line"])
+        
+        parsed = len(lines) - len(leftovers)
+        model_lines = len(leftovers) if source == "model" else 0
+        batch_size = self.model_configs["ingredient_extraction"].get("batch_size", 16)
+        return {
+            "ingredients": ingredients,
+            "report": {
+                "lines": len(lines),
+                "parser_lines": parsed,
+                "model_lines": model_lines,
+                "fallback_lines": len(leftovers) - model_lines,
+                "unparsed_lines": unparsed,
+                "model_batches": -(-model_lines // batch_size),
+                "model_lines_saved": parsed,
+                "parser_coverage": round(parsed / len(lines), 3) if lines else 1.0
+            }
+        }
+    
+    async def _extract_ingredient_lines(self, lines: List[str]) -> Tuple[List[List[Dict[str, Any]]], str]:
+        """Extract the ingredients of each line in one batched model call, returning them with their source"""
+        if not lines:
+            return [], "model"
+        if "ingredient_extraction" not in self.models:
+            return [self._fallback_ingredient_extraction(line) for line in lines], "fallback"
+        
         try:
-            if "ingredient_extraction" not in self.models:
-                return self._fallback_ingredient_extraction(text)
+            config = self.model_configs["ingredient_extraction"]
+            prompts = [f"Extract ingredients from this text:\n\n{line}\n\nIngredients:" for line in lines]
             
-            # Prepare extraction prompt
-            extraction_prompt = f"Extract ingredients from this text:\n\n{text}\n\nIngredients:"
-            
-            # Generate extraction
-            response = self.models["ingredient_extraction"](
-                extraction_prompt,
-                max_length=self.model_configs["ingredient_extraction"]["max_length"],
-                temperature=self.model_configs["ingredient_extraction"]["temperature"],
-                do_sample=True
+            loop = asyncio.get_running_loop()
+            responses = await loop.run_in_executor(
+                None,
+                lambda: self.models["ingredient_extraction"](
+                    prompts,
+                    max_length=config["max_length"],
+                    temperature=config["temperature"],
+                    do_sample=True,
+                    batch_size=config.get("batch_size", 16)
+                )
             )
             
-            # Parse extracted ingredients
-            extraction_text = response[0]["generated_text"]
-            ingredients = self._parse_ingredient_extraction(extraction_text)
-            
-            return ingredients
+            extracted = []
+            for prompt, response in zip(prompts, responses):
+                # Pipelines return a list of candidates per input when given a list
+                candidate = response[0] if isinstance(response, list) else response
+                generated = candidate["generated_text"]
+                if generated.startswith(prompt):
+                    generated = generated[len(prompt):]
+                extracted.append(self._parse_ingredient_extraction(generated))
+            return extracted, "model"
             
         except Exception as e:
             logger.error(f"❌ Error extracting ingredients: {str(e)}")
-            return self._fallback_ingredient_extraction(text)
+            return [self._fallback_ingredient_extraction(line) for line in lines], "fallback"
     
     async def classify_food_image(self, image_path: str) -> List[Dict[str, Any]]:
         """
@@ -343,8 +618,31 @@ class CookingModels:
                 cooking_context += f"Consider dietary restrictions: {', '.join(context['dietary_restrictions'])}. "
             if "skill_level" in context:
                 cooking_context += f"Provide advice suitable for {context['skill_level']} cooks. "
+            if context.get("conversation_facts"):
+                cooking_context += f"{context['conversation_facts']} "
+        
+        # Recent turns arrive already trimmed to the prompt token budget
+        conversation = ""
+        if context and context.get("recent_turns"):
+            for turn in context["recent_turns"]:
+                speaker = "User" if turn["role"] == "user" else "Assistant"
+                conversation += f"{speaker}: {turn['content']}\n"
         
-        return f"{cooking_context}\n\nUser: {prompt}\nAssistant:"
+        return f"{cooking_context}\n\n{conversation}User: {prompt}\nAssistant:"
+    
+    def tokenizer_identity(self, model_type: str = "cooking_conversation") -> Optional[str]:
+        """Name the tokenizer count_tokens uses for a model, or "approximate" when it is not loaded"""
+        tokenizer = getattr(self.models.get(model_type), "tokenizer", None)
+        if tokenizer is None:
+            return "approximate"
+        return getattr(tokenizer, "name_or_path", None) or f"{type(tokenizer).__name__}@{id(tokenizer):x}"
+    
+    def count_tokens(self, text: str, model_type: str = "cooking_conversation") -> int:
+        """Count tokens with a model's tokenizer, approximating when it is not loaded"""
+        tokenizer = getattr(self.models.get(model_type), "tokenizer", None)
+        if tokenizer is not None:
+            return len(tokenizer.encode(text))
+        return approximate_token_count(text)
     
     def _extract_cooking_response(self, generated_text: str, original_prompt: str) -> str:
         """Extract the cooking response from generated text"""
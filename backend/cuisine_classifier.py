@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+🍳 Cuisine Classifier - Probabilistic Cuisine Classification for Cooking Ethos AI
+
+This module scores recipe text against cuisines with a multinomial naive Bayes
+model over stemmed ingredient and technique n-grams ("soy sauc", "garam
+masala", "saut"). The model is a feature × cuisine matrix of log likelihoods
+plus log priors, trained offline and stored as a compressed .npz file, so
+classifying a recipe is one gather-and-sum over the features it contains, and
+a batch of recipes is one numpy reduction. Without a trained model the
+classifier is built from a small keyword list per cuisine. Train or batch
+score from the backend directory:
+
+    python cuisine_classifier.py train recipes.jsonl --output data/cuisine_model.npz
+    python cuisine_classifier.py score recipes.jsonl --output cuisines.jsonl
+"""
+
+import json
+import time
+import argparse
+import hashlib
+import logging
+from typing import Dict, List, Optional, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from recipe_corpus import compose_recipe_text, read_corpus, read_records
+from technique_matcher import stem_tokens
+
+logger = logging.getLogger(__name__)
+
+# Longest stem n-gram used as a feature
+MAX_NGRAM = 3
+# Returned when no feature of a text is known to the model
+UNKNOWN_CUISINE = "general"
+# Feature rows gathered per numpy reduction in batch scoring
+_BATCH_CHUNK = 4096
+# Smoothing of the keyword model; small, so one keyword hit outweighs the rest
+KEYWORD_ALPHA = 0.1
+
+# Keywords the built-in model is trained from when there is no trained model
+CUISINE_KEYWORDS = {
+    "italian": ["pasta", "basil", "oregano", "parmesan", "olive oil", "tomato"],
+    "french": ["butter", "wine", "shallots", "herbs de provence", "dijon"],
+    "chinese": ["soy sauce", "ginger", "sesame oil", "rice wine", "five spice"],
+    "japanese": ["miso", "dashi", "mirin", "sake", "wasabi", "nori"],
+    "indian": ["curry", "cumin", "turmeric", "cardamom", "garam masala"],
+    "mexican": ["chili", "lime", "cilantro", "tortilla", "queso", "salsa"]
+}
+
+
+def text_features(text: str) -> List[str]:
+    """Stem n-grams of text, up to MAX_NGRAM words ("Soy sauce" -> ["soy", "sauc", "soy sauc"])"""
+    tokens = stem_tokens(text)
+    return [
+        " ".join(tokens[start:start + size])
+        for size in range(1, MAX_NGRAM + 1)
+        for start in range(len(tokens) - size + 1)
+    ]
+
+
+class CuisineClassifier:
+    """
+    Multinomial naive Bayes cuisine model.
+
+    This class handles:
+    - Training feature log likelihoods and cuisine priors from labeled recipes
+    - Building a fallback model from cuisine keywords
+    - Returning a cuisine probability distribution for one recipe
+    - Scoring many recipes in one vectorized pass
+    - Saving and loading the model as a compressed .npz file
+    """
+
+    def __init__(self, cuisines: List[str], features: List[str], weights: np.ndarray, priors: np.ndarray):
+        """
+        Args:
+            cuisines: Class labels, one per weights column
+            features: Feature n-grams, one per weights row
+            weights: float32 (features, cuisines) log P(feature | cuisine)
+            priors: float32 (cuisines,) log P(cuisine)
+        """
+        self.cuisines = list(cuisines)
+        self.features = {feature: row for row, feature in enumerate(features)}
+        # First word of each feature -> words in the longest feature it starts
+        self._longest = {}
+        for feature in self.features:
+            words = feature.split(" ")
+            self._longest[words[0]] = max(self._longest.get(words[0], 1), len(words))
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.priors = np.asarray(priors, dtype=np.float32)
+        # Fingerprint of the model, for caches of results that depend on it
+        digest = hashlib.blake2b(self.weights.tobytes() + self.priors.tobytes(), digest_size=16)
+        digest.update("\0".join(self.cuisines).encode("utf-8"))
+        self.version = digest.hexdigest()
+
+    @classmethod
+    def train(cls, examples: Iterable[Tuple[str, str]], alpha: float = 1.0, min_count: int = 2) -> "CuisineClassifier":
+        """
+        Train a model from labeled recipes
+
+        Args:
+            examples: (recipe text, cuisine) pairs
+            alpha: Additive smoothing of feature counts
+            min_count: Features seen fewer times in the whole corpus are dropped
+
+        Returns:
+            The trained classifier
+        """
+        cuisine_ids, feature_ids = {}, {}
+        rows, columns = [], []
+        for text, cuisine in examples:
+            column = cuisine_ids.setdefault(cuisine.lower(), len(cuisine_ids))
+            for feature in text_features(text):
+                rows.append(feature_ids.setdefault(feature, len(feature_ids)))
+                columns.append(column)
+            # Counts the recipe even when it has no features, for the priors
+            rows.append(-1)
+            columns.append(column)
+        if not cuisine_ids:
+            raise ValueError("no training examples")
+
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        documents = np.bincount(columns[rows < 0], minlength=len(cuisine_ids))
+        has_feature = rows >= 0
+        counts = np.zeros((len(feature_ids), len(cuisine_ids)), dtype=np.float64)
+        np.add.at(counts, (rows[has_feature], columns[has_feature]), 1.0)
+
+        keep = counts.sum(axis=1) >= min_count
+        features = [feature for feature, row in sorted(feature_ids.items(), key=lambda item: item[1]) if keep[row]]
+        counts = counts[keep]
+
+        smoothed = counts + alpha
+        weights = np.log(smoothed / smoothed.sum(axis=0))
+        priors = np.log(documents / documents.sum())
+        cuisines = sorted(cuisine_ids, key=cuisine_ids.get)
+        logger.info(f"✅ Trained cuisine model: {len(cuisines)} cuisines, {len(features)} features, {int(documents.sum())} recipes")
+        return cls(cuisines, features, weights, priors)
+
+    @classmethod
+    def from_keywords(cls, cuisine_keywords: Optional[Dict[str, List[str]]] = None) -> "CuisineClassifier":
+        """
+        Build a model from keyword lists, each keyword one training document
+
+        Keywords are whole features ("soy sauce" is the bigram only), so a
+        shared word such as "sauce" says nothing about the cuisine.
+        """
+        cuisine_keywords = cuisine_keywords or CUISINE_KEYWORDS
+        cuisines = list(cuisine_keywords)
+        features = {}
+        for cuisine, keywords in cuisine_keywords.items():
+            for keyword in keywords:
+                feature = " ".join(stem_tokens(keyword))
+                if feature:
+                    features.setdefault(feature, set()).add(cuisines.index(cuisine))
+
+        counts = np.zeros((len(features), len(cuisines)), dtype=np.float64)
+        for row, columns in enumerate(features.values()):
+            counts[row, list(columns)] = 1.0
+        smoothed = counts + KEYWORD_ALPHA
+        weights = np.log(smoothed / smoothed.sum(axis=0))
+        priors = np.full(len(cuisines), -np.log(len(cuisines)))
+        return cls(cuisines, list(features), weights, priors)
+
+    @classmethod
+    def load(cls, path: str) -> "CuisineClassifier":
+        """Load a model saved with save()"""
+        with np.load(path, allow_pickle=False) as model:
+            return cls([str(cuisine) for cuisine in model["cuisines"]], [str(feature) for feature in model["features"]],
+                       model["weights"], model["priors"])
+
+    def save(self, path: str):
+        """Save the model as a compressed .npz file"""
+        features = sorted(self.features, key=self.features.get)
+        np.savez_compressed(path, cuisines=np.asarray(self.cuisines, dtype=np.str_),
+                            features=np.asarray(features, dtype=np.str_),
+                            weights=self.weights, priors=self.priors)
+
+    def predict(self, text: str) -> str:
+        """Get the most likely cuisine of recipe text, or "general" when nothing in it is known"""
+        rows = self._feature_rows(text)
+        if not rows:
+            return UNKNOWN_CUISINE
+        return self.cuisines[int(np.argmax(self.priors + self.weights[rows].sum(axis=0)))]
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """Get the cuisine probability distribution of recipe text (the priors when nothing in it is known)"""
+        probabilities = self.predict_proba_batch([text])[0]
+        return {cuisine: round(float(p), 4) for cuisine, p in zip(self.cuisines, probabilities)}
+
+    def predict_batch(self, texts: Iterable[str]) -> List[str]:
+        """Get the most likely cuisine of each recipe text"""
+        return self.classify_batch(texts)[0]
+
+    def predict_proba_batch(self, texts: Iterable[str]) -> np.ndarray:
+        """Get the cuisine probabilities of each recipe text, one row per text"""
+        return self.classify_batch(texts)[1]
+
+    def classify_batch(self, texts: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Score many recipe texts in one pass
+
+        Returns:
+            The most likely cuisine of each text ("general" when nothing in it
+            is known), and a float64 (texts, cuisines) array of probabilities
+            whose rows sum to 1
+        """
+        scores, known = self._log_scores(texts)
+        best = np.argmax(scores, axis=1)
+        cuisines = [self.cuisines[column] if has_features else UNKNOWN_CUISINE for column, has_features in zip(best, known)]
+
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        return cuisines, probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def _log_scores(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Unnormalized log posteriors of each text, and which texts had a known feature"""
+        rows = [self._feature_rows(text) for text in texts]
+        scores = np.tile(self.priors.astype(np.float64), (len(rows), 1))
+        counts = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+
+        for chunk_start in range(0, len(rows), _BATCH_CHUNK):
+            chunk_counts = counts[chunk_start:chunk_start + _BATCH_CHUNK]
+            present = np.flatnonzero(chunk_counts)
+            if not len(present):
+                continue
+            features = np.fromiter(
+                (row for text_rows in rows[chunk_start:chunk_start + _BATCH_CHUNK] for row in text_rows),
+                dtype=np.int64, count=int(chunk_counts.sum())
+            )
+            offsets = np.concatenate(([0], np.cumsum(chunk_counts[present])[:-1]))
+            scores[chunk_start + present] += np.add.reduceat(self.weights[features], offsets, axis=0)
+
+        return scores, counts > 0
+
+    def _feature_rows(self, text: str) -> List[int]:
+        """Weight rows of the known features in text, once per occurrence (the known part of text_features)"""
+        tokens = stem_tokens(text)
+        rows = []
+        for start, token in enumerate(tokens):
+            row = self.features.get(token)
+            if row is not None:
+                rows.append(row)
+            # Longer n-grams are only built when a feature starts with this word
+            for size in range(2, min(self._longest.get(token, 1), len(tokens) - start) + 1):
+                row = self.features.get(" ".join(tokens[start:start + size]))
+                if row is not None:
+                    rows.append(row)
+        return rows
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+
+def read_labeled(path: str, text_field: str, label_field: str) -> Iterator[Tuple[str, str]]:
+    """Read (recipe text, cuisine) pairs from a JSONL or CSV corpus, skipping unlabeled records"""
+    for record in read_records(path):
+        label = record.get(label_field)
+        text = record.get(text_field) or compose_recipe_text(record)
+        if label and text:
+            yield text, str(label)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or batch-score the cuisine classifier")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="Train a model from a labeled recipe corpus")
+    train.add_argument("input", help="JSONL or CSV corpus with recipe text and a cuisine label")
+    train.add_argument("--output", default="data/cuisine_model.npz", help="Model file to write")
+    train.add_argument("--label-field", default="cuisine", help="Field holding the cuisine label")
+    train.add_argument("--alpha", type=float, default=1.0, help="Additive smoothing")
+    train.add_argument("--min-count", type=int, default=2, help="Drop features seen fewer times")
+
+    score = commands.add_parser("score", help="Write cuisine probabilities for every recipe in a corpus")
+    score.add_argument("input", help="JSONL or CSV recipe corpus")
+    score.add_argument("--output", required=True, help="JSONL output")
+    score.add_argument("--model", default="data/cuisine_model.npz", help="Model file (keyword model if missing)")
+    score.add_argument("--id-field", default="id", help="Field holding the recipe id")
+    score.add_argument("--batch-size", type=int, default=4096, help="Recipes scored per call")
+
+    for command in (train, score):
+        command.add_argument("--text-field", default="recipe_text", help="Field holding the recipe text")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "train":
+        classifier = CuisineClassifier.train(read_labeled(args.input, args.text_field, args.label_field),
+                                             alpha=args.alpha, min_count=args.min_count)
+        classifier.save(args.output)
+        logger.info(f"✅ Saved cuisine model to {args.output}")
+        return
+
+    try:
+        classifier = CuisineClassifier.load(args.model)
+    except OSError:
+        logger.warning(f"⚠️ Cuisine model not found: {args.model}, using keywords")
+        classifier = CuisineClassifier.from_keywords()
+
+    start = time.perf_counter()
+    scored = 0
+    records = read_corpus(args.input, args.text_field, args.id_field)
+    with open(args.output, "w", encoding="utf-8") as output:
+        while True:
+            batch = [record for _, record in zip(range(args.batch_size), records)]
+            if not batch:
+                break
+            cuisines, probabilities = classifier.classify_batch([text for _, text in batch])
+            for (recipe_id, _), cuisine, recipe_probabilities in zip(batch, cuisines, probabilities):
+                output.write(json.dumps({
+                    "id": recipe_id,
+                    "cuisine_type": cuisine,
+                    "probabilities": {c: round(float(p), 4) for c, p in zip(classifier.cuisines, recipe_probabilities)}
+                }, ensure_ascii=False) + "\n")
+            scored += len(batch)
+    elapsed = time.perf_counter() - start
+    logger.info(f"✅ Scored {scored} recipes in {elapsed:.1f}s ({scored / elapsed if elapsed else 0:.0f} recipes/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+🍳 Dietary Index - Dietary Classification and Filtering for Cooking Ethos AI
+
+This module classifies ingredients and recipes against dietary restrictions
+(vegetarian, vegan, pescatarian, gluten-free, nut-free, soy-free, ...) and stores the
+result as a compact bitmask: bit d is set when the recipe or ingredient is
+compatible with diet d. Ingredient text is scanned once with a single compiled
+pattern of everything that breaks a diet, and a recipe's mask is the AND of
+its ingredients' masks. A user's restrictions become one mask too, so
+filtering a corpus is a vectorized AND over a numpy array of recipe masks.
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Any, Iterable
+
+import numpy as np
+
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Bit order of the masks; a mask has bit i set for DIETS[i]. Masks are stored as uint16, so at most 16 diets
+DIETS = ["vegetarian", "vegan", "gluten-free", "dairy-free", "nut-free", "egg-free", "low-carb", "healthy",
+         "pescatarian", "fish-free", "shellfish-free", "soy-free", "sesame-free"]
+DIET_BITS = {diet: 1 << bit for bit, diet in enumerate(DIETS)}
+
+# Diets decided by an ingredient's contents; the others come only from labels
+INGREDIENT_DIETS = ["vegetarian", "vegan", "gluten-free", "dairy-free", "nut-free", "egg-free",
+                    "pescatarian", "fish-free", "shellfish-free", "soy-free", "sesame-free"]
+INGREDIENT_BITS = sum(DIET_BITS[diet] for diet in INGREDIENT_DIETS)
+
+# Diets a label implies ("vegan" food is also vegetarian, dairy-free and egg-free)
+IMPLIED_DIETS = {
+    "vegan": ["vegetarian", "pescatarian", "fish-free", "shellfish-free", "dairy-free", "egg-free"],
+    "vegetarian": ["pescatarian", "fish-free", "shellfish-free"]
+}
+
+# Phrases that label text with a diet, matched anywhere in the text
+DIETARY_KEYWORDS = {
+    "vegetarian": ["vegetarian", "veggie", "no meat"],
+    "vegan": ["vegan", "plant-based", "no dairy"],
+    "gluten-free": ["gluten-free", "gluten free", "gf"],
+    "dairy-free": ["dairy-free", "dairy free", "lactose-free"],
+    "nut-free": ["nut-free", "nut free", "no nuts"],
+    "egg-free": ["egg-free", "egg free", "no eggs"],
+    "pescatarian": ["pescatarian", "pescetarian"],
+    "fish-free": ["fish-free", "fish free", "no fish"],
+    "shellfish-free": ["shellfish-free", "shellfish free", "no shellfish"],
+    "soy-free": ["soy-free", "soy free", "no soy"],
+    "sesame-free": ["sesame-free", "sesame free", "no sesame"],
+    "low-carb": ["low-carb", "low carb", "keto"],
+    "healthy": ["healthy", "light", "low-fat"]
+}
+
+# Ingredient words (singular) and the diets they break
+_MEAT = ["vegetarian", "vegan", "pescatarian"]
+_FISH = ["vegetarian", "vegan", "fish-free"]
+_SHELLFISH = ["vegetarian", "vegan", "shellfish-free"]
+_DAIRY = ["vegan", "dairy-free"]
+_EGG = ["vegan", "egg-free"]
+_GLUTEN = ["gluten-free"]
+_NUT = ["nut-free"]
+_SOY = ["soy-free"]
+INGREDIENT_CONFLICTS = {
+    **dict.fromkeys([
+        "chicken", "beef", "pork", "bacon", "ham", "hamburger", "lamb", "turkey", "sausage", "steak", "veal",
+        "duck", "prosciutto", "pancetta", "salami", "pepperoni", "chorizo", "meat", "gelatin", "lard"
+    ], _MEAT),
+    **dict.fromkeys([
+        "fish", "salmon", "tuna", "cod", "trout", "tilapia", "halibut", "haddock", "sardine", "mackerel",
+        "anchovy", "anchovies", "fish sauce", "worcestershire sauce"
+    ], _FISH),
+    **dict.fromkeys([
+        "shellfish", "shrimp", "prawn", "crab", "lobster", "crayfish", "scallop", "clam", "mussel", "oyster",
+        "oyster sauce"
+    ], _SHELLFISH),
+    **dict.fromkeys([
+        "milk", "butter", "buttermilk", "cheese", "parmesan", "mozzarella", "cheddar", "ricotta", "feta",
+        "cream", "sour cream", "yogurt", "yoghurt", "ghee", "whey"
+    ], _DAIRY),
+    **dict.fromkeys(["egg", "egg yolk", "egg white", "mayonnaise", "mayo"], _EGG),
+    "honey": ["vegan"],
+    **dict.fromkeys([
+        "flour", "wheat", "bread", "breadcrumb", "pasta", "spaghetti", "noodle", "couscous", "barley", "rye",
+        "semolina", "beer", "crouton", "cracker"
+    ], _GLUTEN),
+    "soy sauce": _GLUTEN + _SOY,
+    **dict.fromkeys(["soy", "soya", "soybean", "tofu", "tempeh", "edamame", "miso", "tamari", "soy milk"], _SOY),
+    **dict.fromkeys(["sesame", "tahini"], ["sesame-free"]),
+    **dict.fromkeys([
+        "nut", "almond", "walnut", "pecan", "cashew", "pistachio", "hazelnut", "peanut", "macadamia", "pine nut",
+        "almond milk", "almond flour", "peanut butter"
+    ], _NUT),
+    # Plant-based names that contain a word above but break none of its diets
+    **dict.fromkeys([
+        "coconut milk", "oat milk", "rice milk", "vegan butter", "vegan cheese", "cocoa butter",
+        "coconut cream", "cream of tartar", "rice flour", "corn flour", "coconut flour", "chickpea flour",
+        "rice noodle", "nutmeg", "butternut", "oyster mushroom"
+    ], [])
+}
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    """Regex alternation of phrases, longest first so "peanut butter" wins over "peanut" """
+    return "|".join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True))
+
+
+# Labels may overlap ("no dairy-free" holds both "no dairy" and "dairy-free"),
+# so every start position is tried with a lookahead; labels are whole words
+_LABEL_PATTERN = re.compile(
+    rf"(?=\b({_alternation(k for keys in DIETARY_KEYWORDS.values() for k in keys)})\b)"
+)
+# A label right after this is denied ("not vegan", "non-vegetarian")
+_NEGATION_PATTERN = re.compile(r"\b(?:not|no|non|never)[\s-]*$")
+_LABEL_DIETS = {keyword: diet for diet, keywords in DIETARY_KEYWORDS.items() for keyword in keywords}
+_CONFLICT_PATTERN = re.compile(rf"\b({_alternation(INGREDIENT_CONFLICTS)})(?:es|s)?\b")
+_CONFLICT_MASKS = {
+    phrase: INGREDIENT_BITS & ~sum(DIET_BITS[diet] for diet in diets)
+    for phrase, diets in INGREDIENT_CONFLICTS.items()
+}
+
+# Allergies and restriction words that name what to avoid rather than the diet
+ALLERGEN_DIETS = {
+    "nut": "nut-free", "nuts": "nut-free", "peanut": "nut-free", "peanuts": "nut-free", "tree nuts": "nut-free",
+    "dairy": "dairy-free", "milk": "dairy-free", "lactose": "dairy-free",
+    "egg": "egg-free", "eggs": "egg-free",
+    "gluten": "gluten-free", "wheat": "gluten-free", "celiac": "gluten-free",
+    "meat": "vegetarian",
+    "fish": "fish-free",
+    "shellfish": "shellfish-free", "crustacean": "shellfish-free", "crustaceans": "shellfish-free",
+    "soy": "soy-free", "soya": "soy-free", "soybean": "soy-free", "soybeans": "soy-free",
+    "sesame": "sesame-free"
+}
+
+
+def dietary_labels(text: str) -> List[str]:
+    """Get the diets text labels itself with ("Easy vegan chili" -> ["vegan"]), in DIETS order"""
+    return mask_diets(_labels(text))
+
+
+def mask_diets(mask: int) -> List[str]:
+    """Get the diets set in a mask, in DIETS order"""
+    return [diet for diet in DIETS if mask & DIET_BITS[diet]]
+
+
+def restriction_mask(restrictions: Any) -> int:
+    """
+    Build the mask a recipe must contain to respect restrictions
+
+    Args:
+        restrictions: Diet names or allergies ("vegan", "gluten free", "peanuts"), one or a list;
+            anything unrecognized cannot be checked and does not restrict
+
+    Returns:
+        Mask of the required diets
+    """
+    if not restrictions:
+        return 0
+    if isinstance(restrictions, str):
+        restrictions = [restrictions]
+    mask = 0
+    for restriction in restrictions:
+        text = str(restriction).lower().strip()
+        # What to avoid ("peanuts", "nut allergy", "no dairy") before diet names ("vegan", "gluten free")
+        avoided = [ALLERGEN_DIETS[word] for word in [text, *text.split()] if word in ALLERGEN_DIETS]
+        mask |= sum(DIET_BITS[diet] for diet in set(avoided)) if avoided else _label_mask(text)
+    return mask
+
+
+def preference_mask(user_preferences: Optional[Dict[str, Any]]) -> int:
+    """Build the required mask of a user's "dietary_restrictions" and "allergies" """
+    preferences = user_preferences or {}
+    return restriction_mask(preferences.get("dietary_restrictions")) | restriction_mask(preferences.get("allergies"))
+
+
+def _labels(text: str) -> int:
+    """Mask of the diets text labels itself with"""
+    mask = 0
+    for _, _, diet in _label_matches(text.lower()):
+        mask |= DIET_BITS[diet]
+    return mask
+
+
+def _label_matches(text: str) -> List[tuple]:
+    """(start, end, diet) of the labels in lowercase text, skipping negated ones ("not vegan")"""
+    matches = []
+    for match in _LABEL_PATTERN.finditer(text):
+        if not _NEGATION_PATTERN.search(text, 0, match.start()):
+            matches.append((match.start(), match.start() + len(match.group(1)), _LABEL_DIETS[match.group(1)]))
+    return matches
+
+
+def _label_mask(text: str) -> int:
+    """Mask of the diets text labels itself with, implied diets included"""
+    return _with_implied(_labels(text))
+
+
+def _with_implied(mask: int) -> int:
+    """Add the diets implied by those in a mask"""
+    for diet, implied in IMPLIED_DIETS.items():
+        if mask & DIET_BITS[diet]:
+            for other in implied:
+                mask |= DIET_BITS[other]
+    return mask
+
+
+class DietaryIndex:
+    """
+    Dietary bitmasks of a recipe corpus.
+
+    This class handles:
+    - Classifying ingredient text into a diet compatibility mask
+    - Combining ingredient masks, labels and declared tags into recipe masks
+    - Storing recipe masks in a numpy array
+    - Filtering the corpus by a user's restrictions with one vectorized AND
+    """
+
+    def __init__(self, recipes: Iterable[Dict[str, Any]] = (), cache_size: int = 65536):
+        """
+        Args:
+            recipes: Recipe records with "ingredients" and optional "name" and "dietary" tags
+            cache_size: Most ingredient texts remembered, since they repeat across recipes
+        """
+        self.result_cache = ResultCache(cache_size)
+        self._masks = []
+        self._array = None
+        for recipe in recipes:
+            self.add(recipe)
+
+    def ingredient_mask(self, text: str) -> int:
+        """Get the diets an ingredient text is compatible with ("2 tbsp butter" -> not vegan or dairy-free)"""
+        return self.result_cache.get_or_compute(text, self._ingredient_mask, text)
+
+    def _ingredient_mask(self, text: str) -> int:
+        """Classify an ingredient text (uncached)"""
+        text = text.lower()
+        # A label keeps its diet only for the word right after it ("gluten-free pasta");
+        # anywhere else ("cheese, not vegan", "chicken (vegetarian)") it cannot clear a conflict
+        modifiers = {}
+        for _, end, diet in _label_matches(text):
+            modifiers[end] = modifiers.get(end, 0) | _with_implied(DIET_BITS[diet])
+        mask = INGREDIENT_BITS
+        for match in _CONFLICT_PATTERN.finditer(text):
+            phrase = match.group(1)
+            if " " in phrase and _NEGATION_PATTERN.search(text, 0, match.start()):
+                # "non-vegan butter" is not "vegan butter": judge it by the words after the first
+                mask &= self._ingredient_mask(phrase.split(" ", 1)[1])
+                continue
+            mask &= _CONFLICT_MASKS[phrase] | modifiers.get(len(text[:match.start()].rstrip()), 0)
+        return mask
+
+    def recipe_mask(self, recipe: Dict[str, Any]) -> int:
+        """
+        Get the diets a recipe is compatible with
+
+        Ingredients decide the diets they can; labels in the name and declared
+        "dietary" tags add only what ingredients cannot tell (low-carb,
+        healthy), or everything when the recipe lists no ingredients.
+        """
+        labels = _label_mask(" ".join([recipe.get("name", ""), *recipe.get("dietary", [])]))
+        ingredients = recipe.get("ingredients", [])
+        if not ingredients:
+            return labels
+
+        mask = INGREDIENT_BITS
+        for ingredient in ingredients:
+            mask &= self.ingredient_mask(ingredient if isinstance(ingredient, str) else ingredient.get("name", ""))
+        return mask | (labels & ~INGREDIENT_BITS)
+
+    def add(self, recipe: Dict[str, Any]) -> int:
+        """Classify and index a recipe, returning its position"""
+        self._masks.append(self.recipe_mask(recipe))
+        self._array = None
+        return len(self._masks) - 1
+
+    @property
+    def masks(self) -> np.ndarray:
+        """Recipe masks as a uint16 array, in corpus order"""
+        if self._array is None:
+            self._array = np.array(self._masks, dtype=np.uint16)
+        return self._array
+
+    def allowed(self, required: int) -> np.ndarray:
+        """Boolean array of the recipes whose masks contain every required diet"""
+        if not required:
+            return np.ones(len(self._masks), dtype=bool)
+        return (self.masks & np.uint16(required)) == required
+
+    def allowed_bits(self, required: int) -> int:
+        """The allowed recipes as a bitset (bit i for recipe i), for bitset indexes such as PantryIndex"""
+        allowed = np.packbits(self.allowed(required), bitorder="little")
+        return int.from_bytes(allowed.tobytes(), "little")
+
+    def __len__(self) -> int:
+        return len(self._masks)
@@ -16,6 +16,11 @@ import requests
 from PIL import Image
 import io
 
+import numpy as np
+
+from dietary_index import DietaryIndex, preference_mask
+from recipe_recommender import cooking_minutes
+
 logger = logging.getLogger(__name__)
 
 class FoodRecognitionEngine:
@@ -35,6 +40,7 @@ class FoodRecognitionEngine:
         self.food_database = {}
         self.recipe_suggestions = {}
         self.cooking_tips = {}
+        self.dietary_index = DietaryIndex()
         
         # Food recognition patterns
         self.food_patterns = {
@@ -258,9 +264,9 @@ class FoodRecognitionEngine:
                     matching_recipes.extend(self.recipe_suggestions[food_item])
             
             if matching_recipes:
-                # Select the best recipe based on user preferences
+                # Select the best recipe based on user preferences; none may fit them
                 best_recipe = self._select_best_recipe(matching_recipes, user_preferences)
-                return best_recipe
+                return best_recipe or None
             
             # Generate a simple recipe suggestion
             return self._generate_simple_recipe(food_items)
@@ -274,9 +280,21 @@ class FoodRecognitionEngine:
         if not recipes:
             return {}
         
-        # For now, return the first recipe
-        # In a real implementation, this would use preference matching
-        return recipes[0]
+        # Drop recipes that break a dietary restriction or allergy
+        required = preference_mask(user_preferences)
+        masks = np.fromiter((self.dietary_index.recipe_mask(recipe) for recipe in recipes), dtype=np.uint16, count=len(recipes))
+        allowed = (masks & np.uint16(required)) == required
+        
+        # Prefer recipes that fit the user's time limit
+        max_minutes = cooking_minutes((user_preferences or {}).get("max_cooking_time"))
+        if max_minutes:
+            minutes = np.array([cooking_minutes(recipe.get("cooking_time")) or np.inf for recipe in recipes])
+            in_time = allowed & (minutes <= max_minutes)
+            if in_time.any():
+                allowed = in_time
+        
+        candidates = np.flatnonzero(allowed)
+        return recipes[candidates[0]] if len(candidates) else {}
     
     def _generate_simple_recipe(self, food_items: List[str]) -> Dict[str, Any]:
         """Generate a simple recipe based on food items"""
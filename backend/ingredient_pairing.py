@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+🍳 Ingredient Pairing - Flavor Pairing from Recipe Statistics for Cooking Ethos AI
+
+This module answers "what goes with X (and Y)" from how often ingredients are
+used together in a recipe corpus. Co-occurrence counts are kept sparse (per
+ingredient, a dict of the ingredients it has appeared with), so adding a
+recipe updates only its own pairs and the statistics never need a full
+rebuild. A query scores the neighbours of the asked-about ingredients by
+normalized pointwise mutual information (NPMI) in a few numpy operations;
+ubiquitous ingredients like salt score near zero because they appear with
+everything.
+"""
+
+import math
+import logging
+from typing import Dict, List, Optional, Any, Callable, Iterable
+
+import numpy as np
+
+from pantry_index import normalize_ingredient, mentioned_ingredients
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# NPMI of a pair never seen together; scores lie in [-1, 1]
+UNSEEN_NPMI = -1.0
+
+
+class IngredientPairing:
+    """
+    Ingredient co-occurrence statistics and pairing queries.
+
+    This class handles:
+    - Counting ingredient and ingredient-pair occurrences, one recipe at a time
+    - Scoring pairs by PMI / NPMI
+    - Ranking the best partners of one or more ingredients
+    - Finding known ingredients mentioned in a chat message
+    """
+
+    def __init__(self, recipes: Iterable[Dict[str, Any]] = (), normalize: Optional[Callable[[str], Optional[str]]] = None,
+                 min_count: int = 2, cache_size: int = 65536):
+        """
+        Args:
+            recipes: Recipe records with "ingredients"
+            normalize: Maps ingredient text to its key (default: normalize_ingredient)
+            min_count: Fewest recipes a pair must share to be suggested; single
+                co-occurrences of rare ingredients have inflated PMI
+            cache_size: Most normalized ingredient texts remembered, since they repeat across recipes
+        """
+        self.normalize = normalize or normalize_ingredient
+        self.key_cache = ResultCache(cache_size)
+        self.min_count = min_count
+        self.recipe_count = 0
+        self.ids = {}                                   # ingredient key -> id
+        self.names = []                                 # per id, the first name it was seen as
+        self.counts = np.zeros(256, dtype=np.int64)     # per id, recipes using it; grown by doubling
+        self.pairs = []                                 # per id, {other id: recipes using both}
+        for recipe in recipes:
+            self.add(recipe)
+
+    def add(self, recipe: Dict[str, Any]):
+        """Count a recipe's ingredients and ingredient pairs"""
+        ids = []
+        for name in recipe.get("ingredients", []):
+            if not isinstance(name, str):
+                name = name.get("name", "")
+            key = self.key_cache.get_or_compute(name, self.normalize, name)
+            if not key:
+                continue
+            ingredient_id = self.ids.get(key)
+            if ingredient_id is None:
+                ingredient_id = self._new_ingredient(key, name)
+            if ingredient_id not in ids:
+                ids.append(ingredient_id)
+
+        self.recipe_count += 1
+        self.counts[ids] += 1
+        for ingredient_id in ids:
+            partners = self.pairs[ingredient_id]
+            for other in ids:
+                if other != ingredient_id:
+                    partners[other] = partners.get(other, 0) + 1
+
+    def add_many(self, recipes: Iterable[Dict[str, Any]]) -> int:
+        """Count a batch of recipes, returning how many were added"""
+        added = 0
+        for recipe in recipes:
+            self.add(recipe)
+            added += 1
+        return added
+
+    def pmi(self, first: str, second: str, normalized: bool = True) -> Optional[float]:
+        """Get the (N)PMI of two ingredients, or None when either is unknown or they never co-occur"""
+        a, b = self.ids.get(self.normalize(first)), self.ids.get(self.normalize(second))
+        if a is None or b is None or a == b:
+            return None
+        together = self.pairs[a].get(b, 0)
+        if not together:
+            return None
+        score = math.log(together * self.recipe_count / (self.counts[a] * self.counts[b]))
+        if not normalized:
+            return score
+        joint = together / self.recipe_count
+        return max(-1.0, min(1.0, score / -math.log(joint))) if joint < 1 else 1.0
+
+    def pairings(self, ingredients: Iterable[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find what goes with one or more ingredients
+
+        Args:
+            ingredients: Ingredient names or keys
+            limit: Most partners returned
+
+        Returns:
+            {"ingredient", "score", "count"} records, best first. The score is
+            the mean NPMI with the asked-about ingredients (pairs never seen
+            together count as -1); count is the recipes using the partner with
+            each of them, summed
+        """
+        query = []
+        for name in ingredients:
+            ingredient_id = self.ids.get(self.normalize(name))
+            if ingredient_id is not None and ingredient_id not in query:
+                query.append(ingredient_id)
+        if not query or self.recipe_count < 2:
+            return []
+
+        vocabulary = len(self.names)
+        total = np.zeros(vocabulary, dtype=np.float64)
+        hits = np.zeros(vocabulary, dtype=np.int64)
+        together_counts = np.zeros(vocabulary, dtype=np.int64)
+        for ingredient_id in query:
+            partners = self.pairs[ingredient_id]
+            if not partners:
+                continue
+            others = np.fromiter(partners.keys(), dtype=np.int64, count=len(partners))
+            together = np.fromiter(partners.values(), dtype=np.float64, count=len(partners))
+            frequent = together >= self.min_count
+            others, together = others[frequent], together[frequent]
+
+            joint = together / self.recipe_count
+            pmi = np.log(joint * self.recipe_count ** 2 / (self.counts[ingredient_id] * self.counts[others]))
+            # A pair in every recipe has -log(joint) = 0; it is as associated as possible
+            with np.errstate(divide="ignore", invalid="ignore"):
+                npmi = np.where(joint < 1, pmi / -np.log(joint), 1.0)
+            # Clipped so rounding error cannot lift an unrelated partner's mean above zero
+            npmi = np.clip(npmi, -1.0, 1.0)
+            total[others] += npmi
+            hits[others] += 1
+            together_counts[others] += together.astype(np.int64)
+
+        hits[query] = 0
+        candidates = np.flatnonzero(hits)
+        if not len(candidates):
+            return []
+        scores = (total[candidates] + UNSEEN_NPMI * (len(query) - hits[candidates])) / len(query)
+        positive = scores > 0
+        candidates, scores = candidates[positive], scores[positive]
+
+        if len(candidates) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[best], scores[best]
+        order = np.lexsort((-together_counts[candidates], -scores))
+        return [
+            {"ingredient": self.names[candidates[i]], "score": round(float(scores[i]), 3),
+             "count": int(together_counts[candidates[i]])}
+            for i in order
+        ]
+
+    def ingredients_in(self, text: str) -> List[str]:
+        """Find known ingredients mentioned in free text, as their display names"""
+        return [self.names[self.ids[key]] for key in mentioned_ingredients(text, self.ids, self.normalize)]
+
+    def _new_ingredient(self, key: str, name: str) -> int:
+        """Assign an id to a newly seen ingredient"""
+        ingredient_id = len(self.names)
+        if ingredient_id == len(self.counts):
+            self.counts = np.concatenate((self.counts, np.zeros_like(self.counts)))
+        self.ids[key] = ingredient_id
+        self.names.append(name)
+        self.pairs.append({})
+        return ingredient_id
+
+    def __len__(self) -> int:
+        return len(self.names)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+🍳 Ingredient Resolver - Fuzzy Ingredient Name Resolution for Cooking Ethos AI
+
+This module maps free-form ingredient text ("2 boneless chicken breasts, cut
+into strips", "fresh brocoli florets") to canonical names in an ingredient
+database. The quantity and preparation notes are stripped and the head noun is
+extracted. Candidates come from a word n-gram index over the stemmed names, and
+misspelled words are corrected with a SymSpell-style deletes index. Candidates
+are ranked by IDF-weighted token overlap, so a lookup touches only a bounded
+number of names however large the vocabulary is. A name that leaves a word
+of the query unexplained ("butter" for "peanut butter") is only a suggestion,
+scored too low to be taken for the ingredient.
+"""
+
+import logging
+import math
+import re
+from typing import Dict, List, Optional, Any, Iterable, Tuple, Union
+
+from quantity_parser import parse_quantity
+from result_cache import ResultCache
+from technique_matcher import fold_text, stem, stem_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[a-z]+")
+# Preparation notes and alternatives that follow the ingredient itself
+_CLAUSE_BREAK = re.compile(r"[,;(]|\b(?:for|or|such as|to serve|divided)\b")
+
+# Words that describe an ingredient rather than name it; ignored unless a name contains them
+DESCRIPTORS = {
+    "boneless", "skinless", "fresh", "freshly", "large", "small", "medium", "chopped", "diced", "minced",
+    "sliced", "finely", "roughly", "thinly", "grated", "shredded", "peeled", "cubed", "crushed", "softened",
+    "melted", "room", "temperature", "cold", "warm", "hot", "ripe", "whole", "raw", "cooked", "dried",
+    "frozen", "canned", "organic", "packed", "heaping", "level", "about", "plus", "more", "optional",
+    "unsalted", "salted", "kosher", "extra", "virgin", "plain", "lukewarm", "toasted", "halved", "quartered",
+    "rinsed", "drained", "trimmed", "beaten", "lightly", "sifted", "floret", "florets", "handful", "bunch",
+    "sprig", "sprigs", "pinch", "dash", "splash",
+    "a", "an", "the", "of", "and", "with", "into", "cut", "piece", "pieces"
+}
+_DESCRIPTOR_STEMS = {stem(word) for word in DESCRIPTORS}
+
+MAX_NGRAM = 3
+# Query words weigh this much more when they are the head noun ("breast" in "chicken breast")
+HEAD_WEIGHT = 1.5
+# Score lost per misspelled word that had to be corrected
+CORRECTION_PENALTY = 0.1
+# Highest score of a name that leaves a query word unexplained ("peanut butter" -> "butter");
+# below the 0.5 that resolve_one and callers require, so such matches are only suggestions
+UNEXPLAINED_SCORE_CAP = 0.4
+
+
+class IngredientResolver:
+    """
+    Fuzzy resolver from ingredient text to canonical ingredient names.
+
+    This class handles:
+    - Indexing stemmed names and aliases by word n-grams
+    - Correcting misspelled words against the name vocabulary (SymSpell deletes)
+    - Extracting the head noun of an ingredient phrase
+    - Ranking canonical matches by weighted token overlap
+    """
+
+    def __init__(self, names: Union[Dict[str, str], Iterable[str]], max_edit_distance: int = 2,
+                 prefix_length: int = 7, max_candidates: int = 64, cache_size: int = 65536):
+        """
+        Build the indexes
+
+        Args:
+            names: Canonical names, or a mapping of name or alias -> canonical name
+            max_edit_distance: Largest edit distance corrected for long words (short words get 1)
+            prefix_length: Word prefix the deletes index is built over
+            max_candidates: Most names scored per lookup
+            cache_size: Most resolved texts remembered, since ingredient texts repeat across recipes
+        """
+        if not isinstance(names, dict):
+            names = {name: name for name in names}
+
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.max_candidates = max_candidates
+        self.result_cache = ResultCache(cache_size)
+
+        self.canonical_names = []   # per indexed name
+        self.name_tokens = []       # per indexed name, frozenset of stems
+        self.exact = {}             # stem tuple -> name id
+        self.postings = {}          # stem n-gram -> name ids, shortest names first
+        self.document_frequency = {}
+
+        for name, canonical in names.items():
+            tokens = tuple(stem_tokens(name))
+            if not tokens or tokens in self.exact:
+                continue
+            name_id = len(self.canonical_names)
+            self.canonical_names.append(canonical)
+            self.name_tokens.append(frozenset(tokens))
+            self.exact[tokens] = name_id
+            for token in set(tokens):
+                self.document_frequency[token] = self.document_frequency.get(token, 0) + 1
+            for gram in set(_ngrams(tokens)):
+                self.postings.setdefault(gram, []).append(name_id)
+
+        for posting in self.postings.values():
+            posting.sort(key=lambda name_id: len(self.name_tokens[name_id]))
+
+        count = len(self.canonical_names)
+        self.idf = {token: math.log(1 + count / frequency) for token, frequency in self.document_frequency.items()}
+        self.name_weight = [sum(self.idf[token] for token in tokens) for tokens in self.name_tokens]
+        # Weight of a word in no name: rarer than any word that is
+        self.unseen_idf = math.log(1 + count)
+
+        # Deletes of every vocabulary word's prefix -> the words they came from
+        self.deletes = {}
+        for token in self.document_frequency:
+            for variant in self._deletes_of(token):
+                self.deletes.setdefault(variant, []).append(token)
+
+    @classmethod
+    def from_database(cls, ingredient_database: Dict[str, Any], **kwargs) -> "IngredientResolver":
+        """Build a resolver over database keys plus each entry's "name" and "aliases" """
+        names = {}
+        for key, info in ingredient_database.items():
+            names.setdefault(key, key)
+            if isinstance(info, dict):
+                for alias in [info.get("name"), *info.get("aliases", [])]:
+                    if alias:
+                        names.setdefault(alias, key)
+        return cls(names, **kwargs)
+
+    def resolve(self, text: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Find the canonical names an ingredient text most likely refers to
+
+        Args:
+            text: Ingredient text, with or without quantity and preparation notes
+            limit: Most matches returned
+
+        Returns:
+            (canonical name, score in 0..1) pairs, best first
+        """
+        return list(self.result_cache.get_or_compute((text, limit), self._resolve, text, limit))
+
+    def resolve_one(self, text: str, min_score: float = 0.5) -> Optional[str]:
+        """Get the best canonical name for an ingredient text, or None below min_score"""
+        matches = self.resolve(text, limit=1)
+        if matches and matches[0][1] >= min_score:
+            return matches[0][0]
+        return None
+
+    def head_noun(self, text: str) -> Optional[str]:
+        """Get the word an ingredient phrase is about ("2 boneless chicken breasts" -> "breasts")"""
+        words = [word for word in _WORD_PATTERN.findall(self._main_phrase(text)) if word not in DESCRIPTORS]
+        return words[-1] if words else None
+
+    def _resolve(self, text: str, limit: int) -> Tuple[Tuple[str, float], ...]:
+        """Rank canonical names for an ingredient text (uncached)"""
+        tokens, head, corrections, unexplained = self._query(text)
+        if not tokens:
+            return ()
+
+        # Query words weighted by rarity, the head noun counting extra
+        weights = {}
+        for token in tokens:
+            weight = self.idf[token] * (HEAD_WEIGHT if token == head else 1.0)
+            weights[token] = max(weights.get(token, 0.0), weight)
+        required = {token for token in weights if token not in _DESCRIPTOR_STEMS}
+        penalty = max(0.0, 1.0 - CORRECTION_PENALTY * corrections)
+        # Words no name contains count against every candidate
+        unexplained_weight = sum(self.unseen_idf * (HEAD_WEIGHT if token == head else 1.0) for token in unexplained)
+
+        best = {}
+        for name_id in self._candidates(tokens):
+            name_tokens = self.name_tokens[name_id]
+            common = extra = 0.0
+            missing = bool(unexplained)
+            for token, weight in weights.items():
+                if token in name_tokens:
+                    common += weight
+                    extra += weight - self.idf[token]
+                elif token in required:
+                    extra += weight
+                    missing = True
+            score = common / (self.name_weight[name_id] + extra + unexplained_weight) * penalty
+            if missing:
+                score = min(score, UNEXPLAINED_SCORE_CAP)
+            canonical = self.canonical_names[name_id]
+            if score > best.get(canonical, (0.0,))[0]:
+                best[canonical] = (score, len(name_tokens))
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[1][1]))
+        return tuple((canonical, round(score, 3)) for canonical, (score, _) in ranked[:limit])
+
+    def _main_phrase(self, text: str) -> str:
+        """Strip the quantity and trailing preparation notes from ingredient text"""
+        quantity = parse_quantity(text.strip())
+        if quantity.amount is not None:
+            text = quantity.rest
+        text = fold_text(text)
+        main = _CLAUSE_BREAK.split(text, 1)[0]
+        return main if main.strip() else text
+
+    def _query(self, text: str) -> Tuple[List[str], Optional[str], int, List[str]]:
+        """
+        Get the known query stems (misspellings corrected), the head noun stem,
+        the correction count and the content stems no name contains
+        """
+        tokens, unexplained, content, corrections = [], [], [], 0
+        for word in _WORD_PATTERN.findall(self._main_phrase(text)):
+            token = stem(word)
+            if token not in self.idf and token in _DESCRIPTOR_STEMS:
+                continue
+            if token not in self.idf:
+                corrected = self._correct(token)
+                if corrected is None:
+                    # Unknown words cannot find candidates, but still need explaining
+                    unexplained.append(token)
+                    content.append(token)
+                    continue
+                token = corrected
+                corrections += 1
+            tokens.append(token)
+            if token not in _DESCRIPTOR_STEMS:
+                content.append(token)
+
+        head = content[-1] if content else None
+        return tokens, head, corrections, unexplained
+
+    def _candidates(self, tokens: List[str]) -> List[int]:
+        """Collect names sharing the longest query n-grams first, up to max_candidates"""
+        candidates = {}
+        for size in range(min(MAX_NGRAM, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                for name_id in self.postings.get(tuple(tokens[start:start + size]), ()):
+                    if len(candidates) >= self.max_candidates:
+                        return list(candidates)
+                    candidates[name_id] = None
+        return list(candidates)
+
+    def _correct(self, token: str) -> Optional[str]:
+        """Correct a word to the closest, then most frequent, vocabulary word within the edit distance"""
+        if len(token) < 4:
+            return None
+        max_distance = 1 if len(token) <= 5 else self.max_edit_distance
+
+        best, best_key = None, None
+        seen = set()
+        for variant in self._deletes_of(token):
+            for word in self.deletes.get(variant, ()):
+                if word in seen or abs(len(word) - len(token)) > max_distance:
+                    continue
+                seen.add(word)
+                distance = _edit_distance(token, word, max_distance)
+                if distance <= max_distance:
+                    key = (distance, -self.document_frequency[word])
+                    if best_key is None or key < best_key:
+                        best, best_key = word, key
+        return best
+
+    def _deletes_of(self, word: str) -> set:
+        """All strings reachable by deleting up to max_edit_distance characters of the word's prefix"""
+        variants = {word[:self.prefix_length]}
+        frontier = variants
+        for _ in range(self.max_edit_distance):
+            frontier = {
+                variant[:index] + variant[index + 1:]
+                for variant in frontier if len(variant) > 1
+                for index in range(len(variant))
+            }
+            variants |= frontier
+        return variants
+
+
+def _ngrams(tokens: Tuple[str, ...]) -> Iterable[Tuple[str, ...]]:
+    """Word n-grams of a name, up to MAX_NGRAM words"""
+    for size in range(1, min(MAX_NGRAM, len(tokens)) + 1):
+        for start in range(len(tokens) - size + 1):
+            yield tokens[start:start + size]
+
+
+def _edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count once), capped at max_distance + 1"""
+    previous_previous, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
@@ -9,21 +9,25 @@ This AI provides expert advice on recipes, ingredients, techniques, and all thin
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union, Annotated
 from datetime import datetime
 import asyncio
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field, ValidationError, AfterValidator
 import uvicorn
 
 # Import cooking-specific modules
 from cooking_ai import CookingAI
 from cooking_knowledge import CookingKnowledgeBase
-from cooking_chat import CookingChatInterface
-from recipe_analyzer import RecipeAnalyzer
+from cooking_chat import CookingChatInterface, check_session_id
+from recipe_analyzer import RecipeAnalyzer, ALL_ANALYSES
+from recipe_batch import RecipeBatchAnalyzer
+from recipe_validator import DEFAULT_MIN_SCORE
+from recipe_scaler import RecipeScaler
 from food_recognition import FoodRecognitionEngine
 
 # Configure logging
@@ -56,13 +60,33 @@ cooking_ai = CookingAI()
 knowledge_base = CookingKnowledgeBase()
 chat_interface = CookingChatInterface()
 recipe_analyzer = RecipeAnalyzer()
+recipe_batch_analyzer = RecipeBatchAnalyzer()
+recipe_scaler = RecipeScaler()
 food_recognition = FoodRecognitionEngine()
 
 # Pydantic models for API requests/responses
+SessionId = Annotated[Optional[str], AfterValidator(check_session_id)]
+
 class CookingChatRequest(BaseModel):
     message: str = Field(..., description="User's cooking-related question or message")
     context: Optional[Dict[str, Any]] = Field(default=None, description="Additional context (recipe, ingredients, etc.)")
     user_preferences: Optional[Dict[str, Any]] = Field(default=None, description="User's cooking preferences")
+    session_id: SessionId = Field(default=None, description="Conversation session the message belongs to")
+
+class CookingChatBatchItem(BaseModel):
+    message: str = Field(..., description="User's cooking-related question or message")
+    session_id: SessionId = Field(default=None, description="Conversation session the message belongs to")
+    context: Optional[Dict[str, Any]] = Field(default=None, description="Additional context (recipe, ingredients, etc.)")
+    user_preferences: Optional[Dict[str, Any]] = Field(default=None, description="User's cooking preferences")
+
+class CookingChatBatchRequest(BaseModel):
+    messages: List[CookingChatBatchItem] = Field(..., description="Cooking messages to answer in one batch")
+
+class CookingChatSocketMessage(BaseModel):
+    id: str = Field(..., description="Client-chosen id used to match pushed events to this question")
+    message: str = Field(..., description="User's cooking-related question or message")
+    context: Optional[Dict[str, Any]] = Field(default=None, description="Additional context (recipe, ingredients, etc.)")
+    user_preferences: Optional[Dict[str, Any]] = Field(default=None, description="User's cooking preferences")
 
 class CookingChatResponse(BaseModel):
     response: str = Field(..., description="AI's cooking-focused response")
@@ -72,7 +96,7 @@ class CookingChatResponse(BaseModel):
 
 class RecipeAnalysisRequest(BaseModel):
     recipe_text: str = Field(..., description="Recipe text to analyze")
-    analysis_type: str = Field(default="general", description="Type of analysis (general, ingredients, techniques, etc.)")
+    analysis_type: str = Field(default="general", description="Type of analysis (general, ingredients, techniques, nutrition, or all)")
 
 class RecipeAnalysisResponse(BaseModel):
     analysis: Dict[str, Any] = Field(..., description="Detailed recipe analysis")
@@ -81,6 +105,41 @@ class RecipeAnalysisResponse(BaseModel):
     cooking_time: str = Field(..., description="Estimated cooking time")
     nutrition_info: Optional[Dict[str, Any]] = Field(default=None, description="Nutritional information")
 
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response that keeps reading the request body while it streams.
+    StreamingResponse waits for client disconnects on the same receive channel
+    the request body arrives on, which would swallow unread body chunks.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+class RecipeScaleItem(BaseModel):
+    id: Optional[str] = Field(default=None, description="Client id echoed back with the scaled recipe")
+    recipe_text: Optional[str] = Field(default=None, description="Recipe text to parse and scale")
+    ingredients: Optional[List[Union[str, Dict[str, Any]]]] = Field(default=None, description="Ingredient lines or parsed ingredients, instead of recipe_text")
+    servings: Optional[float] = Field(default=None, description="Servings the recipe makes (read from recipe_text if omitted)")
+    target_servings: Optional[float] = Field(default=None, gt=0, description="Servings to scale this recipe to")
+    scale: Optional[float] = Field(default=None, gt=0, description="Explicit scale factor, overriding target_servings")
+    unit_system: Optional[str] = Field(default=None, description="Unit system for this recipe (us, metric)")
+
+class RecipeScaleRequest(BaseModel):
+    recipes: List[RecipeScaleItem] = Field(..., description="Recipes to scale in one batch")
+    target_servings: Optional[float] = Field(default=None, gt=0, description="Servings to scale recipes to unless they set their own")
+    unit_system: Optional[str] = Field(default=None, description="Unit system to convert to (us, metric); omit to keep units")
+
+class RecipeValidationItem(BaseModel):
+    id: Optional[str] = Field(default=None, description="Client id echoed back with the result")
+    recipe_text: str = Field(..., description="Recipe text to validate")
+
+class RecipeValidationRequest(BaseModel):
+    recipes: List[RecipeValidationItem] = Field(..., description="Recipes to validate in one batch")
+    min_score: float = Field(default=DEFAULT_MIN_SCORE, ge=0, le=1, description="Lowest score a recipe may have to be accepted")
+
 class FoodRecognitionRequest(BaseModel):
     image_url: str = Field(..., description="URL of food image to analyze")
     user_preferences: Optional[Dict[str, Any]] = Field(default=None, description="User's dietary preferences")
@@ -127,6 +186,7 @@ async def health_check():
             "knowledge_base": knowledge_base.is_ready(),
             "chat_interface": chat_interface.is_ready(),
             "recipe_analyzer": recipe_analyzer.is_ready(),
+            "recipe_batch_analyzer": recipe_batch_analyzer.is_ready(),
             "food_recognition": food_recognition.is_ready()
         }
     }
@@ -145,7 +205,8 @@ async def cooking_chat(request: CookingChatRequest):
         response = await chat_interface.process_message(
             message=request.message,
             context=request.context,
-            user_preferences=request.user_preferences
+            user_preferences=request.user_preferences,
+            session_id=request.session_id
         )
         
         return CookingChatResponse(**response)
@@ -154,11 +215,135 @@ async def cooking_chat(request: CookingChatRequest):
         logger.error(f"Error in cooking chat: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Cooking chat error: {str(e)}")
 
+# Batch cooking chat endpoint
+@app.post("/api/cooking/chat/batch")
+async def cooking_chat_batch(request: CookingChatBatchRequest):
+    """
+    Answer many cooking messages in one request.
+    Responses are streamed back as NDJSON, one line per message, in request order;
+    a message that failed carries an "error" field.
+    """
+    logger.info(f"Processing cooking chat batch: {len(request.messages)} messages")
+    
+    items = [item.model_dump() for item in request.messages]
+    
+    async def stream_responses():
+        index = 0
+        async for response in chat_interface.process_messages(items):
+            line = {
+                "index": index,
+                "session_id": items[index]["session_id"],
+                **CookingChatResponse(**response).model_dump()
+            }
+            if "error" in response:
+                line["error"] = response["error"]
+            yield json.dumps(line) + "\n"
+            index += 1
+    
+    return StreamingResponse(stream_responses(), media_type="application/x-ndjson")
+
+# Conversation history endpoint
+@app.get("/api/cooking/chat/history")
+async def get_chat_history(session_id: Optional[str] = None, offset: int = 0, limit: int = 50):
+    """
+    Get a page of conversation history for a chat session.
+    """
+    try:
+        history = await chat_interface.get_conversation_history(session_id=session_id, offset=offset, limit=limit)
+        
+        return {
+            "session_id": session_id,
+            "offset": offset,
+            "history": history
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting chat history: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Chat history error: {str(e)}")
+
+# Cooking chat WebSocket endpoint
+@app.websocket("/ws/cooking/chat")
+async def cooking_chat_socket(websocket: WebSocket, session_id: Optional[str] = None):
+    """
+    Chat with Cooking Ethos AI over one long-lived connection.
+    Each incoming frame is a question tagged with a client id; several questions
+    can be in flight at once and their events are pushed back tagged with that id.
+    """
+    await websocket.accept()
+    try:
+        session_id = await chat_interface.open_session(session_id)
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1008)
+        return
+    await websocket.send_json({"type": "session", "session_id": session_id})
+    
+    send_lock = asyncio.Lock()
+    in_flight = set()
+    
+    async def send_event(event: Dict[str, Any]):
+        async with send_lock:
+            await websocket.send_json(event)
+    
+    async def answer(question: CookingChatSocketMessage):
+        try:
+            async for event in chat_interface.stream_message(
+                message=question.message,
+                context=question.context,
+                user_preferences=question.user_preferences,
+                session_id=session_id
+            ):
+                await send_event({"id": question.id, **event})
+        except Exception as e:
+            logger.error(f"Error in cooking chat socket: {str(e)}")
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            # Questions are JSON; a binary frame is accepted when it is UTF-8 text
+            frame = message.get("text")
+            if frame is None:
+                try:
+                    frame = (message.get("bytes") or b"").decode("utf-8")
+                except UnicodeDecodeError:
+                    await send_event({"id": None, "type": "error", "detail": "Binary frames must be UTF-8 JSON"})
+                    continue
+            try:
+                question = CookingChatSocketMessage.model_validate_json(frame)
+            except (ValueError, TypeError, ValidationError) as e:
+                await send_event({"id": _frame_id(frame), "type": "error", "detail": str(e)})
+                continue
+            
+            task = asyncio.create_task(answer(question))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            
+    except WebSocketDisconnect:
+        logger.info(f"Cooking chat socket disconnected: {session_id}")
+    finally:
+        for task in in_flight:
+            task.cancel()
+        chat_interface.close_session(session_id)
+
+def _frame_id(frame: str) -> Optional[str]:
+    """Best-effort client id of a socket frame that failed validation"""
+    try:
+        data = json.loads(frame)
+    except ValueError:
+        return None
+    return data.get("id") if isinstance(data, dict) else None
+
 # Recipe analysis endpoint
 @app.post("/api/cooking/analyze-recipe", response_model=RecipeAnalysisResponse)
 async def analyze_recipe(request: RecipeAnalysisRequest):
     """
     Analyze a recipe and provide detailed insights, suggestions, and improvements.
+    With analysis_type "all", every analysis is computed from one parse and returned
+    together, keyed by analysis type.
     """
     try:
         logger.info(f"Analyzing recipe: {request.analysis_type}")
@@ -169,12 +354,118 @@ async def analyze_recipe(request: RecipeAnalysisRequest):
             analysis_type=request.analysis_type
         )
         
-        return RecipeAnalysisResponse(**analysis)
+        # Summary fields come from the general and nutrition analyses when they are included
+        if request.analysis_type == ALL_ANALYSES:
+            general, nutrition = analysis["general"], analysis["nutrition"]
+        else:
+            general = nutrition = analysis
+        
+        return RecipeAnalysisResponse(
+            analysis=analysis,
+            suggestions=general.get("suggestions", []),
+            difficulty=general.get("difficulty", "unknown"),
+            cooking_time=general.get("estimated_time", "Not specified"),
+            nutrition_info=nutrition.get("estimated_nutrition")
+        )
         
     except Exception as e:
         logger.error(f"Error in recipe analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Recipe analysis error: {str(e)}")
 
+# Bulk recipe analysis endpoint
+@app.post("/api/cooking/analyze-recipe/bulk")
+async def analyze_recipes_bulk(request: Request, analysis_type: str = "general", dedup: bool = False,
+                               validate: bool = False, min_score: float = DEFAULT_MIN_SCORE):
+    """
+    Analyze a stream of recipes for catalogue imports.
+    The request body is NDJSON, one {"id", "recipe_text", "analysis_type"} object per line.
+    Results are streamed back as NDJSON in completion order, tagged with the line index,
+    while the body is still being read; clients should read results as they upload.
+    With dedup, near-duplicates of earlier recipes are not analyzed; their results
+    carry "duplicate_of" instead of "analysis".
+    With validate, recipes are checked against the cooking validation rules first;
+    those with errors or a score under min_score carry "rejected" instead of "analysis".
+    """
+    if not recipe_batch_analyzer.is_ready():
+        raise HTTPException(status_code=503, detail="Recipe batch analyzer is not running")
+    
+    logger.info(f"Processing bulk recipe analysis: {analysis_type}")
+    
+    async def read_records():
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            lines = buffer.split(b"\n")
+            buffer = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield parse_record(line)
+        if buffer.strip():
+            yield parse_record(buffer)
+    
+    def parse_record(line: bytes) -> Dict[str, Any]:
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            return {"error": f"Invalid JSON: {str(e)}"}
+        return record if isinstance(record, dict) else {"error": "Each line must be a JSON object"}
+    
+    async def stream_results():
+        async for result in recipe_batch_analyzer.analyze_stream(read_records(), analysis_type=analysis_type,
+                                                                  dedup=dedup, validate=validate,
+                                                                  min_score=min_score):
+            yield json.dumps(result) + "\n"
+    
+    return DuplexStreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+# Recipe validation endpoint
+@app.post("/api/cooking/validate-recipes")
+async def validate_recipes(request: RecipeValidationRequest):
+    """
+    Check recipes against the cooking validation rules (temperatures, times, units,
+    serving sizes) without analyzing them. Each result has a score, whether the
+    recipe is accepted for import, and its violations.
+    """
+    try:
+        logger.info(f"Validating {len(request.recipes)} recipes")
+        
+        results = await recipe_batch_analyzer.validate_texts([recipe.recipe_text for recipe in request.recipes])
+        
+        return {"results": [
+            {"id": recipe.id, **result,
+             "accepted": recipe_batch_analyzer.recipe_validator.accepts(result, request.min_score)}
+            for recipe, result in zip(request.recipes, results)
+        ]}
+        
+    except Exception as e:
+        logger.error(f"Error validating recipes: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Recipe validation error: {str(e)}")
+
+# Recipe scaling endpoint
+@app.post("/api/cooking/scale-recipes")
+async def scale_recipes(request: RecipeScaleRequest):
+    """
+    Scale one or many recipes to target servings and optionally convert units.
+    Amounts are rounded to kitchen-friendly fractions (or sensible metric precision).
+    """
+    try:
+        logger.info(f"Scaling {len(request.recipes)} recipes")
+        
+        recipes = [recipe.model_dump(exclude_none=True) for recipe in request.recipes]
+        scaled = recipe_scaler.scale_recipes(
+            recipes,
+            target_servings=request.target_servings,
+            unit_system=request.unit_system
+        )
+        
+        return {"recipes": scaled}
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error scaling recipes: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Recipe scaling error: {str(e)}")
+
 # Food recognition endpoint
 @app.post("/api/cooking/recognize-food", response_model=FoodRecognitionResponse)
 async def recognize_food(request: FoodRecognitionRequest):
@@ -298,7 +589,10 @@ async def startup_event():
         await cooking_ai.initialize()
         await knowledge_base.initialize()
         await chat_interface.initialize()
+        # Chat pairing answers come from the recipe corpus CookingAI loaded
+        chat_interface.ingredient_pairing = cooking_ai.ingredient_pairing
         await recipe_analyzer.initialize()
+        await recipe_batch_analyzer.start()
         await food_recognition.initialize()
         
         logger.info("✅ Cooking Ethos AI initialized successfully!")
@@ -319,6 +613,7 @@ async def shutdown_event():
         await knowledge_base.cleanup()
         await chat_interface.cleanup()
         await recipe_analyzer.cleanup()
+        await recipe_batch_analyzer.stop()
         await food_recognition.cleanup()
         
         logger.info("✅ Cooking Ethos AI shutdown complete!")
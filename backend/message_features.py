@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+🍳 Message Features - Normalize-Once Message Features for Cooking Ethos AI
+
+This module turns a chat message into a precomputed feature object (normalized
+text, message type and entity matches) that is built once per request and
+shared by the classifier, extractors and handlers.
+"""
+
+import logging
+import re
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Classification checks intents in this order; the first one that matches wins
+INTENT_PRIORITY = [
+    ("recipe_questions", "recipe_question"),
+    ("technique_questions", "technique_question"),
+    ("ingredient_questions", "ingredient_question"),
+    ("safety_questions", "safety_question")
+]
+
+
+class MessageFeatures:
+    """
+    Precomputed view of one chat message.
+
+    The normalized text and message type are computed up front; entity matches
+    are computed on first use and then reused by every handler that asks for
+    them.
+
+    Attributes:
+        message: Original message text
+        text_lower: Lowercased message text
+        message_type: Classified message type
+    """
+
+    def __init__(self, extractor: "MessageFeatureExtractor", message: str):
+        self.extractor = extractor
+        self.message = message
+        self.text_lower = message.lower()
+        self.message_type = extractor.classify(self.text_lower)
+        self._entities = {}
+
+    def entities(self, entity_type: str) -> List[str]:
+        """Get vocabulary matches of an entity type, in vocabulary order"""
+        matches = self._entities.get(entity_type)
+        if matches is None:
+            words = self.extractor.vocabularies.get(entity_type, [])
+            matches = [word for word in words if word in self.text_lower]
+            self._entities[entity_type] = matches
+        return matches
+
+    def first_entity(self, entity_type: str, default: str = "") -> str:
+        """Get the first matched entity of a type"""
+        matches = self.entities(entity_type)
+        return matches[0] if matches else default
+
+    def contains(self, *phrases: str) -> bool:
+        """Check whether any phrase occurs in the normalized text"""
+        return any(phrase in self.text_lower for phrase in phrases)
+
+
+class MessageFeatureExtractor:
+    """
+    Builds MessageFeatures with patterns and vocabularies compiled once.
+
+    This class handles:
+    - Compiling the chat interface's intent patterns
+    - Holding entity vocabularies (food items, techniques, ingredients, ...)
+    - Classifying message intent
+    """
+
+    def __init__(self, intent_patterns: Dict[str, List[str]], vocabularies: Dict[str, List[str]]):
+        # One alternation per intent so classification is a single search per intent
+        self.intent_matchers = [
+            (re.compile("|".join(f"(?:{pattern})" for pattern in intent_patterns[intent])), intent_type)
+            for intent, intent_type in INTENT_PRIORITY
+            if intent_patterns.get(intent)
+        ]
+        self.vocabularies = {name: list(words) for name, words in vocabularies.items()}
+
+    def extract(self, message: str) -> MessageFeatures:
+        """Build the feature object for a message"""
+        return MessageFeatures(self, message)
+
+    def classify(self, text_lower: str) -> str:
+        """Classify normalized message text into a message type"""
+        for matcher, intent_type in self.intent_matchers:
+            if matcher.search(text_lower):
+                return intent_type
+        return "general_cooking"
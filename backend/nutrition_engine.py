@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+🍳 Nutrition Engine - Vectorized Nutrition Estimates for Cooking Ethos AI
+
+This module estimates recipe nutrition from an ingredients × nutrients matrix
+(values per 100 g). Ingredient amounts are converted to grams with the unit
+tables from quantity_parser and ingredient densities, so a recipe's totals
+are one matrix-vector product, and a batch of recipes is one scatter-add over
+all of their ingredients.
+"""
+
+import logging
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from quantity_parser import GRAMS_PER_UNIT, ML_PER_UNIT, canonical_unit
+from ingredient_resolver import IngredientResolver
+
+logger = logging.getLogger(__name__)
+
+NUTRIENTS = ["calories", "protein", "carbs", "fat", "fiber"]
+
+# Grams per milliliter; ingredients not listed are treated like water
+DENSITIES = {
+    "flour": 0.53, "sugar": 0.85, "brown sugar": 0.93, "powdered sugar": 0.56, "butter": 0.91,
+    "milk": 1.03, "cream": 1.01, "water": 1.0, "oil": 0.92, "olive oil": 0.92, "honey": 1.42,
+    "rice": 0.85, "oats": 0.41, "salt": 1.2, "cocoa": 0.42, "cheese": 0.45, "yogurt": 1.03
+}
+
+# Grams per piece, for counted ingredients ("2 eggs", "3 cloves garlic")
+PIECE_WEIGHTS = {
+    "egg": 50.0, "eggs": 50.0, "clove": 5.0, "garlic": 5.0, "stick": 113.0, "onion": 110.0, "onions": 110.0,
+    "tomato": 120.0, "tomatoes": 120.0, "potato": 170.0, "potatoes": 170.0, "carrot": 60.0, "carrots": 60.0,
+    "chicken breast": 175.0, "lemon": 60.0, "lime": 45.0, "banana": 120.0, "apple": 180.0
+}
+DEFAULT_PIECE_WEIGHT = 100.0
+
+# Lowest resolver score accepted for a fuzzy ingredient match
+MIN_MATCH_SCORE = 0.5
+
+# Amounts that carry no measurable weight
+UNMEASURED_UNITS = {"to taste", "pinch", "dash"}
+
+
+class NutritionEngine:
+    """
+    Nutrition calculator over a grams-normalized nutrient matrix.
+
+    This class handles:
+    - Building the ingredients × nutrients matrix from the ingredient database
+    - Converting ingredient amounts to grams
+    - Computing per-recipe totals and breakdowns
+    - Computing totals for many recipes in one call
+    """
+
+    def __init__(self, ingredient_database: Dict[str, Any], resolver: Optional[IngredientResolver] = None):
+        self.ingredient_names = []
+        rows = []
+
+        for name, info in ingredient_database.items():
+            nutrition = info.get("nutrition") if isinstance(info, dict) else None
+            if not nutrition:
+                continue
+            self.ingredient_names.append(name.lower())
+            rows.append([float(nutrition.get(nutrient, 0) or 0) for nutrient in NUTRIENTS])
+
+        self.ingredient_index = {name: row for row, name in enumerate(self.ingredient_names)}
+        # Nutrients per 100 g, one row per ingredient
+        self.matrix = np.asarray(rows, dtype=np.float64).reshape(len(rows), len(NUTRIENTS))
+        # Fuzzy fallback for names the exact lookups miss; may cover ingredients without nutrition
+        self.resolver = resolver or IngredientResolver(self.ingredient_names)
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Find the matrix row for an ingredient name, tolerating plurals, modifiers and misspellings"""
+        name = name.lower().strip()
+        for candidate in (name, name.rstrip("s"), name + "s", name.split()[-1] if name else ""):
+            row = self.ingredient_index.get(candidate)
+            if row is not None:
+                return row
+
+        for candidate, score in self.resolver.resolve(name):
+            if score < MIN_MATCH_SCORE:
+                break
+            row = self.ingredient_index.get(candidate.lower())
+            if row is not None:
+                return row
+        return None
+
+    def to_grams(self, amount: Optional[float], unit: Optional[str], name: str,
+                 amount_max: Optional[float] = None) -> float:
+        """Convert an ingredient amount (or the middle of a range) to grams"""
+        unit = canonical_unit(unit) or ""
+        if unit in UNMEASURED_UNITS:
+            return 0.0
+        amount = 1.0 if amount is None else amount
+        if amount_max is not None:
+            amount = (amount + amount_max) / 2
+
+        if unit in GRAMS_PER_UNIT:
+            return amount * GRAMS_PER_UNIT[unit]
+        if unit in ML_PER_UNIT:
+            return amount * ML_PER_UNIT[unit] * self._density(name)
+
+        # Counted ingredient: "3 cloves garlic", "2 large eggs", "1 onion"
+        piece_weight = PIECE_WEIGHTS.get(unit) or self._lookup(PIECE_WEIGHTS, name) or DEFAULT_PIECE_WEIGHT
+        return amount * piece_weight
+
+    def analyze(self, ingredients: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Estimate nutrition for one recipe's parsed ingredients
+
+        Returns:
+            "estimated_nutrition" totals and a per-ingredient "ingredient_breakdown"
+        """
+        rows, grams, matched = self._weigh(ingredients)
+        return self.summarize(matched, rows, grams)
+
+    def summarize(self, ingredients: List[Dict[str, Any]], rows: List[int], grams: np.ndarray) -> Dict[str, Any]:
+        """
+        Build totals and breakdown from already weighed ingredients
+
+        Args:
+            ingredients: Ingredients found in the database
+            rows: Their matrix rows
+            grams: Their weights in grams
+
+        Returns:
+            "estimated_nutrition" totals and a per-ingredient "ingredient_breakdown"
+        """
+        # Nutrients contributed by each matched ingredient, then summed
+        contributions = (grams / 100.0)[:, None] * self.matrix[rows]
+        totals = contributions.sum(axis=0)
+
+        breakdown = [
+            {
+                "name": ingredient["name"],
+                "grams": round(float(gram), 1),
+                "nutrition": self._as_dict(contribution)
+            }
+            for ingredient, gram, contribution in zip(ingredients, grams, contributions)
+        ]
+
+        return {
+            "estimated_nutrition": self._as_dict(totals),
+            "ingredient_breakdown": breakdown
+        }
+
+    def analyze_batch(self, recipes: List[List[Dict[str, Any]]]) -> np.ndarray:
+        """
+        Estimate nutrition totals for many recipes at once
+
+        Args:
+            recipes: Parsed ingredient lists, one per recipe
+
+        Returns:
+            Array of shape (len(recipes), len(NUTRIENTS)) with totals in NUTRIENTS order
+        """
+        recipe_ids, rows, grams = [], [], []
+        for recipe_id, ingredients in enumerate(recipes):
+            recipe_rows, recipe_grams, _ = self._weigh(ingredients)
+            recipe_ids.extend([recipe_id] * len(recipe_rows))
+            rows.extend(recipe_rows)
+            grams.extend(recipe_grams)
+
+        totals = np.zeros((len(recipes), len(NUTRIENTS)))
+        if rows:
+            np.add.at(totals, np.asarray(recipe_ids),
+                      (np.asarray(grams) / 100.0)[:, None] * self.matrix[np.asarray(rows)])
+        return totals
+
+    def totals_to_dicts(self, totals: np.ndarray) -> List[Dict[str, float]]:
+        """Convert batch totals to per-recipe nutrient dictionaries"""
+        return [self._as_dict(row) for row in totals]
+
+    def weigh(self, ingredient: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+        """Get the matrix row and gram weight of an ingredient, or None if it is not in the database"""
+        row = self.resolve(ingredient["name"])
+        if row is None:
+            return None
+        return row, self.to_grams(ingredient.get("amount"), ingredient.get("unit"), ingredient["name"],
+                                  ingredient.get("amount_max"))
+
+    def _weigh(self, ingredients: List[Dict[str, Any]]) -> Tuple[List[int], np.ndarray, List[Dict[str, Any]]]:
+        """Get matrix rows and gram weights of the ingredients found in the database"""
+        rows, grams, matched = [], [], []
+        for ingredient in ingredients:
+            weight = self.weigh(ingredient)
+            if weight is None:
+                continue
+            rows.append(weight[0])
+            grams.append(weight[1])
+            matched.append(ingredient)
+        return rows, np.asarray(grams, dtype=np.float64), matched
+
+    def _density(self, name: str) -> float:
+        """Get the density of an ingredient in g/ml"""
+        return self._lookup(DENSITIES, name) or 1.0
+
+    def _lookup(self, table: Dict[str, float], name: str) -> Optional[float]:
+        """Look up an ingredient in a table by full name, then by its last word"""
+        name = name.lower().strip()
+        if name in table:
+            return table[name]
+        words = name.split()
+        return table.get(words[-1]) if words else None
+
+    def _as_dict(self, values: np.ndarray) -> Dict[str, float]:
+        """Convert a nutrient vector to a rounded nutrient dictionary"""
+        return {nutrient: round(float(value), 1) for nutrient, value in zip(NUTRIENTS, values)}
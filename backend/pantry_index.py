@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+🍳 Pantry Index - Pantry Coverage Index for Cooking Ethos AI
+
+This module answers "what can I make with X, Y, Z". Each ingredient maps to a
+bitset (a Python int) of the recipes that use it. For a pantry, those bitsets
+are summed with bit-sliced counters, so every recipe's matched-ingredient count
+is computed with a handful of whole-bitset operations. Recipes missing 0, 1, 2
+ingredients are then read straight off the counters, fewest missing first.
+
+The module is pure Python so the Flask service can use it as well. That
+service deploys its own directory, so a copy lives at
+cooking-ethos-railway/pantry_index.py; backend/tests/test_pantry_index.py
+fails when the two differ.
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Any, Callable, Container, Iterable
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^a-z ]+")
+_WHITESPACE = re.compile(r"\s+")
+# Longest ingredient name, in words, looked for in free text
+MAX_NAME_WORDS = 3
+
+
+def normalize_ingredient(name: str) -> str:
+    """Normalize an ingredient name for matching ("Ripe Tomatoes" -> "ripe tomato")"""
+    words = _WHITESPACE.split(_NON_WORD.sub(" ", name.lower().replace("_", " ")).strip())
+    return " ".join(_singular(word) for word in words if word)
+
+
+def _singular(word: str) -> str:
+    """Crude singular of an ingredient word (berries -> berry, tomatoes -> tomato, eggs -> egg)"""
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def mentioned_ingredients(text: str, known: Container[str], normalize: Callable[[str], Optional[str]] = normalize_ingredient) -> List[str]:
+    """
+    Find known ingredients mentioned in free text
+
+    Word spans of up to MAX_NAME_WORDS words are normalized and looked up,
+    longest first, so "ground beef" is found rather than "beef".
+
+    Returns:
+        Normalized keys of the mentioned ingredients, longest names first
+    """
+    words = normalize_ingredient(text).split()
+    found = []
+    taken = [False] * len(words)
+    for size in range(MAX_NAME_WORDS, 0, -1):
+        for start in range(len(words) - size + 1):
+            if any(taken[start:start + size]):
+                continue
+            key = normalize(" ".join(words[start:start + size]))
+            if key in known and key not in found:
+                found.append(key)
+                taken[start:start + size] = [True] * size
+    return found
+
+
+class PantryIndex:
+    """
+    Ingredient -> recipe bitset index for pantry coverage queries.
+
+    This class handles:
+    - Indexing recipes by their normalized ingredients
+    - Finding the index's ingredients mentioned in free text
+    - Counting, per recipe, how many of its ingredients a pantry covers
+    - Ranking recipes by how few ingredients are missing
+    """
+
+    def __init__(self, recipes: Iterable[Dict[str, Any]] = (), normalize: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        Args:
+            recipes: Recipe records with "name" and "ingredients"
+            normalize: Maps ingredient text to its index key (default: normalize_ingredient)
+        """
+        self.normalize = normalize or normalize_ingredient
+        self.recipes = []
+        self.recipe_keys = []       # per recipe, its ingredient keys
+        self.ingredients = {}       # ingredient key -> bitset of recipes using it
+        self.sizes = {}             # ingredient count -> bitset of recipes with that many
+        self.all_recipes = 0
+        for recipe in recipes:
+            self.add(recipe)
+
+    def add(self, recipe: Dict[str, Any]) -> int:
+        """Index a recipe, returning its position"""
+        position = len(self.recipes)
+        bit = 1 << position
+        keys = []
+        for name in recipe.get("ingredients", []):
+            key = self.normalize(name)
+            if key and key not in keys:
+                keys.append(key)
+                self.ingredients[key] = self.ingredients.get(key, 0) | bit
+
+        self.recipes.append(recipe)
+        self.recipe_keys.append(keys)
+        self.sizes[len(keys)] = self.sizes.get(len(keys), 0) | bit
+        self.all_recipes |= bit
+        return position
+
+    def ingredients_in(self, text: str) -> List[str]:
+        """Find indexed ingredients mentioned in free text, longest names first"""
+        return mentioned_ingredients(text, self.ingredients, self.normalize)
+
+    def find(self, pantry: Iterable[str], max_missing: int = 2, limit: int = 10,
+             allowed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find recipes covered by a pantry
+
+        Args:
+            pantry: Ingredients the user has
+            max_missing: Most missing ingredients a recipe may have
+            limit: Most recipes returned
+            allowed: Bitset of the recipes that may be returned (bit i for recipe i),
+                e.g. those fitting the user's dietary restrictions; all when None
+
+        Returns:
+            {"recipe", "matched", "missing"} records, ranked by fewest missing
+            ingredients, then most matched ones
+        """
+        keys = {key for key in map(self.normalize, pantry) if key in self.ingredients}
+        if not keys:
+            return []
+
+        # Bit-sliced counters: bit i of a recipe's matched count is set in counters[i]
+        counters = []
+        for key in keys:
+            carry = self.ingredients[key]
+            for i, bits in enumerate(counters):
+                counters[i], carry = bits ^ carry, bits & carry
+                if not carry:
+                    break
+            if carry:
+                counters.append(carry)
+
+        universe = self.all_recipes if allowed is None else self.all_recipes & allowed
+        results = []
+        for missing in range(max_missing + 1):
+            for size in sorted(self.sizes, reverse=True):
+                matched = size - missing
+                if matched < 1:
+                    continue
+                candidates = self.sizes[size] & _count_equals(counters, matched, universe)
+                while candidates:
+                    lowest = candidates & -candidates
+                    position = lowest.bit_length() - 1
+                    candidates ^= lowest
+                    results.append(self._result(position, keys))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def _result(self, position: int, keys: set) -> Dict[str, Any]:
+        """Split a recipe's ingredients into those the pantry has and those it lacks"""
+        recipe = self.recipes[position]
+        matched, missing = [], []
+        for name, key in zip(recipe.get("ingredients", []), map(self.normalize, recipe.get("ingredients", []))):
+            (matched if key in keys else missing).append(name)
+        return {"recipe": recipe, "matched": matched, "missing": missing}
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+
+def _count_equals(counters: List[int], value: int, universe: int) -> int:
+    """Bitset of recipes whose bit-sliced count equals value"""
+    if value >> len(counters):
+        return 0
+    mask = universe
+    for i, bits in enumerate(counters):
+        mask &= bits if value >> i & 1 else ~bits
+    return mask
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+🍳 Quantity Parser - Quantities, Units and Conversions for Cooking Ethos AI
+
+This module lexes the quantity at the start of an ingredient line in a single
+precompiled pass: whole numbers, decimals, fractions, mixed numbers ("1 1/2"),
+unicode vulgar fractions ("½", "1½") and ranges ("2-3", "1 to 2"), followed by
+a unit alias ("T", "tbsp", "tablespoons") that is mapped to a canonical unit.
+It also holds the unit tables and memoized volume, weight and temperature
+conversions that nutrition and scaling build on.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Optional, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+UNICODE_FRACTIONS = {
+    "½": 1 / 2, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 1 / 4, "¾": 3 / 4, "⅕": 1 / 5, "⅖": 2 / 5, "⅗": 3 / 5,
+    "⅘": 4 / 5, "⅙": 1 / 6, "⅚": 5 / 6, "⅐": 1 / 7, "⅛": 1 / 8, "⅜": 3 / 8, "⅝": 5 / 8, "⅞": 7 / 8,
+    "⅑": 1 / 9, "⅒": 1 / 10
+}
+
+# Canonical unit -> aliases (matched case-insensitively)
+UNIT_ALIASES = {
+    "tsp": ["tsp", "tsps", "teaspoon", "teaspoons"],
+    "tbsp": ["tbsp", "tbsps", "tbs", "tbl", "tablespoon", "tablespoons"],
+    "cup": ["cup", "cups"],
+    "fl oz": ["fl oz", "fluid ounce", "fluid ounces"],
+    "ml": ["ml", "milliliter", "milliliters", "millilitre", "millilitres"],
+    "cl": ["cl", "centiliter", "centiliters", "centilitre", "centilitres"],
+    "dl": ["dl", "deciliter", "deciliters", "decilitre", "decilitres"],
+    "l": ["l", "liter", "liters", "litre", "litres"],
+    "pint": ["pint", "pints", "pt"],
+    "quart": ["quart", "quarts", "qt"],
+    "gallon": ["gallon", "gallons", "gal"],
+    "mg": ["mg", "milligram", "milligrams"],
+    "g": ["g", "gr", "gram", "grams", "gramme", "grammes"],
+    "kg": ["kg", "kilogram", "kilograms", "kilo", "kilos"],
+    "oz": ["oz", "ounce", "ounces"],
+    "lb": ["lb", "lbs", "pound", "pounds"],
+    "pinch": ["pinch", "pinches"],
+    "dash": ["dash", "dashes"],
+    "clove": ["clove", "cloves"],
+    "slice": ["slice", "slices"],
+    "stick": ["stick", "sticks"],
+    "can": ["can", "cans"],
+    "piece": ["piece", "pieces", "pc", "pcs"]
+}
+# Single-letter aliases where case matters: T is a tablespoon, t a teaspoon
+CASE_SENSITIVE_UNIT_ALIASES = {"T": "tbsp", "t": "tsp", "c": "cup", "C": "cup"}
+
+# Grams per canonical weight unit
+GRAMS_PER_UNIT = {"mg": 0.001, "g": 1.0, "kg": 1000.0, "oz": 28.3495, "lb": 453.592}
+
+# Milliliters per canonical volume unit
+ML_PER_UNIT = {
+    "ml": 1.0, "cl": 10.0, "dl": 100.0, "l": 1000.0, "tsp": 4.92892, "tbsp": 14.7868, "fl oz": 29.5735,
+    "cup": 236.588, "pint": 473.176, "quart": 946.353, "gallon": 3785.41
+}
+
+# Canonical temperature unit -> aliases
+TEMPERATURE_ALIASES = {
+    "F": ["f", "°f", "fahrenheit", "degrees f", "degrees fahrenheit"],
+    "C": ["c", "°c", "celsius", "centigrade", "degrees c", "degrees celsius"],
+    "K": ["k", "kelvin"]
+}
+
+_UNIT_LOOKUP = {alias: unit for unit, aliases in UNIT_ALIASES.items() for alias in aliases}
+_TEMPERATURE_LOOKUP = {alias: unit for unit, aliases in TEMPERATURE_ALIASES.items() for alias in aliases}
+
+_FRACTION_CHARS = "".join(UNICODE_FRACTIONS)
+_NUMBER = (
+    rf"(?:\d+\s+\d+\s*/\s*\d+"        # 1 1/2
+    rf"|\d+\s*[{_FRACTION_CHARS}]"   # 1½
+    rf"|\d+\s*/\s*\d+"               # 1/2
+    rf"|\d{{1,3}}(?:,\d{{3}})+(?:\.\d+)?(?!\d)"  # 1,000 and 1,000.5 (thousands separators)
+    rf"|\d+(?:[.,]\d+)?|\.\d+"       # 2, 2.5, 2,5, .5
+    rf"|[{_FRACTION_CHARS}])"        # ½
+)
+# The unit is lexed as one word (or a "fl oz" pair) and resolved by dictionary lookup
+_QUANTITY_PATTERN = re.compile(
+    rf"\s*(?P<amount>{_NUMBER})"
+    rf"(?:\s*(?:-|–|—|to)\s*(?P<amount_max>{_NUMBER}))?"
+    rf"\s*(?P<unit>(?i:fl\.?\s*oz|fluid\s+ounces?)|[A-Za-z]+)?\.?"
+    rf"\s*(?P<rest>.*)",
+    re.DOTALL
+)
+_MIXED_NUMBER = re.compile(r"(\d+)\s+(\d+)\s*/\s*(\d+)")
+_THOUSANDS = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?")
+
+
+class Quantity(NamedTuple):
+    """Quantity lexed from the start of an ingredient line"""
+    amount: Optional[float]
+    amount_max: Optional[float]
+    unit: Optional[str]
+    rest: str
+
+
+def lex_quantity(line: str) -> Quantity:
+    """
+    Split an ingredient line into amount, optional range maximum, canonical unit and the rest
+
+    "1 1/2 cups flour" -> Quantity(1.5, None, "cup", "flour")
+    "2-3 T olive oil"  -> Quantity(2.0, 3.0, "tbsp", "olive oil")
+    "salt to taste"    -> Quantity(None, None, None, "salt to taste")
+    """
+    line = line.replace("⁄", "/").strip()
+    match = _QUANTITY_PATTERN.match(line)
+    if not match:
+        return Quantity(None, None, None, line)
+
+    amount, amount_max, unit_word, rest = match.groups()
+    amount = parse_number(amount)
+    amount_max = parse_number(amount_max) if amount_max else None
+    if amount is None or (match.group("amount_max") and amount_max is None):
+        # Not a usable number ("1/0 cup milk", "1-1/0 cups milk"), so the line is only a name
+        return Quantity(None, None, None, line)
+    unit = _lookup_unit(unit_word) if unit_word else None
+    if unit_word and unit is None:
+        # Not a unit ("2 large eggs"), so the word belongs to the ingredient
+        rest = line[match.start("unit"):]
+    elif unit and rest[:3].lower() == "of ":
+        rest = rest[3:]
+
+    return Quantity(
+        amount,
+        amount_max,
+        unit,
+        rest.strip()
+    )
+
+
+# Ingredient lines repeat heavily across a corpus ("1 tsp salt"), so lexing is memoized
+parse_quantity = lru_cache(maxsize=65536)(lex_quantity)
+
+
+@lru_cache(maxsize=4096)
+def parse_number(text: str) -> Optional[float]:
+    """
+    Parse a lexed number: "2", "2.5", "2,5", "1,000", "1/2", "1 1/2", "½", "1½"
+
+    A comma followed by exactly three digits separates thousands; any other
+    comma is a decimal point. Fractions with a zero denominator give None.
+    """
+    text = text.strip()
+    mixed = _MIXED_NUMBER.fullmatch(text)
+    if mixed:
+        whole, numerator, denominator = (int(part) for part in mixed.groups())
+        return whole + numerator / denominator if denominator else None
+    if text[-1] in UNICODE_FRACTIONS:
+        whole = text[:-1].strip()
+        return (int(whole) if whole else 0) + UNICODE_FRACTIONS[text[-1]]
+    if "/" in text:
+        numerator, denominator = (int(part) for part in text.split("/"))
+        return numerator / denominator if denominator else None
+    if _THOUSANDS.fullmatch(text):
+        return float(text.replace(",", ""))
+    return float(text.replace(",", "."))
+
+
+def _lookup_unit(word: str) -> Optional[str]:
+    """Resolve a lexed unit word to its canonical unit, or None if it is not a unit"""
+    unit = CASE_SENSITIVE_UNIT_ALIASES.get(word)
+    if unit:
+        return unit
+    word = word.lower()
+    unit = _UNIT_LOOKUP.get(word)
+    if unit is None and (" " in word or "." in word):
+        # "fl. oz", "fluid  ounces"
+        unit = _UNIT_LOOKUP.get(" ".join(word.replace(".", " ").split()))
+    return unit
+
+
+@lru_cache(maxsize=1024)
+def canonical_unit(unit: Optional[str]) -> Optional[str]:
+    """Map a unit alias to its canonical unit; unknown units are returned lowercased"""
+    if not unit:
+        return None
+    unit = unit.strip().rstrip(".")
+    if unit in CASE_SENSITIVE_UNIT_ALIASES:
+        return CASE_SENSITIVE_UNIT_ALIASES[unit]
+    unit = unit.lower()
+    return _UNIT_LOOKUP.get(unit, unit)
+
+
+def unit_kind(unit: Optional[str]) -> Optional[str]:
+    """Get whether a canonical unit measures "volume" or "weight" """
+    if unit in ML_PER_UNIT:
+        return "volume"
+    if unit in GRAMS_PER_UNIT:
+        return "weight"
+    return None
+
+
+@lru_cache(maxsize=1024)
+def conversion_factor(from_unit: str, to_unit: str) -> Optional[float]:
+    """Factor converting an amount between two volume or two weight units, or None"""
+    from_unit, to_unit = canonical_unit(from_unit), canonical_unit(to_unit)
+    if from_unit in ML_PER_UNIT and to_unit in ML_PER_UNIT:
+        return ML_PER_UNIT[from_unit] / ML_PER_UNIT[to_unit]
+    if from_unit in GRAMS_PER_UNIT and to_unit in GRAMS_PER_UNIT:
+        return GRAMS_PER_UNIT[from_unit] / GRAMS_PER_UNIT[to_unit]
+    return None
+
+
+def convert(amount: float, from_unit: str, to_unit: str) -> Optional[float]:
+    """Convert an amount between two volume or two weight units"""
+    factor = conversion_factor(from_unit, to_unit)
+    return amount * factor if factor is not None else None
+
+
+@lru_cache(maxsize=64)
+def canonical_temperature_unit(unit: str) -> Optional[str]:
+    """Map a temperature unit alias ("°F", "celsius") to F, C or K"""
+    return _TEMPERATURE_LOOKUP.get(unit.strip().lower())
+
+
+@lru_cache(maxsize=16)
+def _temperature_transform(from_unit: str, to_unit: str) -> tuple:
+    """Scale and offset converting from_unit to to_unit via Kelvin"""
+    to_kelvin = {"K": (1.0, 0.0), "C": (1.0, 273.15), "F": (5 / 9, 273.15 - 32 * 5 / 9)}
+    scale_in, offset_in = to_kelvin[from_unit]
+    scale_out, offset_out = to_kelvin[to_unit]
+    return scale_in / scale_out, (offset_in - offset_out) / scale_out
+
+
+def convert_temperature(value: float, from_unit: str, to_unit: str) -> Optional[float]:
+    """Convert a temperature between Fahrenheit, Celsius and Kelvin"""
+    from_unit, to_unit = canonical_temperature_unit(from_unit), canonical_temperature_unit(to_unit)
+    if not from_unit or not to_unit:
+        return None
+    scale, offset = _temperature_transform(from_unit, to_unit)
+    return value * scale + offset
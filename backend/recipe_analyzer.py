@@ -14,8 +14,23 @@ from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import re
 
+import numpy as np
+
+from recipe_parser import RecipeParser
+from technique_matcher import TechniqueMatcher
+from nutrition_engine import NutritionEngine
+from ingredient_resolver import IngredientResolver
+from dietary_index import dietary_labels
+from cuisine_classifier import CuisineClassifier
+from result_cache import ResultCache, content_digest
+from analysis_cache import AnalysisCache, analysis_key, knowledge_version
+
 logger = logging.getLogger(__name__)
 
+# Analysis types understood by RecipeAnalyzer.analyze_recipe; "all" runs every one of them
+ANALYSIS_TYPES = ["general", "ingredients", "techniques", "nutrition"]
+ALL_ANALYSES = "all"
+
 class RecipeAnalyzer:
     """
     Analyzes recipes and provides insights and suggestions.
@@ -27,13 +42,27 @@ class RecipeAnalyzer:
     - Difficulty assessment
     - Nutritional analysis
     - Recipe optimization suggestions
+    
+    Finished analyses are cached by recipe content, analysis type and knowledge
+    data version. Below that, results are cached per ingredient line, instruction
+    step and section, so re-analyzing an edited version of a recipe only does
+    work for what changed.
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 65536, analysis_cache: Optional[AnalysisCache] = None):
         self.is_initialized = False
+        self.analysis_cache = analysis_cache or AnalysisCache()
+        # Per-line, per-section and per-version results, keyed by (kind, content)
+        self.result_cache = ResultCache(cache_size)
         self.recipe_patterns = {}
+        self.recipe_parser = RecipeParser(self.result_cache)
         self.ingredient_database = {}
+        self.ingredient_resolver = IngredientResolver({})
+        self.nutrition_engine = NutritionEngine({}, self.ingredient_resolver)
         self.technique_database = {}
+        self.technique_matcher = TechniqueMatcher({})
+        self.cuisine_classifier = CuisineClassifier.from_keywords()
+        self.knowledge_version = self._knowledge_version()
         
         # Recipe analysis patterns
         self.analysis_patterns = {
@@ -66,9 +95,20 @@ class RecipeAnalyzer:
             
             # Load ingredient database
             await self._load_ingredient_database()
+            self.ingredient_resolver = IngredientResolver.from_database(self.ingredient_database)
+            self.nutrition_engine = NutritionEngine(self.ingredient_database, self.ingredient_resolver)
             
             # Load technique database
             await self._load_technique_database()
+            self.technique_matcher = TechniqueMatcher(self.technique_database)
+            
+            # Load cuisine model
+            await self._load_cuisine_model()
+            
+            # Cached results were computed against the previous databases
+            self.result_cache.clear()
+            self.knowledge_version = self._knowledge_version()
+            await self.analysis_cache.open()
             
             self.is_initialized = True
             logger.info("✅ Recipe Analyzer initialized successfully!")
@@ -85,7 +125,14 @@ class RecipeAnalyzer:
             # Clear databases
             self.recipe_patterns.clear()
             self.ingredient_database.clear()
+            self.ingredient_resolver = IngredientResolver({})
+            self.nutrition_engine = NutritionEngine({}, self.ingredient_resolver)
             self.technique_database.clear()
+            self.technique_matcher = TechniqueMatcher({})
+            self.cuisine_classifier = CuisineClassifier.from_keywords()
+            self.result_cache.clear()
+            self.knowledge_version = self._knowledge_version()
+            await self.analysis_cache.close()
             
             self.is_initialized = False
             logger.info("✅ Recipe Analyzer cleanup complete!")
@@ -97,6 +144,11 @@ class RecipeAnalyzer:
         """Check if the recipe analyzer is ready"""
         return self.is_initialized
     
+    def _knowledge_version(self) -> str:
+        """Fingerprint the databases and models analyses depend on"""
+        return knowledge_version(self.ingredient_database, self.technique_database,
+                                 {"cuisine_model": self.cuisine_classifier.version})
+    
     async def _load_recipe_patterns(self):
         """Load recipe parsing patterns"""
         logger.info("📝 Loading recipe patterns...")
@@ -122,6 +174,23 @@ class RecipeAnalyzer:
             logger.error(f"❌ Error loading ingredient database: {str(e)}")
             self.ingredient_database = self._create_basic_ingredient_db()
     
+    async def _load_cuisine_model(self):
+        """Load the trained cuisine model"""
+        logger.info("🌍 Loading cuisine model...")
+        
+        # Load from file if available
+        model_file = "data/cuisine_model.npz"
+        try:
+            if os.path.exists(model_file):
+                self.cuisine_classifier = CuisineClassifier.load(model_file)
+                logger.info(f"✅ Loaded cuisine model ({len(self.cuisine_classifier.cuisines)} cuisines)")
+            else:
+                logger.warning(f"⚠️ Cuisine model not found: {model_file}")
+                self.cuisine_classifier = CuisineClassifier.from_keywords()
+        except Exception as e:
+            logger.error(f"❌ Error loading cuisine model: {str(e)}")
+            self.cuisine_classifier = CuisineClassifier.from_keywords()
+    
     async def _load_technique_database(self):
         """Load cooking technique database"""
         logger.info("👨‍🍳 Loading cooking technique database...")
@@ -146,28 +215,31 @@ class RecipeAnalyzer:
         
         Args:
             recipe_text: The recipe text to analyze
-            analysis_type: Type of analysis (general, ingredients, techniques, etc.)
+            analysis_type: Type of analysis (general, ingredients, techniques, nutrition, or all)
         
         Returns:
-            Dictionary containing analysis results
+            Dictionary containing analysis results; for "all", one entry per analysis type
         """
         logger.info(f"🔍 Analyzing recipe: {analysis_type}")
         
         try:
+            if analysis_type == ALL_ANALYSES:
+                return await self.analyze_all(recipe_text)
+            
+            # Serve re-imports and repeated views from the analysis cache
+            if analysis_type not in ANALYSIS_TYPES:
+                analysis_type = "general"
+            key = analysis_key(recipe_text, analysis_type, self.knowledge_version)
+            analysis = await self.analysis_cache.get(key)
+            if analysis is not None:
+                return analysis
+            
             # Parse recipe components
             parsed_recipe = await self._parse_recipe(recipe_text)
             
             # Perform analysis based on type
-            if analysis_type == "general":
-                analysis = await self._general_recipe_analysis(parsed_recipe)
-            elif analysis_type == "ingredients":
-                analysis = await self._ingredient_analysis(parsed_recipe)
-            elif analysis_type == "techniques":
-                analysis = await self._technique_analysis(parsed_recipe)
-            elif analysis_type == "nutrition":
-                analysis = await self._nutritional_analysis(parsed_recipe)
-            else:
-                analysis = await self._general_recipe_analysis(parsed_recipe)
+            analysis = await self.analyze_parsed_recipe(parsed_recipe, analysis_type)
+            await self.analysis_cache.put(key, analysis)
             
             return analysis
             
@@ -175,35 +247,70 @@ class RecipeAnalyzer:
             logger.error(f"❌ Error analyzing recipe: {str(e)}")
             raise
     
+    async def analyze_all(self, recipe_text: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Run every analysis type from a single parse of the recipe
+        
+        Args:
+            recipe_text: The recipe text to analyze
+        
+        Returns:
+            Dictionary with one analysis per entry of ANALYSIS_TYPES
+        """
+        # Look every analysis up at once; only the missing ones need the parse
+        keys = {analysis_type: analysis_key(recipe_text, analysis_type, self.knowledge_version)
+                for analysis_type in ANALYSIS_TYPES}
+        cached = await asyncio.gather(*(self.analysis_cache.get(key) for key in keys.values()))
+        analyses = dict(zip(ANALYSIS_TYPES, cached))
+        
+        missing = [analysis_type for analysis_type, analysis in analyses.items() if analysis is None]
+        if missing:
+            parsed_recipe = await self._parse_recipe(recipe_text)
+            computed = await asyncio.gather(*(
+                self.analyze_parsed_recipe(parsed_recipe, analysis_type) for analysis_type in missing
+            ))
+            analyses.update(zip(missing, computed))
+            await asyncio.gather(*(
+                self.analysis_cache.put(keys[analysis_type], analyses[analysis_type]) for analysis_type in missing
+            ))
+        
+        return analyses
+    
+    async def analyze_parsed_recipe(self, parsed_recipe: Dict[str, Any], analysis_type: str = "general") -> Dict[str, Any]:
+        """
+        Run one type of analysis on an already parsed recipe
+        
+        Args:
+            parsed_recipe: Output of _parse_recipe
+            analysis_type: Type of analysis (general, ingredients, techniques, etc.)
+        
+        Returns:
+            Dictionary containing analysis results
+        """
+        if analysis_type == "ingredients":
+            return await self._ingredient_analysis(parsed_recipe)
+        elif analysis_type == "techniques":
+            return await self._technique_analysis(parsed_recipe)
+        elif analysis_type == "nutrition":
+            return await self._nutritional_analysis(parsed_recipe)
+        else:
+            return await self._general_recipe_analysis(parsed_recipe)
+    
     async def _parse_recipe(self, recipe_text: str) -> Dict[str, Any]:
         """Parse recipe text into structured components"""
-        parsed = {
-            "ingredients": [],
-            "instructions": [],
-            "cooking_time": None,
-            "difficulty": "intermediate",
-            "cuisine_type": "general",
-            "dietary_info": []
+        # Versions are often analyzed more than once (one call per analysis type)
+        parsed = self.result_cache.get_or_compute(("recipe", content_digest(recipe_text)),
+                                                  self._parse_recipe_version, recipe_text)
+        return {
+            **parsed,
+            "ingredients": [dict(ingredient) for ingredient in parsed["ingredients"]],
+            "instructions": list(parsed["instructions"]),
+            "dietary_info": list(parsed["dietary_info"])
         }
-        
-        # Extract ingredients
-        ingredients_match = re.search(r"ingredients?:(.*?)(?=instructions?|directions?|steps?|$)", 
-                                    recipe_text, re.IGNORECASE | re.DOTALL)
-        if ingredients_match:
-            ingredients_text = ingredients_match.group(1).strip()
-            parsed["ingredients"] = self._parse_ingredients(ingredients_text)
-        
-        # Extract instructions
-        instructions_match = re.search(r"instructions?|directions?|steps?:(.*?)(?=servings?|yield|$)", 
-                                     recipe_text, re.IGNORECASE | re.DOTALL)
-        if instructions_match:
-            instructions_text = instructions_match.group(1).strip()
-            parsed["instructions"] = self._parse_instructions(instructions_text)
-        
-        # Extract cooking time
-        time_match = re.search(r"(\d+)\s*(?:minutes?|mins?|hours?|hrs?)", recipe_text, re.IGNORECASE)
-        if time_match:
-            parsed["cooking_time"] = time_match.group(0)
+    
+    def _parse_recipe_version(self, recipe_text: str) -> Dict[str, Any]:
+        """Parse a recipe version, reusing the lines and sections it shares with earlier versions"""
+        parsed = self.recipe_parser.parse(recipe_text)
         
         # Determine difficulty based on complexity
         parsed["difficulty"] = self._determine_difficulty(parsed)
@@ -216,67 +323,6 @@ class RecipeAnalyzer:
         
         return parsed
     
-    def _parse_ingredients(self, ingredients_text: str) -> List[Dict[str, Any]]:
-        """Parse ingredients text into structured format"""
-        ingredients = []
-        lines = ingredients_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Try to match ingredient patterns
-            for pattern in self.recipe_patterns["ingredients"]:
-                match = re.match(pattern, line, re.IGNORECASE)
-                if match:
-                    if len(match.groups()) == 3:
-                        amount, unit, name = match.groups()
-                        ingredients.append({
-                            "amount": float(amount) if amount else None,
-                            "unit": unit.lower(),
-                            "name": name.strip(),
-                            "original": line
-                        })
-                    elif len(match.groups()) == 2:
-                        amount, name = match.groups()
-                        ingredients.append({
-                            "amount": float(amount) if amount else None,
-                            "unit": None,
-                            "name": name.strip(),
-                            "original": line
-                        })
-                    break
-            else:
-                # No pattern matched, treat as ingredient name only
-                ingredients.append({
-                    "amount": None,
-                    "unit": None,
-                    "name": line,
-                    "original": line
-                })
-        
-        return ingredients
-    
-    def _parse_instructions(self, instructions_text: str) -> List[str]:
-        """Parse instructions text into steps"""
-        instructions = []
-        lines = instructions_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Remove step numbers and clean up
-            line = re.sub(r'^\d+\.\s*', '', line)
-            line = re.sub(r'^Step\s+\d+:\s*', '', line)
-            
-            if line:
-                instructions.append(line)
-        
-        return instructions
-    
     def _determine_difficulty(self, parsed_recipe: Dict[str, Any]) -> str:
         """Determine recipe difficulty based on various factors"""
         score = 0
@@ -313,42 +359,11 @@ class RecipeAnalyzer:
     
     def _determine_cuisine_type(self, recipe_text: str) -> str:
         """Determine cuisine type based on ingredients and terminology"""
-        text_lower = recipe_text.lower()
-        
-        cuisine_keywords = {
-            "italian": ["pasta", "basil", "oregano", "parmesan", "olive oil", "tomato"],
-            "french": ["butter", "wine", "shallots", "herbs de provence", "dijon"],
-            "chinese": ["soy sauce", "ginger", "sesame oil", "rice wine", "five spice"],
-            "japanese": ["miso", "dashi", "mirin", "sake", "wasabi", "nori"],
-            "indian": ["curry", "cumin", "turmeric", "cardamom", "garam masala"],
-            "mexican": ["chili", "lime", "cilantro", "tortilla", "queso", "salsa"]
-        }
-        
-        for cuisine, keywords in cuisine_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return cuisine
-        
-        return "general"
+        return self.cuisine_classifier.predict(recipe_text)
     
     def _extract_dietary_info(self, recipe_text: str) -> List[str]:
         """Extract dietary information from recipe text"""
-        text_lower = recipe_text.lower()
-        dietary_info = []
-        
-        dietary_keywords = {
-            "vegetarian": ["vegetarian", "veggie", "no meat"],
-            "vegan": ["vegan", "plant-based", "no dairy"],
-            "gluten-free": ["gluten-free", "gluten free", "gf"],
-            "dairy-free": ["dairy-free", "dairy free", "lactose-free"],
-            "low-carb": ["low-carb", "low carb", "keto"],
-            "healthy": ["healthy", "light", "low-fat"]
-        }
-        
-        for diet, keywords in dietary_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                dietary_info.append(diet)
-        
-        return dietary_info
+        return dietary_labels(recipe_text)
     
     async def _general_recipe_analysis(self, parsed_recipe: Dict[str, Any]) -> Dict[str, Any]:
         """Perform general recipe analysis"""
@@ -385,6 +400,12 @@ class RecipeAnalyzer:
     
     async def _ingredient_analysis(self, parsed_recipe: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze recipe ingredients"""
+        ingredients = parsed_recipe["ingredients"]
+        key = ("ingredient_analysis", tuple(map(self._ingredient_key, ingredients)))
+        return dict(self.result_cache.get_or_compute(key, self._analyze_ingredients, ingredients))
+    
+    def _analyze_ingredients(self, ingredients: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the ingredient analysis for an ingredients section"""
         analysis = {
             "ingredients": [],
             "substitutions": [],
@@ -392,12 +413,14 @@ class RecipeAnalyzer:
             "storage_tips": []
         }
         
-        for ingredient in parsed_recipe["ingredients"]:
+        for ingredient in ingredients:
+            canonical_name = self._resolve_ingredient(ingredient["name"])
             ingredient_info = {
                 "name": ingredient["name"],
+                "canonical_name": canonical_name,
                 "amount": ingredient["amount"],
                 "unit": ingredient["unit"],
-                "info": self.ingredient_database.get(ingredient["name"].lower(), {}),
+                "info": self.ingredient_database.get(canonical_name, {}) if canonical_name else {},
                 "substitutes": []
             }
             
@@ -413,56 +436,68 @@ class RecipeAnalyzer:
     
     async def _technique_analysis(self, parsed_recipe: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze cooking techniques used in recipe"""
+        instructions = parsed_recipe["instructions"]
+        key = ("technique_analysis", tuple(instructions))
+        return dict(self.result_cache.get_or_compute(key, self._analyze_techniques, instructions))
+    
+    def _analyze_techniques(self, instructions: List[str]) -> Dict[str, Any]:
+        """Build the technique analysis for an instructions section"""
         analysis = {
             "techniques": [],
             "equipment_needed": [],
             "skill_requirements": []
         }
         
-        # Analyze instructions for cooking techniques
-        for instruction in parsed_recipe["instructions"]:
-            instruction_lower = instruction.lower()
-            
-            for technique_name, technique_info in self.technique_database.items():
-                if technique_name in instruction_lower:
-                    analysis["techniques"].append({
-                        "name": technique_name,
-                        "description": technique_info["description"],
-                        "tips": technique_info["tips"],
-                        "equipment": technique_info["equipment"]
-                    })
-                    analysis["equipment_needed"].extend(technique_info["equipment"])
+        # Find techniques with the inverted index built from the technique database,
+        # reusing the matches of steps seen before
+        step_matches = [
+            self.result_cache.get_or_compute(("step_techniques", step), self.technique_matcher.match_step, step)
+            for step in instructions
+        ]
+        techniques, equipment_needed = self.technique_matcher.describe(
+            self.technique_matcher.merge_steps(step_matches)
+        )
+        analysis["techniques"] = techniques
+        analysis["equipment_needed"] = equipment_needed
         
         return analysis
     
     async def _nutritional_analysis(self, parsed_recipe: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze nutritional content of recipe"""
-        analysis = {
-            "estimated_nutrition": {
-                "calories": 0,
-                "protein": 0,
-                "carbs": 0,
-                "fat": 0,
-                "fiber": 0
-            },
-            "ingredient_breakdown": [],
-            "health_notes": []
-        }
-        
-        # Calculate estimated nutrition based on ingredients
-        for ingredient in parsed_recipe["ingredients"]:
-            ingredient_info = self.ingredient_database.get(ingredient["name"].lower(), {})
-            if ingredient_info and "nutrition" in ingredient_info:
-                nutrition = ingredient_info["nutrition"]
-                amount = ingredient["amount"] or 1
-                
-                # Simple calculation (in real implementation, would be more sophisticated)
-                for nutrient, value in nutrition.items():
-                    if nutrient in analysis["estimated_nutrition"]:
-                        analysis["estimated_nutrition"][nutrient] += value * amount
+        ingredients = parsed_recipe["ingredients"]
+        key = ("nutrition_analysis", tuple(map(self._ingredient_key, ingredients)))
+        analysis = dict(self.result_cache.get_or_compute(key, self._analyze_nutrition, ingredients))
+        analysis["health_notes"] = []
         
         return analysis
     
+    def _analyze_nutrition(self, ingredients: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Estimate nutrition for an ingredients section, reusing ingredients weighed before"""
+        # Amounts are converted to grams and multiplied through the nutrient matrix
+        matched, rows, grams = [], [], []
+        for ingredient in ingredients:
+            weight = self.result_cache.get_or_compute(
+                ("grams", self._ingredient_key(ingredient)), self.nutrition_engine.weigh, ingredient
+            )
+            if weight is not None:
+                matched.append(ingredient)
+                rows.append(weight[0])
+                grams.append(weight[1])
+        
+        return self.nutrition_engine.summarize(matched, rows, np.asarray(grams, dtype=np.float64))
+    
+    def _resolve_ingredient(self, name: str) -> Optional[str]:
+        """Map an ingredient name to its ingredient database key ("unsalted butter, softened" -> "butter")"""
+        key = name.lower()
+        if key in self.ingredient_database:
+            return key
+        return self.ingredient_resolver.resolve_one(key)
+    
+    def _ingredient_key(self, ingredient: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Cache key covering every ingredient field analysis depends on"""
+        return (ingredient["name"], ingredient.get("amount"), ingredient.get("amount_max"),
+                ingredient.get("unit"), ingredient.get("original"))
+    
     def _create_basic_ingredient_db(self) -> Dict[str, Any]:
         """Create basic ingredient database"""
         return {
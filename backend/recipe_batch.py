@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+🍳 Recipe Batch - Bulk Recipe Analysis for Cooking Ethos AI
+
+This module fans recipe parsing and analysis out across a process pool so
+catalogue-sized imports do not run on the event loop. Results are streamed
+back as each recipe finishes, with a bound on in-flight work. Duplicate checks
+and validation run on one background thread, in stream order.
+"""
+
+import os
+import logging
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple
+
+from recipe_analyzer import RecipeAnalyzer
+from recipe_parser import RecipeParser
+from recipe_dedup import RecipeDedupIndex
+from recipe_validator import RecipeValidator, DEFAULT_MIN_SCORE
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Per-process analyzer, built once by the pool initializer
+_worker_analyzer = None
+_worker_loop = None
+
+
+def _init_worker():
+    """Build the recipe analyzer for a worker process"""
+    global _worker_analyzer, _worker_loop
+    _worker_loop = asyncio.new_event_loop()
+    _worker_analyzer = RecipeAnalyzer()
+    _worker_loop.run_until_complete(_worker_analyzer.initialize())
+
+
+def _analyze_in_worker(recipe_text: str, analysis_type: str) -> Dict[str, Any]:
+    """Analyze one recipe inside a worker process"""
+    return _worker_loop.run_until_complete(
+        _worker_analyzer.analyze_recipe(recipe_text, analysis_type)
+    )
+
+
+class RecipeBatchAnalyzer:
+    """
+    Bulk recipe analyzer backed by a process pool.
+
+    This class handles:
+    - Running recipe analysis in worker processes
+    - Bounding the number of recipes queued or running at once
+    - Streaming results back in completion order
+    - Optionally skipping near-duplicates of recipes earlier in the stream
+    - Optionally rejecting recipes that fail validation before they are analyzed
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_in_flight: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.max_workers * 4
+        self.is_running = False
+        self._executor = None
+        # Parses recipes in this process for duplicate checks and validation; imports repeat many lines
+        self.recipe_parser = RecipeParser(ResultCache())
+        self.recipe_validator = RecipeValidator()
+        # One thread, so recipes are checked in submission order and the parser cache needs no lock
+        self._check_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recipe-check")
+
+    async def start(self):
+        """Start the worker process pool"""
+        logger.info(f"🏭 Starting recipe batch analyzer with {self.max_workers} workers...")
+        # Spawn rather than fork: the server process already runs threads that a fork could deadlock on
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        self.is_running = True
+
+    async def stop(self):
+        """Stop the worker process pool"""
+        if not self.is_running:
+            return
+
+        logger.info("🏭 Stopping recipe batch analyzer...")
+        self.is_running = False
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: self._executor.shutdown(wait=True, cancel_futures=True))
+        self._executor = None
+
+    def is_ready(self) -> bool:
+        """Check if the batch analyzer is ready"""
+        return self.is_running
+
+    async def validate_texts(self, recipe_texts: List[str]) -> List[Dict[str, Any]]:
+        """Parse and validate recipe texts in one batch (see RecipeValidator.validate_batch)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._check_executor,
+            lambda: self.recipe_validator.validate_batch([self.recipe_parser.parse(text) for text in recipe_texts])
+        )
+
+    def _check(self, index: int, recipe_text: str, dedup_index: Optional[RecipeDedupIndex], validate: bool,
+               min_score: float) -> Tuple[Optional[Dict[str, Any]], bool, Optional[Tuple[int, float]]]:
+        """
+        Validate a recipe and look it up in the duplicate index (on the check thread)
+
+        Returns:
+            (validation or None, whether it was rejected, (index, similarity) of an earlier duplicate or None)
+        """
+        parsed = self.recipe_parser.parse(recipe_text)
+        validation = self.recipe_validator.validate(parsed) if validate else None
+        rejected = validation is not None and not self.recipe_validator.accepts(validation, min_score)
+        # Rejected recipes are not indexed, so later copies are judged on their own
+        duplicate = None
+        if dedup_index is not None and not rejected:
+            duplicate = dedup_index.find_or_add(index, parsed)
+        return validation, rejected, duplicate
+
+    async def analyze_stream(self, records: AsyncIterator[Dict[str, Any]],
+                             analysis_type: str = "general", dedup: bool = False, validate: bool = False,
+                             min_score: float = DEFAULT_MIN_SCORE) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze a stream of recipes, yielding results as each one finishes
+
+        Args:
+            records: Recipe records with "recipe_text" and optional "id" and "analysis_type"
+            analysis_type: Analysis type for records that do not set one
+            dedup: Skip analyzing recipes that near-duplicate one earlier in the stream
+            validate: Validate recipes first and skip analyzing those that fail
+            min_score: Lowest validation score a recipe may have to be analyzed
+
+        Yields:
+            {"index", "id", "analysis"} for analyzed recipes (with "validation" when validating),
+            {"index", "id", "rejected": {"score", "valid", "violations"}} for recipes that failed validation,
+            {"index", "id", "duplicate_of": {"index", "id"}, "similarity"} for skipped duplicates, or
+            {"index", "id", "error"} for recipes that could not be analyzed
+        """
+        if not self.is_running:
+            raise RuntimeError("Recipe batch analyzer is not running")
+
+        loop = asyncio.get_running_loop()
+        # A slot is held from submission until the result has been consumed,
+        # so a slow reader also stops new recipes from being submitted
+        slots = asyncio.Semaphore(self.max_in_flight)
+        results = asyncio.Queue()
+        running = set()
+        dedup_index = RecipeDedupIndex() if dedup else None
+        record_ids = {}
+
+        async def analyze(index: int, record: Dict[str, Any]):
+            result = {"index": index, "id": record.get("id")}
+            record_ids[index] = record.get("id")
+            try:
+                recipe_text = record.get("recipe_text")
+                if record.get("error"):
+                    result["error"] = record["error"]
+                elif not isinstance(recipe_text, str) or not recipe_text.strip():
+                    result["error"] = "recipe_text is required"
+                else:
+                    validation, rejected, duplicate = None, False, None
+                    if dedup_index is not None or validate:
+                        # Submitted before the first await, so recipes are indexed in stream order
+                        validation, rejected, duplicate = await loop.run_in_executor(
+                            self._check_executor, self._check, index, recipe_text, dedup_index, validate, min_score
+                        )
+                    if rejected:
+                        result["rejected"] = validation
+                    elif duplicate:
+                        duplicate_index, similarity = duplicate
+                        result["duplicate_of"] = {"index": duplicate_index, "id": record_ids[duplicate_index]}
+                        result["similarity"] = round(similarity, 3)
+                    else:
+                        if validation is not None:
+                            result["validation"] = validation
+                        result["analysis"] = await loop.run_in_executor(
+                            self._executor,
+                            _analyze_in_worker,
+                            recipe_text,
+                            record.get("analysis_type") or analysis_type
+                        )
+            except Exception as e:
+                logger.error(f"❌ Error analyzing recipe {index}: {str(e)}")
+                result["error"] = str(e)
+            await results.put(result)
+
+        async def feed() -> int:
+            count = 0
+            async for record in records:
+                await slots.acquire()
+                task = asyncio.create_task(analyze(count, record))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                count += 1
+            return count
+
+        feeder = asyncio.create_task(feed())
+        feeder.add_done_callback(lambda _: results.put_nowait(None))
+        yielded = 0
+
+        try:
+            while True:
+                result = await results.get()
+                if result is None:
+                    # Feeder finished; its result says how many recipes remain
+                    total = feeder.result()
+                    if yielded == total:
+                        break
+                    continue
+                yield result
+                yielded += 1
+                slots.release()
+                if feeder.done() and yielded == feeder.result():
+                    break
+        finally:
+            feeder.cancel()
+            for task in running:
+                task.cancel()
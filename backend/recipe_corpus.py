@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+🍳 Recipe Corpus - Recipe Corpus Reading for Cooking Ethos AI
+
+This module reads JSONL or CSV recipe corpora for the offline command-line
+tools (analyze_corpus.py, cuisine_classifier.py). It imports nothing from the
+analyzers, so any module can use it without an import cycle.
+"""
+
+import csv
+import json
+import logging
+from typing import Dict, Any, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Read the records of a JSONL or CSV corpus (CSV when the path ends in .csv)"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            yield from (json.loads(line) for line in f if line.strip())
+
+
+def read_corpus(path: str, text_field: str, id_field: str) -> Iterator[Tuple[str, str]]:
+    """
+    Read (id, recipe_text) pairs from a JSONL or CSV corpus
+
+    Records without the text field are rebuilt from "ingredients" and
+    "instructions" fields when present. Records without an id are keyed by
+    their position in the corpus.
+    """
+    for position, record in enumerate(read_records(path)):
+        recipe_id = str(record.get(id_field) or position)
+        recipe_text = record.get(text_field)
+        if not recipe_text:
+            recipe_text = compose_recipe_text(record)
+        yield recipe_id, recipe_text or ""
+
+
+def compose_recipe_text(record: Dict[str, Any]) -> str:
+    """Build recipe text from separate ingredients and instructions fields"""
+    sections = []
+    for header in ("ingredients", "instructions"):
+        value = record.get(header)
+        if isinstance(value, list):
+            value = "\n".join(str(item) for item in value)
+        if value:
+            sections.append(f"{header.capitalize()}:\n{value}")
+    return "\n".join(sections)
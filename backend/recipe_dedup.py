@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+🍳 Recipe Dedup - Near-Duplicate Recipe Detection for Cooking Ethos AI
+
+This module finds near-identical recipes (the same recipe scraped from several
+sites, reformatted or rescaled) from parsed recipes. Each recipe becomes a set
+of features: its normalized ingredient names plus word shingles of its
+instructions, so amounts and formatting do not matter. MinHash signatures of
+those sets are stored in a banded LSH index, so checking a recipe against
+everything indexed costs a fixed number of bucket lookups. Signatures for a
+whole corpus are computed as numpy matrix operations, which is how batch
+clustering stays fast.
+"""
+
+import logging
+import re
+import zlib
+from typing import Dict, List, Optional, Any, Hashable, Iterable, Tuple
+
+import numpy as np
+
+from technique_matcher import stem_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+# Words per instruction shingle
+SHINGLE_SIZE = 3
+# Hash functions h(x) = (a * x + b) mod p; p < 2**32 keeps a * x within uint64
+_PRIME = np.uint64((1 << 31) - 1)
+# Signature value of a recipe without features; never matches anything
+_EMPTY = np.uint32(0xFFFFFFFF)
+# Recipes whose signatures are computed in one matrix operation
+_SIGNATURE_CHUNK = 1024
+
+
+def recipe_features(parsed_recipe: Dict[str, Any]) -> set:
+    """
+    Get the feature set of a parsed recipe
+
+    Args:
+        parsed_recipe: Output of RecipeParser.parse / RecipeAnalyzer._parse_recipe
+
+    Returns:
+        Normalized ingredient names ("i:...") and instruction shingles ("s:...")
+    """
+    features = set()
+    for ingredient in parsed_recipe.get("ingredients", []):
+        name = " ".join(stem_tokens(ingredient.get("name") or ""))
+        if name:
+            features.add("i:" + name)
+
+    # Instructions are long, so shingles use plain lowercase words rather than stems
+    words = _WORD_PATTERN.findall(" ".join(parsed_recipe.get("instructions", [])).lower())
+    if len(words) < SHINGLE_SIZE and words:
+        features.add("s:" + " ".join(words))
+    for start in range(len(words) - SHINGLE_SIZE + 1):
+        features.add("s:" + " ".join(words[start:start + SHINGLE_SIZE]))
+    return features
+
+
+class RecipeDedupIndex:
+    """
+    MinHash LSH index of recipes for near-duplicate detection.
+
+    This class handles:
+    - Computing MinHash signatures of recipe feature sets, one or many at a time
+    - Indexing signatures in banded LSH buckets
+    - Finding indexed recipes similar to a new one
+    - Clustering a corpus into groups of near-duplicates
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16, seed: int = 1):
+        """
+        Args:
+            threshold: Lowest estimated Jaccard similarity reported as a duplicate
+            num_perm: Hash functions per signature
+            bands: LSH bands; num_perm / bands rows each. 16 bands of 8 rows make
+                recipes above ~0.7 similarity collide in at least one band
+            seed: Seed of the hash functions, so signatures are stable across processes
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+        self.recipe_ids = []        # per indexed recipe
+        # Signature rows of indexed recipes, grown by doubling
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self._buckets = [{} for _ in range(bands)]  # per band: band bytes -> recipe positions
+
+    def signature(self, features: Iterable[str]) -> np.ndarray:
+        """Compute the MinHash signature of one feature set"""
+        return self.signatures([features])[0]
+
+    def signatures(self, feature_sets: Iterable[Iterable[str]]) -> np.ndarray:
+        """
+        Compute MinHash signatures of many feature sets
+
+        Returns:
+            uint32 array of shape (recipes, num_perm)
+        """
+        feature_sets = list(feature_sets)
+        result = np.full((len(feature_sets), self.num_perm), _EMPTY, dtype=np.uint32)
+
+        for chunk_start in range(0, len(feature_sets), _SIGNATURE_CHUNK):
+            chunk = feature_sets[chunk_start:chunk_start + _SIGNATURE_CHUNK]
+            hashes = [[zlib.crc32(feature.encode("utf-8")) for feature in features] for features in chunk]
+            counts = np.fromiter(map(len, hashes), dtype=np.int64, count=len(hashes))
+            present = np.flatnonzero(counts)
+            if not len(present):
+                continue
+
+            values = np.fromiter((value for row in hashes for value in row), dtype=np.uint64, count=int(counts.sum()))
+            permuted = (values[:, None] % _PRIME * self._a + self._b) % _PRIME
+            offsets = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+            result[chunk_start + present] = np.minimum.reduceat(permuted, offsets, axis=0)
+
+        return result
+
+    def add(self, recipe_id: Hashable, parsed_recipe: Dict[str, Any]):
+        """Index a parsed recipe under recipe_id"""
+        self._add_signature(recipe_id, self.signature(recipe_features(parsed_recipe)))
+
+    def query(self, parsed_recipe: Dict[str, Any]) -> List[Tuple[Hashable, float]]:
+        """
+        Find indexed recipes that are near-duplicates of a parsed recipe
+
+        Returns:
+            (recipe id, estimated similarity) pairs at or above the threshold, most similar first
+        """
+        return self._query_signature(self.signature(recipe_features(parsed_recipe)))
+
+    def find_or_add(self, recipe_id: Hashable, parsed_recipe: Dict[str, Any]) -> Optional[Tuple[Hashable, float]]:
+        """
+        Get the closest indexed near-duplicate of a parsed recipe, or index it when there is none
+
+        Returns:
+            (recipe id, estimated similarity) of the duplicate, or None if the recipe was added
+        """
+        signature = self.signature(recipe_features(parsed_recipe))
+        matches = self._query_signature(signature)
+        if matches:
+            return matches[0]
+        self._add_signature(recipe_id, signature)
+        return None
+
+    def cluster(self, recipes: Iterable[Tuple[Hashable, Dict[str, Any]]]) -> List[List[Hashable]]:
+        """
+        Index a corpus of parsed recipes and group its near-duplicates
+
+        Args:
+            recipes: (recipe id, parsed recipe) pairs
+
+        Returns:
+            Groups of two or more near-duplicate recipe ids, each in corpus order
+            (the first id of a group is the one to keep)
+        """
+        recipes = list(recipes)
+        first = len(self.recipe_ids)
+        signatures = self.signatures(recipe_features(parsed_recipe) for _, parsed_recipe in recipes)
+        for (recipe_id, _), signature in zip(recipes, signatures):
+            self._add_signature(recipe_id, signature)
+
+        # Union each bucket member with the bucket's first member when they are similar enough
+        parent = list(range(len(self.recipe_ids)))
+
+        def find(position: int) -> int:
+            while parent[position] != position:
+                parent[position] = parent[parent[position]]
+                position = parent[position]
+            return position
+
+        for buckets in self._buckets:
+            for positions in buckets.values():
+                if len(positions) < 2:
+                    continue
+                head = positions[0]
+                similarities = (self._signatures[positions[1:]] == self._signatures[head]).mean(axis=1)
+                for position, similarity in zip(positions[1:], similarities):
+                    if similarity >= self.threshold:
+                        root, other = find(head), find(position)
+                        if root != other:
+                            parent[max(root, other)] = min(root, other)
+
+        groups = {}
+        for position in range(first, len(self.recipe_ids)):
+            groups.setdefault(find(position), []).append(self.recipe_ids[position])
+        return [group for group in groups.values() if len(group) > 1]
+
+    def _add_signature(self, recipe_id: Hashable, signature: np.ndarray):
+        """Store a signature and enter it in every band's bucket"""
+        position = len(self.recipe_ids)
+        if position == len(self._signatures):
+            self._signatures = np.concatenate((self._signatures, np.empty_like(self._signatures)))
+        self.recipe_ids.append(recipe_id)
+        self._signatures[position] = signature
+        if signature[0] == _EMPTY:
+            return
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(position)
+
+    def _query_signature(self, signature: np.ndarray) -> List[Tuple[Hashable, float]]:
+        """Verify the recipes sharing a band with a signature against the threshold"""
+        if signature[0] == _EMPTY:
+            return []
+
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        if not candidates:
+            return []
+
+        candidates = sorted(candidates)
+        similarities = (self._signatures[candidates] == signature).mean(axis=1)
+        matches = [
+            (self.recipe_ids[position], float(similarity))
+            for position, similarity in zip(candidates, similarities) if similarity >= self.threshold
+        ]
+        return sorted(matches, key=lambda match: -match[1])
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[bytes]:
+        """Bucket keys of a signature, one per band"""
+        return (signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands))
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
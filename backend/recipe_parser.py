@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+🍳 Recipe Parser - Shared Recipe Text Parser for Cooking Ethos AI
+
+This module parses recipe text into structured ingredients, instructions and
+timing information. It is a single-pass, line-oriented state machine with
+precompiled patterns, shared by CookingAI and RecipeAnalyzer. Given a result
+cache, lines and sections seen before are not parsed again.
+"""
+
+import logging
+import re
+from itertools import chain
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+from quantity_parser import parse_quantity
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Section headers on their own line ("Ingredients", "## Directions") or with inline content ("Steps: ...")
+_SECTION_HEADER = re.compile(
+    r"^\s*(?:#+\s*)?(ingredients?|instructions?|directions?|steps?|method|preparation|"
+    r"servings?|serves|yield|notes?)\s*(?::\s*(.*))?$",
+    re.IGNORECASE
+)
+# Headers that follow other content on the same line ("... 1 egg Instructions: mix")
+_INLINE_HEADER = re.compile(
+    r"(?<=\S)[ \t]+(?=(?:ingredients?|instructions?|directions?|steps?|method)\s*:)",
+    re.IGNORECASE
+)
+_SECTION_STATES = {
+    "ingredient": "ingredients",
+    "instruction": "instructions",
+    "direction": "instructions",
+    "step": "instructions",
+    "method": "instructions",
+    "preparation": "instructions",
+    "serving": "servings",
+    "serves": "servings",
+    "yield": "servings",
+    "note": "notes"
+}
+
+_BULLET = re.compile(r"^[-*•·▪]\s*")
+_STEP_NUMBER = re.compile(r"^(?:\d+[.)]\s*|step\s+\d+\s*[:.)-]?\s*)", re.IGNORECASE)
+_INGREDIENT_TO_TASTE = re.compile(r"(.+)\s+to\s+taste", re.IGNORECASE)  # "salt to taste"
+_COOKING_TIME = re.compile(r"(\d+)\s*(?:minutes?|mins?|hours?|hrs?)", re.IGNORECASE)
+_SERVINGS = re.compile(r"(\d+)")
+_SERVINGS_LINE = re.compile(r"^(?:serves|servings?|yields?|makes)\s*:?\s*(\d+)\b", re.IGNORECASE)  # "Serves 4"
+# Lines that start with a number but are not ingredients ("2. Mix", "Step 3", "30 minutes later ...")
+_NOT_INGREDIENT = re.compile(
+    r"^\s*(?:\d+\s*[.)](?:\s|$)|step\s+\d+|\d+\s*(?:seconds?|secs?|minutes?|mins?|hours?|hrs?|degrees?|°))",
+    re.IGNORECASE
+)
+# Most words a confidently parsed ingredient name may have; longer ones read like prose
+MAX_CONFIDENT_NAME_WORDS = 8
+
+
+class RecipeParser:
+    """
+    Parses recipe text into structured components.
+
+    This class handles:
+    - Splitting recipe text into sections in one pass over its lines
+    - Parsing ingredient lines into amount, canonical unit and name
+    - Cleaning step numbering from instruction lines
+    - Extracting cooking time and servings
+    """
+
+    def __init__(self, result_cache: Optional[ResultCache] = None):
+        # Optional cache of per-line and per-section results, so re-parsing an
+        # edited recipe only parses the lines that changed
+        self.result_cache = result_cache
+
+    def parse(self, recipe_text: str) -> Dict[str, Any]:
+        """
+        Parse recipe text into structured components
+
+        Args:
+            recipe_text: The recipe text to parse
+
+        Returns:
+            Dictionary with "ingredients", "instructions", "cooking_time" and "servings"
+        """
+        sections = self.split_sections(recipe_text)
+        ingredients = self._parse_section("ingredients", sections["ingredients"], self.parse_ingredient_line)
+        instructions = self._parse_section("instructions", sections["instructions"], self.parse_instruction_line)
+        if self.result_cache is not None:
+            # Cached ingredients are shared between parses, so hand out copies
+            ingredients = [dict(ingredient) for ingredient in ingredients]
+
+        return {
+            "ingredients": ingredients,
+            "instructions": list(instructions),
+            "cooking_time": sections["cooking_time"],
+            "servings": sections["servings"]
+        }
+
+    def split_sections(self, recipe_text: str) -> Dict[str, Any]:
+        """
+        Split recipe text into raw section lines without parsing them
+
+        Args:
+            recipe_text: The recipe text to split
+
+        Returns:
+            Dictionary with the raw "ingredients" and "instructions" lines,
+            "cooking_time" and "servings"
+        """
+        parsed = {
+            "ingredients": [],
+            "instructions": [],
+            "cooking_time": None,
+            "servings": None
+        }
+
+        state = None
+        if self.result_cache is None:
+            pieces = map(self._classify_piece, _INLINE_HEADER.sub("\n", recipe_text).split("\n"))
+        else:
+            pieces = chain.from_iterable(
+                self.result_cache.get_or_compute(("line", raw_line), self._classify_line, raw_line)
+                for raw_line in recipe_text.split("\n")
+            )
+
+        for piece in pieces:
+            if piece is None:
+                continue
+            header_state, line, servings = piece
+
+            if servings is not None:
+                if parsed["servings"] is None:
+                    parsed["servings"] = servings
+                continue
+
+            if header_state:
+                state = header_state
+                if not line:
+                    continue
+
+            if state == "ingredients":
+                parsed["ingredients"].append(line)
+            elif state == "instructions":
+                parsed["instructions"].append(line)
+            elif state == "servings" and parsed["servings"] is None:
+                servings = _SERVINGS.search(line)
+                if servings:
+                    parsed["servings"] = int(servings.group(1))
+
+        time_match = _COOKING_TIME.search(recipe_text)
+        if time_match:
+            parsed["cooking_time"] = time_match.group(0)
+
+        return parsed
+
+    def parse_ingredient_line(self, line: str) -> Optional[Dict[str, Any]]:
+        """Parse a single ingredient line into amount, unit and name"""
+        line = _BULLET.sub("", line.strip())
+        if not line:
+            return None
+
+        # "1 1/2 cups flour", "½ tsp salt", "2-3 T olive oil", "2 large eggs"
+        quantity = parse_quantity(line)
+        if quantity.amount is not None:
+            return {
+                "amount": quantity.amount,
+                "amount_max": quantity.amount_max,
+                "unit": quantity.unit,
+                "name": quantity.rest or line,
+                "original": line
+            }
+
+        match = _INGREDIENT_TO_TASTE.match(line)
+        if match:
+            return {
+                "amount": None,
+                "amount_max": None,
+                "unit": "to taste",
+                "name": match.group(1).strip(),
+                "original": line
+            }
+
+        # No pattern matched, treat as ingredient name only
+        return {
+            "amount": None,
+            "amount_max": None,
+            "unit": None,
+            "name": line,
+            "original": line
+        }
+
+    def parse_ingredient_line_confidently(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse an ingredient line only when its structure leaves no doubt
+
+        A line is confident when it starts with a quantity ("2 cups flour",
+        "3 eggs") or ends in "to taste", and its name is short and not a
+        step, time or temperature. Anything else returns None, for a slower
+        extractor to handle.
+        """
+        if _NOT_INGREDIENT.match(_BULLET.sub("", line.strip())):
+            return None
+        ingredient = self.parse_ingredient_line(line)
+        if not ingredient or (ingredient["amount"] is None and ingredient["unit"] != "to taste"):
+            return None
+        name = ingredient["name"]
+        if not any(char.isalpha() for char in name) or len(name.split()) > MAX_CONFIDENT_NAME_WORDS:
+            return None
+        return ingredient
+
+    def ingredient_lines(self, text: str) -> List[str]:
+        """
+        Get the lines of text that may hold ingredients
+
+        Returns:
+            The ingredients section's lines when the text has one, otherwise
+            every non-blank line that is not a section header
+        """
+        lines = self.split_sections(text)["ingredients"]
+        if lines:
+            return lines
+        lines = []
+        for piece in map(self._classify_piece, _INLINE_HEADER.sub("\n", text).split("\n")):
+            if piece is not None and piece[0] is None and piece[2] is None:
+                lines.append(piece[1])
+        return lines
+
+    def parse_instruction_line(self, line: str) -> str:
+        """Strip bullets and step numbering from an instruction line"""
+        line = _BULLET.sub("", line.strip())
+        return _STEP_NUMBER.sub("", line).strip()
+
+    def _classify_line(self, raw_line: str) -> Tuple[Tuple[Optional[str], str, Optional[int]], ...]:
+        """Split a raw line at inline headers and classify each non-empty piece"""
+        pieces = map(self._classify_piece, _INLINE_HEADER.sub("\n", raw_line).split("\n"))
+        return tuple(piece for piece in pieces if piece is not None)
+
+    def _classify_piece(self, line: str) -> Optional[Tuple[Optional[str], str, Optional[int]]]:
+        """
+        Classify one line of recipe text
+
+        Returns:
+            (section state the line starts or None, content, servings or None),
+            or None for a blank line
+        """
+        line = line.strip()
+        if not line:
+            return None
+
+        servings_line = _SERVINGS_LINE.match(line)
+        if servings_line:
+            return None, line, int(servings_line.group(1))
+
+        header = _SECTION_HEADER.match(line)
+        if header:
+            return self._section_state(header.group(1)), (header.group(2) or "").strip(), None
+        return None, line, None
+
+    def _parse_section(self, kind: str, lines: List[str], parse_line: Callable[[str], Any]) -> List[Any]:
+        """Parse the lines of one section, dropping empty results"""
+        if self.result_cache is None:
+            return [result for result in map(parse_line, lines) if result]
+        return self.result_cache.get_or_compute((kind, tuple(lines)), self._parse_cached_lines, lines, parse_line)
+
+    def _parse_cached_lines(self, lines: List[str], parse_line: Callable[[str], Any]) -> List[Any]:
+        """Parse section lines, reusing the results of lines parsed before"""
+        results = (self.result_cache.get_or_compute((parse_line.__name__, line), parse_line, line) for line in lines)
+        return [result for result in results if result]
+
+    def _section_state(self, header: str) -> str:
+        """Map a section header word to a parser state"""
+        header = header.lower()
+        for prefix, state in _SECTION_STATES.items():
+            if header.startswith(prefix):
+                return state
+        return "notes"
+
+
+def recipe_windows(recipe_text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """
+    Split recipe text into windows of at most max_tokens, breaking at sections
+
+    Whole sections are packed into a window while they fit. A section too long
+    for one window is split between lines, each part repeating the section
+    header, and a single line too long for a window is split between words.
+    No text is dropped.
+
+    Args:
+        recipe_text: The recipe text to split
+        max_tokens: Token budget of a window
+        count_tokens: Counts the tokens of a line
+
+    Returns:
+        Window texts, in recipe order
+    """
+    sections = []
+    for line in _INLINE_HEADER.sub("\n", recipe_text).split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if _SECTION_HEADER.match(line) or not sections:
+            sections.append([])
+        sections[-1].append((line, count_tokens(line) + 1))     # +1 for the newline
+
+    windows = []
+    window, used = [], 0
+    for section in sections:
+        size = sum(tokens for _, tokens in section)
+        if used + size <= max_tokens:
+            window.extend(line for line, _ in section)
+            used += size
+            continue
+        if window:
+            windows.append("\n".join(window))
+            window, used = [], 0
+        if size <= max_tokens:
+            window, used = [line for line, _ in section], size
+            continue
+
+        # A bare header line ("Instructions:") is repeated in every part; one with inline content is not
+        bare_header = _SECTION_HEADER.match(section[0][0])
+        header, header_tokens = section[0] if bare_header and not bare_header.group(2) else (None, 0)
+        for line, tokens in section[1 if header else 0:]:
+            if used + tokens > max_tokens and window:
+                windows.append("\n".join(window))
+                window, used = [], 0
+            if not window and header:
+                window, used = [header], header_tokens
+            if used + tokens <= max_tokens:
+                window.append(line)
+                used += tokens
+                continue
+            for part in _split_words(line, max_tokens - used, max_tokens - header_tokens, count_tokens):
+                if window and used + count_tokens(part) + 1 > max_tokens:
+                    windows.append("\n".join(window))
+                    window, used = ([header], header_tokens) if header else ([], 0)
+                window.append(part)
+                used += count_tokens(part) + 1
+    if window:
+        windows.append("\n".join(window))
+    return windows
+
+
+def _split_words(line: str, first_budget: int, budget: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """Split an over-long line between words into parts within the budgets (the first part gets first_budget)"""
+    parts, part = [], []
+    limit = max(first_budget, 1)
+    for word in line.split():
+        if part and count_tokens(" ".join(part + [word])) + 1 > limit:
+            parts.append(" ".join(part))
+            part, limit = [], budget
+        part.append(word)
+    if part:
+        parts.append(" ".join(part))
+    return parts
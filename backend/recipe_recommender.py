@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+🍳 Recipe Recommender - Recipe Recommendations for Cooking Ethos AI
+
+This module ranks a recipe corpus for a user's available ingredients and
+preferences. Recipes are indexed once into a sparse term × recipe matrix (CSR
+arrays) whose terms are ingredients, cuisines and difficulty levels. A
+request becomes a sparse preference vector, so scoring touches only the
+postings of the terms it mentions. Exclusions are boolean masks, dietary
+restrictions among them (from the corpus's DietaryIndex), and the best recipes
+are picked with argpartition. Results are kept per user for a short time,
+because the same user usually asks again with the same pantry.
+"""
+
+import re
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Iterable
+
+import numpy as np
+
+from ingredient_resolver import IngredientResolver
+from dietary_index import DietaryIndex, preference_mask
+from technique_matcher import stem_tokens
+
+logger = logging.getLogger(__name__)
+
+_MINUTES = re.compile(r"(\d+)\s*(?:-\s*\d+\s*)?(minutes?|mins?|hours?|hrs?)", re.IGNORECASE)
+_BARE_MINUTES = re.compile(r"\d+(?:\.\d+)?")
+_DIFFICULTY_LEVELS = {
+    "easy": "beginner", "beginner": "beginner", "simple": "beginner",
+    "medium": "intermediate", "intermediate": "intermediate", "moderate": "intermediate",
+    "hard": "advanced", "advanced": "advanced", "difficult": "advanced", "expert": "advanced"
+}
+
+# Preference weights; available ingredients score the fraction of a recipe they cover (0..1)
+CUISINE_WEIGHT = 0.3
+SKILL_WEIGHT = 0.2
+FAVORITE_INGREDIENT_WEIGHT = 0.5
+
+
+def cooking_minutes(cooking_time: Any) -> Optional[float]:
+    """Convert a cooking time ("25 minutes", "1-2 hours", 40, "40") to minutes; None when it has none"""
+    if isinstance(cooking_time, (int, float)):
+        return float(cooking_time)
+    if isinstance(cooking_time, str) and _BARE_MINUTES.fullmatch(cooking_time.strip()):
+        return float(cooking_time)
+    minutes = None
+    for amount, unit in _MINUTES.findall(str(cooking_time or "")):
+        value = float(amount) * (60 if unit.lower().startswith("h") else 1)
+        minutes = (minutes or 0.0) + value
+    return minutes
+
+
+class RecipeRecommender:
+    """
+    Ranks recipes for available ingredients and user preferences.
+
+    This class handles:
+    - Indexing recipes into a sparse term × recipe matrix
+    - Building preference vectors from context and user preferences
+    - Scoring and excluding recipes with vectorized operations
+    - Caching each user's recent recommendations for a short time
+    """
+
+    def __init__(self, recipes: List[Dict[str, Any]], resolver: Optional[IngredientResolver] = None,
+                 cache_ttl: float = 60.0, cache_size: int = 4096, dietary_index: Optional[DietaryIndex] = None):
+        """
+        Build the recipe index
+
+        Args:
+            recipes: Recipe records with "name", "ingredients" and optional
+                "cuisine", "difficulty", "cooking_time" and "dietary" tags
+            dietary_index: Dietary masks of the recipes; built from them when not given
+            resolver: Maps ingredient text to canonical names; stems are used without one
+            cache_ttl: Seconds a user's recommendations are reused
+            cache_size: Most cached recommendations
+        """
+        self.recipes = recipes
+        self.resolver = resolver
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.dietary_index = dietary_index if dietary_index is not None else DietaryIndex(recipes)
+
+        self.terms = {}     # term -> row of the term × recipe matrix
+        postings = []       # per term, (recipe, value) pairs
+        self.minutes = np.full(len(recipes), np.inf, dtype=np.float32)
+
+        # Corpora repeat the same ingredient names, so each is normalized once
+        ingredient_terms = {}
+        for position, recipe in enumerate(recipes):
+            ingredients = set()
+            for name in recipe.get("ingredients", []):
+                term = ingredient_terms.get(name)
+                if term is None:
+                    term = ingredient_terms[name] = self.ingredient_term(name)
+                ingredients.add(term)
+            ingredients.discard(None)
+            recipe_terms = [(term, 1.0 / len(ingredients)) for term in ingredients]
+            if recipe.get("cuisine"):
+                recipe_terms.append(("cuisine:" + recipe["cuisine"].lower(), 1.0))
+            difficulty = _DIFFICULTY_LEVELS.get(str(recipe.get("difficulty", "")).lower())
+            if difficulty:
+                recipe_terms.append(("difficulty:" + difficulty, 1.0))
+
+            for term, value in recipe_terms:
+                row = self.terms.setdefault(term, len(self.terms))
+                if row == len(postings):
+                    postings.append([])
+                postings[row].append((position, value))
+
+            minutes = cooking_minutes(recipe.get("cooking_time"))
+            if minutes is not None:
+                self.minutes[position] = minutes
+
+        # CSR arrays: the postings of term t are indices/data[indptr[t]:indptr[t + 1]]
+        lengths = np.fromiter(map(len, postings), dtype=np.int64, count=len(postings))
+        self.indptr = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.indices = np.fromiter((p for rows in postings for p, _ in rows), dtype=np.int32, count=int(lengths.sum()))
+        self.data = np.fromiter((v for rows in postings for _, v in rows), dtype=np.float32, count=int(lengths.sum()))
+
+    def ingredient_term(self, name: str) -> Optional[str]:
+        """Normalize ingredient text to its matrix term ("2 ripe tomatoes" -> "tomato")"""
+        canonical = self.resolver.resolve_one(name) if self.resolver else None
+        if canonical is None:
+            tokens = stem_tokens(name)
+            canonical = " ".join(tokens) if tokens else None
+        return canonical and "ingredient:" + canonical.lower()
+
+    def recommend(self, available_ingredients: Optional[Iterable[str]] = None,
+                  user_preferences: Optional[Dict[str, Any]] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank recipes for a user
+
+        Args:
+            available_ingredients: Ingredients the user has on hand, as a list or
+                a comma-separated string ("eggs, flour")
+            user_preferences: "dietary_restrictions", "favorite_cuisines", "favorite_ingredients",
+                "disliked_ingredients", "allergies", "skill_level", "max_cooking_time" (minutes)
+                and "user_id" (scopes the cache)
+            limit: Most recipes returned
+
+        Returns:
+            Recipe records with "score", "matched" and "missing" ingredients, best first
+        """
+        available = sorted(set(_ingredient_list(available_ingredients)))
+        preferences = user_preferences or {}
+        key = (preferences.get("user_id"), tuple(available), json.dumps(preferences, sort_keys=True, default=str), limit)
+
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(key)
+            return list(cached[1])
+
+        recommendations = self._recommend(available, preferences, limit)
+        self._cache[key] = (now + self.cache_ttl, recommendations)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return list(recommendations)
+
+    def _recommend(self, available: List[str], preferences: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        """Score every recipe for one request and pick the best (uncached)"""
+        available_terms = {term for term in map(self.ingredient_term, available) if term}
+        weights = {term: 1.0 for term in available_terms}
+        for name in _as_list(preferences.get("favorite_ingredients")):
+            term = self.ingredient_term(name)
+            if term:
+                weights[term] = weights.get(term, 0.0) + FAVORITE_INGREDIENT_WEIGHT
+        for cuisine in _as_list(preferences.get("favorite_cuisines") or preferences.get("cuisine_preferences")):
+            weights["cuisine:" + cuisine.lower()] = CUISINE_WEIGHT
+        skill = _DIFFICULTY_LEVELS.get(str(preferences.get("skill_level", "")).lower())
+        if skill:
+            weights["difficulty:" + skill] = SKILL_WEIGHT
+
+        scores = self._scores(weights)
+        allowed = self._allowed(preferences)
+        scores[~allowed] = -np.inf
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        recommendations = []
+        for position in candidates:
+            recipe = self.recipes[position]
+            matched, missing = [], []
+            for name in recipe.get("ingredients", []):
+                (matched if self.ingredient_term(name) in available_terms else missing).append(name)
+            recommendations.append({**recipe, "score": round(float(scores[position]), 3),
+                                    "matched": matched, "missing": missing})
+        return recommendations
+
+    def _scores(self, weights: Dict[str, float]) -> np.ndarray:
+        """Multiply the term × recipe matrix by a sparse preference vector"""
+        rows = [(self.terms[term], weight) for term, weight in weights.items() if term in self.terms]
+        if not rows:
+            return np.zeros(len(self.recipes), dtype=np.float64)
+
+        indices = np.concatenate([self.indices[self.indptr[row]:self.indptr[row + 1]] for row, _ in rows])
+        values = np.concatenate([self.data[self.indptr[row]:self.indptr[row + 1]] * weight for row, weight in rows])
+        return np.bincount(indices, weights=values, minlength=len(self.recipes))
+
+    def _allowed(self, preferences: Dict[str, Any]) -> np.ndarray:
+        """Mask of recipes that respect restrictions, exclusions and the time limit"""
+        allowed = self.dietary_index.allowed(preference_mask(preferences))
+
+        excluded = _as_list(preferences.get("disliked_ingredients")) + _as_list(preferences.get("allergies"))
+        for name in excluded:
+            row = self.terms.get(self.ingredient_term(name))
+            if row is not None:
+                allowed[self.indices[self.indptr[row]:self.indptr[row + 1]]] = False
+
+        # A limit that says no time ("quick") is ignored
+        max_minutes = cooking_minutes(preferences.get("max_cooking_time"))
+        if max_minutes:
+            allowed &= self.minutes <= max_minutes
+
+        return allowed
+
+
+def _ingredient_list(value: Any) -> List[str]:
+    """Accept a list of ingredients or a comma-separated string of them"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [name.strip() for name in value.split(",") if name.strip()]
+    return [str(item) for item in value]
+
+
+def _as_list(value: Any) -> List[str]:
+    """Accept a single preference value or a list of them"""
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else [str(item) for item in value]
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+🍳 Recipe Scaler - Bulk Recipe Scaling for Cooking Ethos AI
+
+This module scales the ingredient lists of one or many recipes to a target
+number of servings and optionally converts them to US or metric units. All
+ingredients of a request are flattened into arrays, so scaling, conversion,
+unit selection and rounding to kitchen-friendly fractions are vectorized
+across the whole batch.
+"""
+
+import logging
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from quantity_parser import GRAMS_PER_UNIT, ML_PER_UNIT, canonical_unit
+from recipe_parser import RecipeParser
+
+logger = logging.getLogger(__name__)
+
+UNIT_SYSTEMS = ["us", "metric"]
+
+# Fractions a cook can measure, for rounding US amounts
+KITCHEN_FRACTIONS = np.array([0, 1 / 8, 1 / 4, 1 / 3, 3 / 8, 1 / 2, 5 / 8, 2 / 3, 3 / 4, 7 / 8, 1])
+_FRACTION_TEXT = {1 / 8: "1/8", 1 / 4: "1/4", 1 / 3: "1/3", 3 / 8: "3/8", 1 / 2: "1/2",
+                  5 / 8: "5/8", 2 / 3: "2/3", 3 / 4: "3/4", 7 / 8: "7/8"}
+
+# Display units per system, largest first, with the smallest amount shown in that unit
+_DISPLAY_UNITS = {
+    ("us", "volume"): [("cup", 0.25), ("tbsp", 1.0), ("tsp", 0.0)],
+    ("us", "weight"): [("lb", 1.0), ("oz", 0.0)],
+    ("metric", "volume"): [("l", 1.0), ("ml", 0.0)],
+    ("metric", "weight"): [("kg", 1.0), ("g", 0.0)]
+}
+_METRIC_UNITS = {"ml", "l", "g", "kg"}
+# Counted items: whole units (halves below one), or halves for items commonly split
+_WHOLE_COUNT_UNITS = {None, "clove", "slice", "piece"}
+_HALF_COUNT_UNITS = {"stick", "can"}
+_PLURAL_UNITS = {"cup": "cups", "clove": "cloves", "slice": "slices", "stick": "sticks", "can": "cans",
+                 "piece": "pieces", "pinch": "pinches", "dash": "dashes"}
+
+
+class RecipeScaler:
+    """
+    Vectorized recipe scaler.
+
+    This class handles:
+    - Parsing recipe text or ingredient lines when needed
+    - Scaling ingredient amounts to target servings
+    - Converting to US or metric units and picking readable units
+    - Rounding to kitchen-friendly fractions and whole counted items
+    """
+
+    def __init__(self):
+        self.parser = RecipeParser()
+
+    def scale_recipes(self, recipes: List[Dict[str, Any]], target_servings: Optional[float] = None,
+                      unit_system: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Scale many recipes in one pass
+
+        Args:
+            recipes: Recipes with "recipe_text" or "ingredients" (lines or parsed
+                ingredient dicts), and optionally "id", "servings",
+                "target_servings", "scale" and "unit_system"
+            target_servings: Default target servings for recipes that do not set one
+            unit_system: Default unit system ("us" or "metric"); None keeps units
+
+        Returns:
+            One result per recipe with "id", "servings", "scale", "scaled" and
+            "ingredients". A recipe asked for target servings without saying how
+            many it makes is left unscaled: "scaled" is False, "servings" is None
+            and "error" says why
+        """
+        ingredient_lists, recipe_meta = [], []
+        for recipe in recipes:
+            ingredients, servings = self._ingredients_and_servings(recipe)
+            target = recipe.get("target_servings") or target_servings
+            scale = recipe.get("scale") or (target / servings if target and servings else 1.0)
+            # Without source servings a target cannot be turned into a scale
+            error = None if recipe.get("scale") or not target or servings else "servings unknown; cannot scale"
+            system = recipe.get("unit_system", unit_system)
+            if system is not None and system not in UNIT_SYSTEMS:
+                raise ValueError(f"Unknown unit system: {system}")
+            ingredient_lists.append(ingredients)
+            recipe_meta.append((recipe.get("id"), servings * scale if servings else None, scale, system, error))
+
+        # Flatten every ingredient of every recipe into parallel arrays
+        flat = [ingredient for ingredients in ingredient_lists for ingredient in ingredients]
+        counts = [len(ingredients) for ingredients in ingredient_lists]
+        scales = np.repeat([meta[2] for meta in recipe_meta], counts).astype(np.float64)
+        systems = [meta[3] for meta, count in zip(recipe_meta, counts) for _ in range(count)]
+
+        amounts = np.array([np.nan if i.get("amount") is None else i["amount"] for i in flat], dtype=np.float64)
+        amount_maxes = np.array([np.nan if i.get("amount_max") is None else i["amount_max"] for i in flat],
+                                dtype=np.float64)
+        units = [canonical_unit(i.get("unit")) for i in flat]
+
+        amounts *= scales
+        amount_maxes *= scales
+        units, amounts, amount_maxes = self._convert_units(units, systems, amounts, amount_maxes)
+        rounded = self._round(units, amounts)
+        rounded_max = self._round(units, amount_maxes)
+
+        results, offset = [], 0
+        for (recipe_id, servings, scale, _, error), count in zip(recipe_meta, counts):
+            scaled = []
+            for i in range(offset, offset + count):
+                scaled.append(self._format_ingredient(flat[i], rounded[i], rounded_max[i], units[i]))
+            result = {"id": recipe_id, "servings": servings, "scale": scale, "scaled": error is None,
+                      "ingredients": scaled}
+            if error:
+                result["error"] = error
+            results.append(result)
+            offset += count
+
+        return results
+
+    def _ingredients_and_servings(self, recipe: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """Get parsed ingredients and original servings of a recipe"""
+        servings = recipe.get("servings")
+        if recipe.get("recipe_text"):
+            parsed = self.parser.parse(recipe["recipe_text"])
+            return parsed["ingredients"], servings or parsed["servings"]
+
+        ingredients = [
+            self.parser.parse_ingredient_line(item) if isinstance(item, str) else item
+            for item in recipe.get("ingredients") or []
+        ]
+        return [ingredient for ingredient in ingredients if ingredient], servings
+
+    def _convert_units(self, units: List[Optional[str]], systems: List[Optional[str]],
+                       amounts: np.ndarray, amount_maxes: np.ndarray):
+        """Convert volume and weight amounts to the readable unit of each target system"""
+        units = list(units)
+        base_factor = np.array([ML_PER_UNIT.get(unit) or GRAMS_PER_UNIT.get(unit) or np.nan for unit in units])
+        kinds = np.array(["volume" if unit in ML_PER_UNIT else "weight" if unit in GRAMS_PER_UNIT else ""
+                          for unit in units])
+        system_array = np.array([system or "" for system in systems])
+
+        # Amounts in ml or g
+        base = amounts * base_factor
+        base_max = amount_maxes * base_factor
+
+        for (system, kind), display_units in _DISPLAY_UNITS.items():
+            selected = (system_array == system) & (kinds == kind) & ~np.isnan(base)
+            if not selected.any():
+                continue
+            table = ML_PER_UNIT if kind == "volume" else GRAMS_PER_UNIT
+            # Largest unit whose threshold the amount reaches
+            choices = np.full(len(units), len(display_units) - 1)
+            for position in range(len(display_units) - 2, -1, -1):
+                unit, threshold = display_units[position]
+                choices = np.where(base / table[unit] >= threshold, position, choices)
+            for position, (unit, _) in enumerate(display_units):
+                mask = selected & (choices == position)
+                amounts[mask] = base[mask] / table[unit]
+                amount_maxes[mask] = base_max[mask] / table[unit]
+                for index in np.flatnonzero(mask):
+                    units[index] = unit
+
+        return units, amounts, amount_maxes
+
+    def _round(self, units: List[Optional[str]], amounts: np.ndarray) -> np.ndarray:
+        """Round metric amounts to sensible precision, counted items to whole units, the rest to kitchen fractions"""
+        metric = np.array([unit in _METRIC_UNITS for unit in units], dtype=bool)
+        whole_count = np.array([unit in _WHOLE_COUNT_UNITS for unit in units], dtype=bool)
+        half_count = np.array([unit in _HALF_COUNT_UNITS for unit in units], dtype=bool)
+        whole = np.floor(amounts)
+        fraction = amounts - whole
+        nearest = KITCHEN_FRACTIONS[np.abs(fraction[:, None] - KITCHEN_FRACTIONS[None, :]).argmin(axis=1)] \
+            if len(amounts) else np.zeros(0)
+        kitchen = whole + nearest
+        # Never round a real amount down to nothing
+        kitchen = np.where((kitchen == 0) & (amounts > 0), 1 / 8, kitchen)
+
+        metric_rounded = np.where(amounts >= 10, np.round(amounts), np.round(amounts, 1))
+
+        # Halves round up, so 7.5 eggs become 8 rather than 7 1/2
+        halves = np.floor(amounts * 2 + 0.5) / 2
+        halves = np.where((halves == 0) & (amounts > 0), 1 / 2, halves)
+        wholes = np.where(halves >= 1, np.floor(amounts + 0.5), halves)
+
+        rounded = np.where(metric, metric_rounded, kitchen)
+        rounded = np.where(half_count, halves, rounded)
+        return np.where(whole_count, wholes, rounded)
+
+    def _format_ingredient(self, ingredient: Dict[str, Any], amount: float, amount_max: float,
+                           unit: Optional[str]) -> Dict[str, Any]:
+        """Build the scaled ingredient entry with a display string"""
+        amount = None if np.isnan(amount) else float(amount)
+        amount_max = None if np.isnan(amount_max) else float(amount_max)
+
+        original = ingredient.get("original", ingredient["name"])
+        if amount is None:
+            # Nothing to scale ("salt to taste"), so show the line as written
+            display = original
+        else:
+            metric = unit in _METRIC_UNITS
+            quantity = format_amount(amount, metric)
+            if amount_max is not None:
+                quantity += f"-{format_amount(amount_max, metric)}"
+            if unit:
+                plural = (amount_max or amount) > 1
+                quantity += f" {_PLURAL_UNITS[unit] if plural and unit in _PLURAL_UNITS else unit}"
+            display = f"{quantity} {ingredient['name']}"
+
+        return {
+            "name": ingredient["name"],
+            "amount": amount,
+            "amount_max": amount_max,
+            "unit": unit,
+            "display": display,
+            "original": original
+        }
+
+
+def format_amount(amount: float, metric: bool = False) -> str:
+    """Format an amount as "1 1/2" (or "12.5" for metric units)"""
+    if metric:
+        return f"{amount:g}"
+    whole = int(amount)
+    remainder = amount - whole
+    if remainder < 1e-9:
+        return str(whole)
+    fraction = min(_FRACTION_TEXT, key=lambda value: abs(value - remainder))
+    if abs(fraction - remainder) > 1e-6:
+        # Not a kitchen fraction, so the amount was not rounded
+        return f"{amount:g}"
+    return f"{whole} {_FRACTION_TEXT[fraction]}" if whole else _FRACTION_TEXT[fraction]
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+🍳 Recipe Validator - Recipe Validation for Cooking Ethos AI
+
+This module checks parsed recipes against COOKING_VALIDATION_RULES so bulk
+imports can reject garbage before it reaches analysis and storage. The rules
+are compiled once into unit sets and numeric thresholds. A batch of recipes is
+flattened into numpy arrays of temperatures, times and ingredient amounts,
+every rule is one vectorized comparison over the whole batch, and only the
+rows that break a rule are turned into violations. Each recipe gets a score
+from 0 to 1 and its list of violations.
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+from cooking_prompts import COOKING_VALIDATION_RULES
+from quantity_parser import (
+    UNIT_ALIASES, canonical_unit, canonical_temperature_unit, convert_temperature, convert, unit_kind
+)
+
+logger = logging.getLogger(__name__)
+
+# Hottest temperature a home recipe can call for (wood-fired pizza ovens), °F
+MAX_TEMPERATURE_F = 1000
+# Units that count things rather than measure them; always accepted
+COUNT_UNITS = {"clove", "slice", "stick", "can", "piece"}
+# Count and container words the parser leaves in the name ("1 head of garlic"); also accepted
+COUNT_WORDS = {"head", "bunch", "stalk", "ear", "leaf", "leaves", "loaf", "fillet", "strip", "sheet", "cube", "wedge",
+               "package", "packet", "pack", "jar", "bag", "box", "bottle", "carton", "container", "tin"}
+# Measures without a fixed size that the parser leaves in the name ("2 handfuls spinach")
+VAGUE_MEASURES = {"handful", "knob", "splash", "drop", "dollop", "sprig", "scoop", "smidgen", "glug", "drizzle",
+                  "sprinkle", "squeeze", "dusting", "nub", "thumb"}
+# How far past the largest rule serving size an estimated serving may go before it is flagged
+SERVING_SLACK = 4
+# Score lost per violation, by severity
+PENALTIES = {"error": 0.4, "warning": 0.1}
+# Lowest score a bulk import accepts by default
+DEFAULT_MIN_SCORE = 0.5
+
+# "350°F", "180 °C", "375 degrees", "400 degrees Fahrenheit", "350F", "180 C", "200 celsius";
+# a bare F or C must be a capital letter so "2 c sugar" is not 2°C
+_TEMPERATURE = re.compile(
+    r"(-?\d+(?:\.\d+)?)\s*(?:(?:°\s*|degrees?\s*)(?:(fahrenheit|celsius|[FC])(?![a-z]))?"
+    r"|((?-i:[FC])|fahrenheit|celsius)\b)",
+    re.IGNORECASE
+)
+_TIME = re.compile(r"(\d+(?:\.\d+)?)\s*(?:(?:-|to)\s*(\d+(?:\.\d+)?)\s*)?(minutes?|mins?|hours?|hrs?)\b", re.IGNORECASE)
+_OVEN = re.compile(r"\b(?:oven|preheat|bake|baking|roast|broil)", re.IGNORECASE)
+_INTERNAL = re.compile(r"\b(?:internal|thermometer|reach(?:es)?|registers?)\b", re.IGNORECASE)
+_HEAT = re.compile(
+    r"\b(?:bake|baking|roast|cook|simmer|boil|fry|fries|saute|sauté|grill|broil|braise|steam|poach|sear|toast)",
+    re.IGNORECASE
+)
+_POULTRY = re.compile(r"\b(?:chicken|turkey|duck|goose|poultry|hen)\b", re.IGNORECASE)
+
+
+class RecipeValidator:
+    """
+    Rule-based validation of parsed recipes.
+
+    This class handles:
+    - Compiling COOKING_VALIDATION_RULES into unit sets and thresholds
+    - Extracting temperatures, times and amounts from parsed recipes
+    - Checking a whole batch of recipes with vectorized comparisons
+    - Scoring recipes and listing their violations
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            rules: Validation rules shaped like COOKING_VALIDATION_RULES (the default)
+        """
+        rules = rules or COOKING_VALIDATION_RULES
+        temperatures = rules["temperature_ranges"]
+        self.min_temperature = float(temperatures["freezer"][0])
+        self.cooking_minimum = float(temperatures["cooking_minimum"])
+        self.poultry_minimum = float(temperatures["poultry_minimum"])
+        self.max_minutes = float(max(high for _, high in rules["cooking_times"].values()))
+        self.max_serving_oz = float(max(high for _, high in rules["serving_sizes"].values())) * SERVING_SLACK
+
+        # The listed measurements, anything convertible to them, and counts
+        measurements = {canonical_unit(unit) for unit in rules["common_measurements"]}
+        kinds = {unit_kind(unit) for unit in measurements} - {None}
+        self.known_units = measurements | COUNT_UNITS | {unit for unit in UNIT_ALIASES if unit_kind(unit) in kinds}
+
+    def validate(self, recipe: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate one parsed recipe; see validate_batch"""
+        return self.validate_batch([recipe])[0]
+
+    def validate_batch(self, recipes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Validate parsed recipes
+
+        Args:
+            recipes: Parsed recipes with "ingredients" (dicts with "amount",
+                "unit", "name"), "instructions" and optional "servings",
+                as produced by RecipeParser.parse
+
+        Returns:
+            Per recipe, {"score", "valid", "violations"}. A violation is
+            {"rule", "severity", "message"}; valid means no errors
+        """
+        violations = [[] for _ in recipes]
+        self._check_temperatures(recipes, violations)
+        self._check_times(recipes, violations)
+        self._check_ingredients(recipes, violations)
+
+        penalties = np.zeros(len(recipes), dtype=np.float64)
+        for position, found in enumerate(violations):
+            penalties[position] = sum(PENALTIES[violation["severity"]] for violation in found)
+        scores = np.clip(1.0 - penalties, 0.0, 1.0)
+        return [
+            {"score": round(float(score), 3),
+             "valid": not any(violation["severity"] == "error" for violation in found),
+             "violations": found}
+            for score, found in zip(scores, violations)
+        ]
+
+    def accepts(self, result: Dict[str, Any], min_score: float = DEFAULT_MIN_SCORE) -> bool:
+        """Check whether a validation result is good enough to import"""
+        return result["valid"] and result["score"] >= min_score
+
+    def _check_temperatures(self, recipes: List[Dict[str, Any]], violations: List[List[Dict[str, Any]]]):
+        """Flag temperatures outside any kitchen range, cold ovens and unsafe internal temperatures"""
+        owners, values, ovens, internals = [], [], [], []
+        poultry = np.zeros(len(recipes), dtype=bool)
+        for position, recipe in enumerate(recipes):
+            poultry[position] = any(_POULTRY.search(_ingredient_name(item)) for item in recipe.get("ingredients", []))
+            for step in recipe.get("instructions", []):
+                for value, unit, bare_unit in _TEMPERATURE.findall(step):
+                    unit = unit or bare_unit
+                    fahrenheit = float(value)
+                    # Rules are in Fahrenheit, which is also assumed when no unit is given
+                    if unit and canonical_temperature_unit(unit) != "F":
+                        fahrenheit = convert_temperature(fahrenheit, unit, "F")
+                    owners.append(position)
+                    values.append(fahrenheit)
+                    ovens.append(bool(_OVEN.search(step)))
+                    internals.append(bool(_INTERNAL.search(step)))
+        if not owners:
+            return
+
+        owners = np.array(owners, dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        ovens = np.array(ovens, dtype=bool)
+        internals = np.array(internals, dtype=bool)
+        out_of_range = (values < self.min_temperature) | (values > MAX_TEMPERATURE_F)
+        in_range = ~out_of_range
+        rules = [
+            (out_of_range, "temperature_out_of_range", "error",
+             f"is outside {self.min_temperature:g} to {MAX_TEMPERATURE_F}°F"),
+            (in_range & ovens & ~internals & (values < self.cooking_minimum), "oven_temperature_too_low", "warning",
+             "is too cold for an oven; Celsius written as Fahrenheit?"),
+            (in_range & internals & poultry[owners] & (values < self.poultry_minimum),
+             "unsafe_poultry_temperature", "error", f"is below the {self.poultry_minimum:g}°F poultry must reach"),
+            (in_range & internals & ~poultry[owners] & (values < self.cooking_minimum),
+             "unsafe_internal_temperature", "warning", f"is below the {self.cooking_minimum:g}°F cooking minimum"),
+        ]
+        for mask, rule, severity, reason in rules:
+            for row in np.flatnonzero(mask):
+                violations[owners[row]].append(
+                    {"rule": rule, "severity": severity, "message": f"{values[row]:g}°F {reason}"}
+                )
+
+    def _check_times(self, recipes: List[Dict[str, Any]], violations: List[List[Dict[str, Any]]]):
+        """Flag cooking steps longer than any rule time range, and zero-length times"""
+        owners, minutes, heated = [], [], []
+        for position, recipe in enumerate(recipes):
+            for step in recipe.get("instructions", []):
+                heat = bool(_HEAT.search(step))
+                for low, high, unit in _TIME.findall(step):
+                    value = float(high or low) * (60 if unit.lower().startswith("h") else 1)
+                    owners.append(position)
+                    minutes.append(value)
+                    heated.append(heat)
+        if not owners:
+            return
+
+        owners = np.array(owners, dtype=np.int64)
+        minutes = np.array(minutes, dtype=np.float64)
+        heated = np.array(heated, dtype=bool)
+        # Resting, chilling and marinating may run long; only heat is bounded
+        for row in np.flatnonzero(heated & (minutes > self.max_minutes)):
+            violations[owners[row]].append({
+                "rule": "impossible_time", "severity": "error",
+                "message": f"{minutes[row]:g} minutes of cooking is over the {self.max_minutes:g} minute limit"
+            })
+        for row in np.flatnonzero(minutes <= 0):
+            violations[owners[row]].append(
+                {"rule": "zero_time", "severity": "warning", "message": "a step takes 0 minutes"}
+            )
+
+    def _check_ingredients(self, recipes: List[Dict[str, Any]], violations: List[List[Dict[str, Any]]]):
+        """Flag unknown units, impossible amounts and servings, and oversized servings"""
+        owners, units, amounts, ounces = [], [], [], []
+        for position, recipe in enumerate(recipes):
+            for item in recipe.get("ingredients", []):
+                if not isinstance(item, dict):
+                    continue
+                amount = item.get("amount")
+                unit = canonical_unit(item.get("unit"))
+                if unit is None and amount is not None:
+                    unit = canonical_unit(_unit_word(_ingredient_name(item)))
+                owners.append(position)
+                units.append(unit)
+                amounts.append(np.nan if amount is None else float(amount))
+                ounces.append(_ounces(amount, unit))
+
+        servings = np.array([_servings(recipe) for recipe in recipes], dtype=np.float64)
+        for position in np.flatnonzero(servings < 1):
+            violations[position].append({
+                "rule": "impossible_servings", "severity": "error",
+                "message": f"serves {servings[position]:g}"
+            })
+        if not owners:
+            return
+
+        owners = np.array(owners, dtype=np.int64)
+        known = np.fromiter((unit is None or unit in self.known_units for unit in units), dtype=bool, count=len(units))
+        amounts = np.array(amounts, dtype=np.float64)
+        for row in np.flatnonzero(~known):
+            violations[owners[row]].append(
+                {"rule": "unknown_unit", "severity": "warning", "message": f"unknown unit \"{units[row]}\""}
+            )
+        for row in np.flatnonzero(amounts <= 0):
+            violations[owners[row]].append({
+                "rule": "impossible_amount", "severity": "error",
+                "message": f"amount {amounts[row]:g} {units[row] or ''}".rstrip()
+            })
+
+        # Weights and volumes (a fluid ounce taken as an ounce) per serving
+        total_ounces = np.bincount(owners, weights=np.nan_to_num(np.array(ounces, dtype=np.float64)),
+                                   minlength=len(recipes))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_serving = total_ounces / servings
+        for position in np.flatnonzero(per_serving > self.max_serving_oz):
+            violations[position].append({
+                "rule": "serving_size_out_of_range", "severity": "warning",
+                "message": f"about {per_serving[position]:.0f} oz per serving"
+            })
+
+
+def _ingredient_name(item: Any) -> str:
+    """Name of a parsed ingredient or ingredient line"""
+    return item if isinstance(item, str) else str(item.get("name", ""))
+
+
+def _unit_word(name: str) -> Optional[str]:
+    """
+    Unit-like word the parser left at the start of an ingredient name, if any
+
+    "handfuls of spinach" and "knob butter" start with one; "large eggs",
+    "head of garlic" and "cilantro" do not.
+    """
+    words = name.lower().split()
+    if not words:
+        return None
+    word = words[0].strip(".,")
+    singulars = {word, word[:-1] if word.endswith("s") else word, word[:-2] if word.endswith("es") else word}
+    if singulars & COUNT_WORDS:
+        return None
+    vague = singulars & VAGUE_MEASURES
+    if vague:
+        return vague.pop()
+    # "2 lengths of lemongrass": a word before "of" is a measure of what follows
+    return word if len(words) > 2 and words[1] == "of" and word.isalpha() else None
+
+
+def _ounces(amount: Optional[float], unit: Optional[str]) -> float:
+    """Ounces (weight) or fluid ounces (volume) of an amount, NaN when it has neither"""
+    if amount is None or unit is None:
+        return np.nan
+    target = "oz" if unit_kind(unit) == "weight" else "fl oz" if unit_kind(unit) == "volume" else None
+    converted = convert(float(amount), unit, target) if target else None
+    return np.nan if converted is None else converted
+
+
+def _servings(recipe: Dict[str, Any]) -> float:
+    """Servings of a recipe, NaN when it does not say"""
+    servings = recipe.get("servings")
+    try:
+        return float(servings) if servings is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
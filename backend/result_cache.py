@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+🍳 Result Cache - Bounded Result Caching for Cooking Ethos AI
+
+This module holds a small LRU cache for computed results and a content digest
+for fingerprinting recipe text, so work on text that has been seen before
+(an unchanged ingredient line, an untouched instructions section, a recipe
+version analyzed a moment ago) is reused.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Bounded least-recently-used cache of computed results.
+
+    This class handles:
+    - Returning a cached result or computing and storing it
+    - Plain lookups and stores for results computed elsewhere
+    - Evicting the least recently used results beyond max_entries
+    - Counting hits and misses
+    """
+
+    def __init__(self, max_entries: int = 65536):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[..., Any], *args) -> Any:
+        """Get the result cached under key, or compute(*args) and cache it"""
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            result = compute(*args)
+            self._results[key] = result
+            if len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+            return result
+
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get the result cached under key, or default"""
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def put(self, key: Hashable, result: Any):
+        """Cache a result under key"""
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached result, e.g. when the data results depend on changes"""
+        self._results.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of cached results, hits and misses"""
+        return {"entries": len(self._results), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+def content_digest(text: str) -> str:
+    """Fingerprint text (a whole recipe version) as a short hex digest"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
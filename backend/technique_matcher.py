@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+🍳 Technique Matcher - Cooking Technique Detection for Cooking Ethos AI
+
+This module finds the cooking techniques used in recipe instructions. Technique
+names and aliases are stemmed and indexed by token once, so matching a recipe
+is a single pass over its instruction tokens regardless of how many techniques
+the database holds, and inflections like "baked" or "sautéed" still match.
+"""
+
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[a-z]+")
+# Suffixes stripped by the stemmer, longest first; (suffix, replacement)
+_SUFFIXES = [("ies", "y"), ("ied", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")]
+_MIN_STEM_LENGTH = 3
+
+
+def fold_text(text: str) -> str:
+    """Lowercase text and strip accents ("Sautéed" -> "sauteed")"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+# Recipe vocabularies are small and every word is stemmed many times
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Reduce a folded word to a stem shared by its inflections
+
+    bake/baked/baking -> bak, fry/fried/frying -> fry, chop/chopped -> chop,
+    sauté/sautéed/sautéing -> saut
+    """
+    for suffix, replacement in _SUFFIXES:
+        if suffix == "s" and word.endswith("ss"):
+            break
+        if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= _MIN_STEM_LENGTH:
+            word = word[:len(word) - len(suffix)] + replacement
+            # "chopped" -> "chopp" -> "chop"; keep "grill", "dress", "fizz"
+            if (replacement == "" and len(word) > _MIN_STEM_LENGTH and word[-1] == word[-2]
+                    and word[-1] not in "aeiouylsz"):
+                word = word[:-1]
+            break
+    if word.endswith("e") and len(word) > _MIN_STEM_LENGTH:
+        word = word[:-1]
+    return word
+
+
+def stem_tokens(text: str) -> List[str]:
+    """Fold, tokenize and stem text"""
+    return [stem(word) for word in _WORD_PATTERN.findall(fold_text(text))]
+
+
+class TechniqueMatcher:
+    """
+    Token-level inverted index over cooking technique names and aliases.
+
+    This class handles:
+    - Stemming technique names and aliases (including multi-word phrases)
+    - Indexing phrases by their first stemmed token
+    - Finding deduplicated techniques and the steps they appear in
+    """
+
+    def __init__(self, technique_database: Dict[str, Any]):
+        self.technique_database = technique_database
+        # First stem token -> [(remaining stem tokens, technique name)], longest phrase first
+        self.index = {}
+
+        for technique_name, technique_info in technique_database.items():
+            for phrase in [technique_name, *technique_info.get("aliases", [])]:
+                tokens = stem_tokens(phrase)
+                if tokens:
+                    self.index.setdefault(tokens[0], []).append((tuple(tokens[1:]), technique_name))
+
+        for candidates in self.index.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+    def match(self, instructions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Find the techniques used in a recipe's instructions
+
+        Args:
+            instructions: Instruction steps in order
+
+        Returns:
+            One entry per technique, in order of first use, with "name" and the
+            0-based "positions" of the steps that use it
+        """
+        return self.merge_steps([self.match_step(instruction) for instruction in instructions])
+
+    def match_step(self, instruction: str) -> List[str]:
+        """Find the techniques used in one instruction step, in order of first use"""
+        names = []
+        tokens = stem_tokens(instruction)
+        token_index = 0
+        while token_index < len(tokens):
+            candidates = self.index.get(tokens[token_index])
+            token_index += 1
+            if not candidates:
+                continue
+            for rest, technique_name in candidates:
+                if tuple(tokens[token_index:token_index + len(rest)]) == rest:
+                    if technique_name not in names:
+                        names.append(technique_name)
+                    # "deep fry" should not also count as "fry"
+                    token_index += len(rest)
+                    break
+        return names
+
+    @staticmethod
+    def merge_steps(step_matches: List[List[str]]) -> List[Dict[str, Any]]:
+        """Combine per-step technique names into match entries with step positions"""
+        positions = {}
+        for step_index, names in enumerate(step_matches):
+            for name in names:
+                positions.setdefault(name, []).append(step_index)
+        return [{"name": name, "positions": steps} for name, steps in positions.items()]
+
+    def analyze(self, instructions: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Build technique details and the combined equipment list for a recipe
+
+        Returns:
+            Technique entries with description, tips, equipment and positions,
+            and the deduplicated equipment they need
+        """
+        return self.describe(self.match(instructions))
+
+    def describe(self, matches: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Build technique details and the combined equipment list for match entries"""
+        techniques = []
+        equipment_needed = []
+
+        for match in matches:
+            technique_info = self.technique_database[match["name"]]
+            equipment = technique_info.get("equipment", [])
+            techniques.append({
+                "name": match["name"],
+                "description": technique_info.get("description", ""),
+                "tips": technique_info.get("tips", []),
+                "equipment": equipment,
+                "positions": match["positions"]
+            })
+            for item in equipment:
+                if item not in equipment_needed:
+                    equipment_needed.append(item)
+
+        return techniques, equipment_needed
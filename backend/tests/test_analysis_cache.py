@@ -0,0 +1,93 @@
+"""Tests for AnalysisCache keys, sqlite store and knowledge version invalidation"""
+
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import analysis_cache
+from analysis_cache import AnalysisCache, analysis_key, knowledge_version
+from recipe_analyzer import RecipeAnalyzer
+
+RECIPE = "Ingredients:\n2 cups flour\n2 eggs\nInstructions:\n1. Mix and bake for 20 minutes."
+
+
+def test_key_ignores_formatting_but_not_type_version_or_schema(monkeypatch):
+    key = analysis_key(RECIPE, "general", "v1")
+    assert analysis_key("  " + RECIPE.replace("\n", "\r\n\n") + "\n", "general", "v1") == key
+    assert analysis_key(RECIPE, "nutrition", "v1") != key
+    assert analysis_key(RECIPE, "general", "v2") != key
+    assert analysis_key(RECIPE + " Serve warm.", "general", "v1") != key
+
+    monkeypatch.setattr(analysis_cache, "ANALYSIS_CACHE_SCHEMA", analysis_cache.ANALYSIS_CACHE_SCHEMA + 1)
+    assert analysis_key(RECIPE, "general", "v1") != key
+
+
+def test_knowledge_version_follows_database_content():
+    ingredients = {"flour": {"category": "grains"}}
+    version = knowledge_version(ingredients, {})
+    assert knowledge_version({"flour": {"category": "grains"}}, {}) == version
+    assert knowledge_version({"flour": {"category": "baking"}}, {}) != version
+
+
+def test_sqlite_store_serves_other_instances_and_prunes(monkeypatch, tmp_path):
+    path = str(tmp_path / "cache" / "analyses.sqlite3")
+    # Distinct write times, so the oldest entry is well defined
+    monkeypatch.setattr(analysis_cache, "time", SimpleNamespace(time=itertools.count(1).__next__))
+
+    async def run():
+        writer = AnalysisCache(db_path=path, max_disk_entries=2)
+        await writer.open()
+        for number in range(3):
+            await writer.put(f"key{number}", {"number": number})
+        writer._locked(writer._prune)
+        await writer.close()
+
+        reader = AnalysisCache(db_path=path)
+        await reader.open()
+        found = [await reader.get(f"key{number}") for number in range(3)]
+        first = await reader.get("key2")
+        first["number"] = 99
+        again = await reader.get("key2")
+        stats = reader.stats()
+        await reader.close()
+        return found, again, stats
+
+    found, again, stats = asyncio.run(run())
+    # The oldest entry was evicted; hits are independent copies
+    assert found == [None, {"number": 1}, {"number": 2}]
+    assert again == {"number": 2}
+    assert stats["disk_hits"] == 2 and stats["disk"]
+
+
+def test_unopenable_store_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+
+    async def run():
+        cache = AnalysisCache(db_path=str(blocker / "analyses.sqlite3"))
+        await cache.open()
+        await cache.put("key", {"ok": True})
+        return await cache.get("key"), cache.stats()["disk"]
+
+    assert asyncio.run(run()) == ({"ok": True}, False)
+
+
+def test_analyzer_misses_after_its_knowledge_changes(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    analyzer = RecipeAnalyzer(analysis_cache=AnalysisCache(db_path=None))
+
+    async def run():
+        await analyzer.initialize()
+        first = await analyzer.analyze_recipe(RECIPE, "ingredients")
+        cached = await analyzer.analyze_recipe(RECIPE, "ingredients")
+        hits = analyzer.analysis_cache.memory.hits
+
+        # Reloaded knowledge data gets a new version, so old entries stop matching
+        analyzer.ingredient_database["flour"] = {**analyzer.ingredient_database.get("flour", {}), "note": "new"}
+        analyzer.knowledge_version = analyzer._knowledge_version()
+        await analyzer.analyze_recipe(RECIPE, "ingredients")
+        return first, cached, hits, analyzer.analysis_cache.memory.hits, len(analyzer.analysis_cache.memory)
+
+    first, cached, hits_before, hits_after, entries = asyncio.run(run())
+    assert cached == first
+    assert hits_before == 1 and hits_after == 1 and entries == 2
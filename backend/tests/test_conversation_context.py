@@ -0,0 +1,72 @@
+"""Tests for ConversationContextManager compaction and prompt budgets"""
+
+from conversation_context import ConversationContextManager, approximate_token_count
+
+
+def _session(manager, messages):
+    session = {"history": [], "facts": manager.new_facts(), "history_tokens": 0}
+    for number, content in enumerate(messages):
+        turn = {"role": "user" if number % 2 == 0 else "assistant", "content": content}
+        session["history"].append(turn)
+        manager.record_turn(session, turn)
+    return session
+
+
+def test_compaction_keeps_history_within_token_budget():
+    manager = ConversationContextManager(history_token_budget=20, min_recent_turns=2)
+    session = _session(manager, [f"turn number {number} has six tokens" for number in range(10)])
+
+    # Six tokens per turn: three turns fit, the seven oldest were compacted
+    assert [turn["content"] for turn in session["history"]] == [f"turn number {number} has six tokens"
+                                                                for number in (7, 8, 9)]
+    assert session["compacted_turns"] == 7
+    assert session["history_tokens"] == sum(approximate_token_count(turn["content"])
+                                            for turn in session["history"]) <= 20
+
+
+def test_compaction_keeps_the_minimum_recent_turns_over_budget():
+    manager = ConversationContextManager(history_token_budget=5, min_recent_turns=2)
+    session = _session(manager, ["one two three four five six", "seven eight nine ten eleven twelve",
+                                 "thirteen fourteen fifteen sixteen seventeen eighteen"])
+
+    assert len(session["history"]) == 2 and session["compacted_turns"] == 1
+    assert session["history_tokens"] == 12
+
+
+def test_compacted_turns_leave_their_facts():
+    manager = ConversationContextManager(history_token_budget=10, min_recent_turns=1)
+    session = _session(manager, ["I'm making risotto tonight. I have rice, mushrooms and parmesan.",
+                                 "Great choice.", "I'm vegetarian.", "Noted."])
+
+    # The turn naming the dish and ingredients was compacted away
+    assert session["compacted_turns"] == 1 and session["history"][0]["content"] == "Great choice."
+    assert session["facts"] == {"ingredients_on_hand": ["rice", "mushrooms", "parmesan"],
+                                "dietary_restrictions": ["vegetarian"], "dish_in_progress": "risotto"}
+    context = manager.build_prompt_context(session)
+    assert context["conversation_facts"] == ("Dish in progress: risotto. Ingredients on hand: rice, mushrooms, "
+                                             "parmesan. Dietary restrictions: vegetarian.")
+
+
+def test_prompt_context_fits_the_prompt_budget_and_skips_the_pending_question():
+    manager = ConversationContextManager(prompt_token_budget=10)
+    session = _session(manager, ["a b c d", "e f g h", "i j k l", "m n o p", "the pending question"])
+
+    context = manager.build_prompt_context(session)
+    assert context["conversation_facts"] == ""
+    # The newest answered turns that fit in 10 tokens, oldest first
+    assert [turn["content"] for turn in context["recent_turns"]] == ["i j k l", "m n o p"]
+
+
+def test_token_counts_are_cached_per_tokenizer():
+    calls = []
+    tokenizer = ["approximate"]
+
+    def counter(text):
+        calls.append(text)
+        return len(text)
+
+    manager = ConversationContextManager(token_counter=counter, tokenizer_identity=lambda: tokenizer[0])
+    assert manager.count_tokens("hello") == manager.count_tokens("hello") == 5
+    tokenizer[0] = "loaded"
+    manager.count_tokens("hello")
+    assert calls == ["hello", "hello"]
@@ -0,0 +1,108 @@
+"""Tests for ConversationLog flushing, restoring, compaction and shutdown"""
+
+import asyncio
+import threading
+
+from conversation_log import ConversationLog
+
+
+def _log(tmp_path, **options):
+    return ConversationLog(log_dir=str(tmp_path), flush_interval=0.01, compaction_interval=3600, **options)
+
+
+def _turn(number):
+    return {"user_message": f"question {number}", "ai_response": f"answer {number}"}
+
+
+def test_turns_are_flushed_and_read_back(tmp_path):
+    async def run():
+        log = _log(tmp_path)
+        await log.start()
+        for number in range(3):
+            log.append("session-a", _turn(number))
+        log.append("session-b", _turn(9))
+        await asyncio.sleep(0.1)
+        # Written by the background writer, before stop()
+        written = await log.read_session("session-a")
+        await log.stop()
+        return written, log
+
+    written, log = asyncio.run(run())
+    assert written == [_turn(number) for number in range(3)]
+    assert sorted(log.iter_session_ids()) == ["session-a", "session-b"]
+    assert log.has_session("session-b") and not log.has_session("session-c")
+
+
+def test_clear_hides_earlier_turns_and_compaction_drops_them(tmp_path):
+    async def run():
+        log = _log(tmp_path)
+        await log.start()
+        log.append("s", _turn(1))
+        log.clear("s")
+        log.append("s", _turn(2))
+        await log.stop()
+        before = await log.read_session("s")
+        await log.start()
+        await log.compact()
+        await log.stop()
+        return before, await log.read_session("s")
+
+    before, after = asyncio.run(run())
+    assert before == after == [_turn(2)]
+    assert (tmp_path / "s.jsonl").read_text().count("\n") == 1
+
+
+def test_unsafe_session_ids_get_hashed_file_names(tmp_path):
+    log = _log(tmp_path)
+    path = log.session_path("../../etc/passwd")
+    assert path.startswith(str(tmp_path)) and ".." not in path
+
+
+def test_stop_during_compaction_loses_no_turns(tmp_path, monkeypatch):
+    compacting, release = threading.Event(), threading.Event()
+    log = _log(tmp_path)
+    compact_file = log._compact_file
+
+    def slow_compact_file(path):
+        compacting.set()
+        release.wait(5)
+        compact_file(path)
+
+    monkeypatch.setattr(log, "_compact_file", slow_compact_file)
+
+    async def run():
+        await log.start()
+        log.append("s", _turn(1))
+        log.clear("s")
+        log.append("s", _turn(2))
+        await asyncio.sleep(0.05)
+        # Compaction holds the I/O lock while more turns are queued and the log stops
+        log._compaction_task.cancel()
+        log._compaction_task = asyncio.ensure_future(log._run_to_completion(log.compact()))
+        await asyncio.get_running_loop().run_in_executor(None, compacting.wait, 5)
+        log.append("s", _turn(3))
+        await asyncio.sleep(0.05)
+        stopping = asyncio.ensure_future(log.stop())
+        await asyncio.sleep(0.05)
+        release.set()
+        await stopping
+        return await log.read_session("s")
+
+    assert asyncio.run(run()) == [_turn(2), _turn(3)]
+
+
+def test_oversized_logs_are_queued_for_compaction(tmp_path):
+    async def run():
+        log = _log(tmp_path, max_records_per_session=2)
+        await log.start()
+        for number in range(20):
+            log.append("big", _turn(number))
+        await asyncio.sleep(0.1)
+        queued = set(log._sessions_to_compact)
+        await log.compact()
+        await log.stop()
+        return queued, await log.read_session("big")
+
+    queued, turns = asyncio.run(run())
+    assert queued == {"big"}
+    assert turns == [_turn(18), _turn(19)]
@@ -0,0 +1,97 @@
+"""Tests for CookingChatInterface sessions, history paging and batches"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from conversation_context import ConversationContextManager
+from conversation_log import ConversationLog
+from cooking_chat import CookingChatInterface
+
+
+@pytest.fixture
+def chat(tmp_path):
+    chat = CookingChatInterface()
+    chat.conversation_log = ConversationLog(log_dir=str(tmp_path), flush_interval=0.01)
+    # Keeps about four short turns in memory
+    chat.context_manager = ConversationContextManager(history_token_budget=12, min_recent_turns=2)
+    return chat
+
+
+def _record(chat, session_id, count):
+    session = chat._get_session(session_id)
+    for number in range(count):
+        chat._record_user_message(session, f"question {number}")
+        chat._record_assistant_response(session, {"response": f"answer {number}"})
+    return session
+
+
+def test_history_pages_reach_turns_compacted_out_of_memory(chat):
+    async def run():
+        await chat.conversation_log.start()
+        session = _record(chat, "s", 10)
+        pages = [
+            await chat.get_conversation_history("s", offset=0, limit=4),
+            await chat.get_conversation_history("s", offset=14, limit=10),
+            await chat.get_conversation_history("s"),
+        ]
+        await chat.conversation_log.stop()
+        return session, pages
+
+    session, (first, straddling, everything) = asyncio.run(run())
+    assert session["compacted_turns"] > 4
+    assert [turn["content"] for turn in first] == ["question 0", "answer 0", "question 1", "answer 1"]
+    assert [turn["content"] for turn in straddling] == ["question 7", "answer 7", "question 8", "answer 8",
+                                                        "question 9", "answer 9"]
+    assert len(everything) == 20 and everything[-1]["content"] == "answer 9"
+
+
+def test_cleared_history_pages_from_zero(chat):
+    async def run():
+        await chat.conversation_log.start()
+        _record(chat, "s", 10)
+        chat.clear_conversation_history("s")
+        _record(chat, "s", 1)
+        page = await chat.get_conversation_history("s")
+        await chat.conversation_log.stop()
+        return page
+
+    assert [turn["content"] for turn in asyncio.run(run())] == ["question 0", "answer 0"]
+
+
+def test_batch_restores_sessions_per_run_and_reports_failures_per_line(chat):
+    prompts = []
+
+    async def generate(messages, contexts):
+        prompts.extend(zip(messages, contexts))
+        return [f"reply to {message}" for message in messages]
+
+    async def run():
+        await chat.conversation_log.start()
+        for session_id in ("a", "b", "c"):
+            _record(chat, session_id, 1)
+        await chat.conversation_log.flush()
+        chat.sessions.clear()
+        # Fewer sessions in memory than distinct sessions in the batch
+        chat.max_sessions = 2
+        chat.models.models["cooking_conversation"] = object()
+        chat.models.generate_cooking_responses = generate
+        items = [{"message": "Any tips for dinner?", "session_id": session_id}
+                 for session_id in ("a", "default", "b", "c")]
+        responses = [response async for response in chat.process_messages(items)]
+        await chat.conversation_log.stop()
+        return responses
+
+    responses = asyncio.run(run())
+    assert len(responses) == 4
+    assert "reserved" in responses[1]["error"]
+    assert [response["response"] for response in (responses[0], responses[2], responses[3])] == \
+        ["reply to Any tips for dinner?"] * 3
+    assert not any("error" in response for response in (responses[0], responses[2], responses[3]))
+    # Every prompt was built on its session's restored history
+    assert len(prompts) == 3
+    for _, context in prompts:
+        assert [turn["content"] for turn in context["recent_turns"]] == ["question 0", "answer 0"]
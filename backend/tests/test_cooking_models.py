@@ -0,0 +1,65 @@
+"""Tests for the ingredient extraction cascade of CookingModels"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from cooking_models import CookingModels
+
+
+def test_lines_the_parser_fails_on_go_to_the_fallback(monkeypatch):
+    models = CookingModels()
+    parse = models.recipe_parser.parse_ingredient_line_confidently
+
+    def flaky_parse(line):
+        if "eggs" in line:
+            raise ValueError("unreadable line")
+        return parse(line)
+
+    monkeypatch.setattr(models.recipe_parser, "parse_ingredient_line_confidently", flaky_parse)
+    result = asyncio.run(models.extract_ingredients_with_report("2 cups flour\n3 eggs\n1 tsp salt"))
+
+    assert [(ingredient["line"], ingredient["source"]) for ingredient in result["ingredients"]] \
+        == [(0, "parser"), (1, "fallback"), (2, "parser")]
+    assert result["report"]["parser_lines"] == 2 and result["report"]["fallback_lines"] == 1
+
+
+class _StubTokenizer:
+    """GPT-2 style tokenizer: end-of-text token, no pad token"""
+
+    def __init__(self):
+        self.eos_token_id = 50256
+        self.pad_token_id = None
+        self.padding_side = "right"
+
+
+class _StubGenerator:
+    def __init__(self):
+        self.tokenizer = _StubTokenizer()
+        self.model = type("Model", (), {})()
+        self.model.generation_config = type("GenerationConfig", (), {"pad_token_id": None})()
+
+
+def test_text_generation_pipelines_can_batch(monkeypatch):
+    import cooking_models
+
+    loaded = []
+
+    def load(task, model, device):
+        generator = _StubGenerator() if task == "text-generation" else object()
+        loaded.append((task, generator))
+        return generator
+
+    monkeypatch.setattr(cooking_models, "pipeline", load)
+    models = CookingModels()
+    asyncio.run(models._load_base_models())
+
+    generators = [generator for task, generator in loaded if task == "text-generation"]
+    assert generators and len(loaded) == len(models.models)
+    for generator in generators:
+        assert generator.tokenizer.pad_token_id == generator.tokenizer.eos_token_id
+        assert generator.tokenizer.padding_side == "left"
+        assert generator.model.generation_config.pad_token_id == generator.tokenizer.eos_token_id
@@ -0,0 +1,85 @@
+"""Tests for dietary masks, restrictions and filtering"""
+
+import pytest
+
+from dietary_index import DIETS, DietaryIndex, dietary_labels, mask_diets, preference_mask, restriction_mask
+from food_recognition import FoodRecognitionEngine
+
+RECIPES = [
+    {"name": "Garden salad", "ingredients": ["lettuce", "tomatoes", "olive oil"]},
+    {"name": "Grilled salmon", "ingredients": ["salmon", "lemon"]},
+    {"name": "Garlic shrimp", "ingredients": ["1 lb shrimp", "garlic", "butter"]},
+    {"name": "Chicken stir fry", "ingredients": ["chicken", "soy sauce", "sesame oil"]},
+    {"name": "Tofu bowl", "ingredients": ["tofu", "rice", "tahini"]},
+    {"name": "Pancakes", "ingredients": ["flour", "eggs", "milk"]},
+    {"name": "Peanut noodles", "ingredients": ["rice noodles", "peanut butter"]},
+]
+
+
+def _allowed(restrictions):
+    index = DietaryIndex(RECIPES)
+    return [recipe["name"] for recipe, ok in zip(RECIPES, index.allowed(restriction_mask(restrictions))) if ok]
+
+
+def test_masks_fit_in_uint16():
+    assert len(DIETS) <= 16
+
+
+@pytest.mark.parametrize("text, breaks", [
+    ("2 tbsp butter", {"vegan", "dairy-free"}),
+    ("1 lb chicken breast", {"vegetarian", "vegan", "pescatarian"}),
+    ("salmon fillets", {"vegetarian", "vegan", "fish-free"}),
+    ("12 prawns", {"vegetarian", "vegan", "shellfish-free"}),
+    ("soy sauce", {"gluten-free", "soy-free"}),
+    ("toasted sesame seeds", {"sesame-free"}),
+    ("peanut butter", {"nut-free"}),
+    ("coconut milk", set()),
+    ("oyster mushrooms", set()),
+    ("gluten-free pasta", set()),
+    ("chicken (not vegetarian)", {"vegetarian", "vegan", "pescatarian"}),
+    ("cheese, not vegan", {"vegan", "dairy-free"}),
+    ("no dairy? no way, heavy cream", {"vegan", "dairy-free"}),
+    ("non-vegan butter", {"vegan", "dairy-free"}),
+    ("vegetarian sausage, made with beef", {"vegetarian", "vegan", "pescatarian"}),
+])
+def test_ingredient_mask(text, breaks):
+    index = DietaryIndex()
+    compatible = set(mask_diets(index.ingredient_mask(text)))
+    assert breaks.isdisjoint(compatible)
+    assert {"low-carb", "healthy"} | breaks | compatible == set(DIETS)
+
+
+@pytest.mark.parametrize("restrictions, expected", [
+    ("vegetarian", ["Garden salad", "Tofu bowl", "Pancakes", "Peanut noodles"]),
+    ("vegan", ["Garden salad", "Tofu bowl", "Peanut noodles"]),
+    ("pescatarian", ["Garden salad", "Grilled salmon", "Garlic shrimp", "Tofu bowl", "Pancakes", "Peanut noodles"]),
+    ("shellfish", ["Garden salad", "Grilled salmon", "Chicken stir fry", "Tofu bowl", "Pancakes", "Peanut noodles"]),
+    ("fish allergy", ["Garden salad", "Garlic shrimp", "Chicken stir fry", "Tofu bowl", "Pancakes", "Peanut noodles"]),
+    (["soy", "sesame"], ["Garden salad", "Grilled salmon", "Garlic shrimp", "Pancakes", "Peanut noodles"]),
+    (["gluten free", "peanuts"], ["Garden salad", "Grilled salmon", "Garlic shrimp", "Tofu bowl"]),
+    ("no dairy", ["Garden salad", "Grilled salmon", "Chicken stir fry", "Tofu bowl", "Peanut noodles"]),
+])
+def test_restrictions_filter_recipes(restrictions, expected):
+    assert _allowed(restrictions) == expected
+
+
+def test_labels_and_preferences():
+    assert dietary_labels("Easy vegan chili") == ["vegan"]
+    assert dietary_labels("Not vegan, not gluten-free") == []
+    assert dietary_labels("Eggs benedict") == []
+    assert restriction_mask(None) == 0
+    mask = preference_mask({"dietary_restrictions": ["pescatarian"], "allergies": "sesame"})
+    assert mask_diets(mask) == ["pescatarian", "sesame-free"]
+
+
+def test_select_best_recipe_reads_time_limits():
+    recipes = [
+        {"name": "Roast chicken", "ingredients": ["chicken"], "cooking_time": "90 minutes"},
+        {"name": "Shrimp tacos", "ingredients": ["shrimp", "tortillas"], "cooking_time": "20 minutes"},
+        {"name": "Bean tacos", "ingredients": ["beans", "tortillas"], "cooking_time": "15 minutes"},
+    ]
+    engine = FoodRecognitionEngine()
+    assert engine._select_best_recipe(recipes, {"max_cooking_time": "30 minutes"})["name"] == "Shrimp tacos"
+    assert engine._select_best_recipe(recipes, {"max_cooking_time": "quick"})["name"] == "Roast chicken"
+    assert engine._select_best_recipe(recipes, {"allergies": ["shellfish"], "max_cooking_time": 30})["name"] \
+        == "Bean tacos"
@@ -0,0 +1,62 @@
+"""Tests for IngredientPairing NPMI ranking and incremental counts"""
+
+import math
+
+import pytest
+
+from ingredient_pairing import IngredientPairing
+
+RECIPES = [
+    {"ingredients": ["tomato", "basil", "salt"]},
+    {"ingredients": ["Tomatoes", "basil", "salt"]},
+    {"ingredients": ["tomato", "mozzarella", "salt"]},
+    {"ingredients": ["chocolate", "sugar", "salt"]},
+    {"ingredients": ["chocolate", "sugar", "salt"]},
+]
+
+
+def test_npmi_of_a_pair():
+    pairing = IngredientPairing(RECIPES)
+    # tomato in 3 of 5 recipes, basil in 2, both in 2
+    pmi = math.log(2 * 5 / (3 * 2))
+    assert pairing.pmi("tomato", "basil", normalized=False) == pytest.approx(pmi)
+    assert pairing.pmi("tomato", "basil") == pytest.approx(pmi / -math.log(2 / 5))
+    # Salt is in every recipe, so it says nothing about tomato
+    assert pairing.pmi("tomato", "salt") == pytest.approx(0.0)
+    assert pairing.pmi("tomato", "sugar") is None and pairing.pmi("tomato", "saffron") is None
+
+
+def test_pairings_rank_by_npmi_and_skip_rare_and_ubiquitous_partners():
+    pairing = IngredientPairing(RECIPES)
+    [basil] = pairing.pairings(["Tomatoes"])
+    assert basil["ingredient"] == "basil" and basil["count"] == 2
+    assert basil["score"] == round(pairing.pmi("tomato", "basil"), 3)
+    assert [partner["ingredient"] for partner in pairing.pairings(["chocolate"])] == ["sugar"]
+    assert pairing.pairings(["chocolate"])[0]["score"] == 1.0
+
+
+def test_pairs_never_seen_together_count_against_a_partner():
+    pairing = IngredientPairing(RECIPES)
+    # sugar goes with chocolate (NPMI 1) but never with tomato (-1)
+    assert pairing.pairings(["tomato", "chocolate"]) == []
+
+
+def test_incremental_add_matches_a_full_build_and_updates_rankings():
+    incremental = IngredientPairing()
+    for recipe in RECIPES:
+        incremental.add(recipe)
+    assert incremental.pairings(["tomato"]) == IngredientPairing(RECIPES).pairings(["tomato"])
+
+    # More recipes with tomato and mozzarella lift the pair over min_count and past basil
+    assert incremental.add_many([{"ingredients": ["tomato", "mozzarella"]}] * 2) == 2
+    assert [partner["ingredient"] for partner in incremental.pairings(["tomato"])] == ["mozzarella", "basil"]
+
+
+def test_vocabulary_grows_past_the_initial_capacity():
+    pairing = IngredientPairing(min_count=1)
+    names = [f"spice {chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(300)]
+    pairing.add({"ingredients": names})
+    pairing.add({"ingredients": names[:2] + ["rice"]})
+    assert len(pairing) == 301 and pairing.counts[:2].tolist() == [2, 2]
+    assert pairing.pairings([names[299]], limit=3)[0]["count"] == 1
+    assert pairing.ingredients_in("some rice with spice aa") == ["spice aa", "rice"]
@@ -0,0 +1,61 @@
+"""Tests for IngredientResolver matching, compound names and corrections"""
+
+import asyncio
+
+import pytest
+
+from ingredient_resolver import IngredientResolver, UNEXPLAINED_SCORE_CAP
+
+NAMES = ["butter", "flour", "chicken", "chicken breast", "rice", "salt", "olive oil", "garlic", "broccoli",
+         "peanut", "milk", "coconut"]
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return IngredientResolver(NAMES)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2 tbsp unsalted butter, melted", "butter"),
+    ("kosher salt", "salt"),
+    ("3 tablespoons extra virgin olive oil", "olive oil"),
+    ("2 boneless chicken breasts, cut into strips", "chicken breast"),
+    ("1 cup chopped peanuts", "peanut"),
+    ("fresh brocoli florets", "broccoli"),
+    ("3 cloves garlic, minced", "garlic"),
+])
+def test_resolves_ingredient_text(resolver, text, expected):
+    assert resolver.resolve_one(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "peanut butter", "almond flour", "coconut milk", "2 cups basmati rice", "chicken thighs", "saffron",
+])
+def test_compound_names_are_not_resolved_to_a_part(resolver, text):
+    assert resolver.resolve_one(text) is None
+    assert all(score <= UNEXPLAINED_SCORE_CAP for _, score in resolver.resolve(text))
+
+
+def test_compound_name_in_the_vocabulary_wins(resolver):
+    extended = IngredientResolver(NAMES + ["peanut butter"])
+    assert extended.resolve("peanut butter", limit=1) == [("peanut butter", 1.0)]
+    assert resolver.resolve("peanut butter", limit=1)[0][1] < 0.5
+
+
+def test_aliases_map_to_database_keys():
+    resolver = IngredientResolver.from_database({
+        "scallion": {"name": "Scallion", "aliases": ["green onion", "spring onion"]},
+        "cilantro": {"aliases": ["coriander leaves"]},
+    })
+    assert resolver.resolve_one("4 green onions, sliced") == "scallion"
+    assert resolver.resolve_one("a handful of fresh cilantro") == "cilantro"
+    assert resolver.head_noun("2 boneless chicken breasts") == "breasts"
+
+
+def test_knowledge_base_does_not_return_butter_for_peanut_butter(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from cooking_knowledge import CookingKnowledgeBase
+    knowledge = CookingKnowledgeBase()
+    asyncio.run(knowledge.initialize())
+    assert asyncio.run(knowledge.get_ingredient_info("unsalted butter"))["category"] == "dairy_eggs"
+    assert asyncio.run(knowledge.get_ingredient_info("peanut butter")).get("category") != "dairy_eggs"
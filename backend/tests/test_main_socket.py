@@ -0,0 +1,38 @@
+"""Tests for the cooking chat WebSocket endpoint"""
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import main
+
+    async def stream_message(message, context=None, user_preferences=None, session_id=None):
+        yield {"type": "done", "response": f"echo: {message}"}
+
+    monkeypatch.setattr(main.chat_interface, "stream_message", stream_message)
+    return TestClient(main.app)
+
+
+def test_socket_survives_bad_frames(client):
+    with client.websocket_connect("/ws/cooking/chat?session_id=socket-test") as socket:
+        assert socket.receive_json()["type"] == "session"
+
+        socket.send_bytes(b"\xff\xfe not utf-8")
+        assert socket.receive_json() == {"id": None, "type": "error", "detail": "Binary frames must be UTF-8 JSON"}
+
+        socket.send_text('{"id": "broken", "message": 3}')
+        error = socket.receive_json()
+        assert error["id"] == "broken" and error["type"] == "error"
+
+        socket.send_bytes(b'{"id": "binary", "message": "how long to boil an egg"}')
+        assert socket.receive_json() == {"id": "binary", "type": "done", "response": "echo: how long to boil an egg"}
+
+        socket.send_text('{"id": "text", "message": "and to poach one"}')
+        assert socket.receive_json() == {"id": "text", "type": "done", "response": "echo: and to poach one"}
@@ -0,0 +1,76 @@
+"""Tests for NutritionEngine gram conversion, lookups and batch totals"""
+
+import numpy as np
+import pytest
+
+from nutrition_engine import NUTRIENTS, NutritionEngine
+
+DATABASE = {
+    "flour": {"nutrition": {"calories": 364, "protein": 10, "carbs": 76, "fat": 1, "fiber": 3}},
+    "eggs": {"nutrition": {"calories": 155, "protein": 13, "carbs": 1, "fat": 11, "fiber": 0}},
+    "butter": {"nutrition": {"calories": 717, "protein": 1, "carbs": 0, "fat": 81, "fiber": 0}},
+    "salt": {"nutrition": {"calories": 0}},
+    "basil": {"category": "herbs"},
+}
+
+
+@pytest.fixture
+def engine():
+    return NutritionEngine(DATABASE)
+
+
+@pytest.mark.parametrize("amount, unit, name, amount_max, grams", [
+    (200, "g", "flour", None, 200.0),
+    (1, "lb", "butter", None, 453.592),
+    (1, "cups", "flour", None, 236.588 * 0.53),
+    (1, "tbsp", "mystery liquid", None, 14.7868),
+    (2, "", "large eggs", None, 100.0),
+    (3, "cloves", "garlic", None, 15.0),
+    (2, None, "widgets", None, 200.0),
+    (2, "", "eggs", 4, 150.0),
+    (None, "to taste", "salt", None, 0.0),
+    (1, "pinch", "salt", None, 0.0),
+])
+def test_to_grams(engine, amount, unit, name, amount_max, grams):
+    assert engine.to_grams(amount, unit, name, amount_max) == pytest.approx(grams)
+
+
+def test_resolve_tolerates_plurals_modifiers_and_skips_ingredients_without_nutrition(engine):
+    assert engine.ingredient_names == ["flour", "eggs", "butter", "salt"]
+    assert engine.resolve("Egg") == engine.resolve("large eggs") == engine.ingredient_index["eggs"]
+    assert engine.resolve("all-purpose flour") == engine.ingredient_index["flour"]
+    assert engine.resolve("basil") is None and engine.resolve("saffron") is None
+
+
+def test_analyze_totals_and_breakdown(engine):
+    ingredients = [
+        {"name": "flour", "amount": 200, "unit": "g"},
+        {"name": "eggs", "amount": 2, "unit": None},
+        {"name": "saffron", "amount": 1, "unit": "pinch"},
+    ]
+    result = engine.analyze(ingredients)
+    assert result["estimated_nutrition"] == {"calories": 883.0, "protein": 33.0, "carbs": 153.0,
+                                             "fat": 13.0, "fiber": 6.0}
+    assert [(item["name"], item["grams"]) for item in result["ingredient_breakdown"]] == [("flour", 200.0),
+                                                                                         ("eggs", 100.0)]
+
+
+def test_batch_totals_match_per_recipe_analysis(engine):
+    recipes = [
+        [{"name": "flour", "amount": 1, "unit": "cup"}, {"name": "butter", "amount": 2, "unit": "tbsp"}],
+        [],
+        [{"name": "saffron", "amount": 1, "unit": "g"}],
+        [{"name": "eggs", "amount": 3}, {"name": "eggs", "amount": 1, "unit": "oz"}],
+    ]
+    totals = engine.analyze_batch(recipes)
+    assert totals.shape == (4, len(NUTRIENTS))
+    assert not totals[1].any() and not totals[2].any()
+    for recipe, row in zip(recipes, engine.totals_to_dicts(totals)):
+        assert row == engine.analyze(recipe)["estimated_nutrition"]
+
+
+def test_empty_database_finds_nothing():
+    engine = NutritionEngine({})
+    assert engine.matrix.shape == (0, len(NUTRIENTS))
+    assert np.array_equal(engine.analyze_batch([[{"name": "flour", "amount": 1, "unit": "cup"}]]),
+                          np.zeros((1, len(NUTRIENTS))))
@@ -0,0 +1,48 @@
+"""Tests for PantryIndex coverage queries and its copy in the Railway service"""
+
+import os
+
+from pantry_index import PantryIndex, mentioned_ingredients
+
+RECIPES = [
+    {"name": "Omelette", "ingredients": ["eggs", "butter", "salt"]},
+    {"name": "Pancakes", "ingredients": ["flour", "eggs", "milk", "butter"]},
+    {"name": "Buttered toast", "ingredients": ["bread", "butter"]},
+    {"name": "Fried rice", "ingredients": ["rice", "eggs", "soy sauce", "green onions"]},
+]
+
+
+def _names(results):
+    return [result["recipe"]["name"] for result in results]
+
+
+def test_railway_copy_is_identical():
+    # The Railway service deploys its directory on its own, so it carries a copy
+    backend = os.path.join(os.path.dirname(__file__), "..", "pantry_index.py")
+    railway = os.path.join(os.path.dirname(__file__), "..", "..", "cooking-ethos-railway", "pantry_index.py")
+    with open(backend, "rb") as original, open(railway, "rb") as copy:
+        assert copy.read() == original.read(), "update cooking-ethos-railway/pantry_index.py to match backend"
+
+
+def test_find_ranks_by_fewest_missing():
+    index = PantryIndex(RECIPES)
+    assert _names(index.find(["Eggs", "butter", "bread", "salt"], max_missing=0)) == ["Omelette", "Buttered toast"]
+    results = index.find(["eggs", "butter"], max_missing=2)
+    assert [(name, result["missing"]) for name, result in zip(_names(results), results)] == [
+        ("Omelette", ["salt"]), ("Buttered toast", ["bread"]), ("Pancakes", ["flour", "milk"])
+    ]
+    assert results[2]["matched"] == ["eggs", "butter"]
+
+
+def test_allowed_bitset_and_limits():
+    index = PantryIndex(RECIPES)
+    # Bits 1 and 3: pancakes and fried rice
+    assert _names(index.find(["eggs", "butter", "salt", "bread"], allowed=0b1010)) == ["Pancakes"]
+    assert len(index.find(["eggs"], max_missing=3, limit=2)) == 2
+    assert index.find(["saffron"]) == [] and len(index) == 4
+
+
+def test_mentioned_ingredients():
+    index = PantryIndex(RECIPES)
+    assert index.ingredients_in("I have some soy sauce, eggs and leftover rice") == ["soy sauce", "egg", "rice"]
+    assert mentioned_ingredients("nothing here", set()) == []
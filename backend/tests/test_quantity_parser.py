@@ -0,0 +1,58 @@
+"""Tests for quantity lexing, number parsing and unit conversion"""
+
+import pytest
+
+from quantity_parser import (
+    Quantity, lex_quantity, parse_number, canonical_unit, unit_kind, convert, convert_temperature
+)
+from recipe_parser import RecipeParser
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("2 cups flour", Quantity(2.0, None, "cup", "flour")),
+    ("1 1/2 cups flour", Quantity(1.5, None, "cup", "flour")),
+    ("½ tsp salt", Quantity(0.5, None, "tsp", "salt")),
+    ("1½ sticks butter", Quantity(1.5, None, "stick", "butter")),
+    ("2-3 T olive oil", Quantity(2.0, 3.0, "tbsp", "olive oil")),
+    ("1 to 2 t vanilla", Quantity(1.0, 2.0, "tsp", "vanilla")),
+    ("2 large eggs", Quantity(2.0, None, None, "large eggs")),
+    ("8 fl. oz cream", Quantity(8.0, None, "fl oz", "cream")),
+    ("2 cups of milk", Quantity(2.0, None, "cup", "milk")),
+    ("salt to taste", Quantity(None, None, None, "salt to taste")),
+])
+def test_lex_quantity(line, expected):
+    assert lex_quantity(line) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2", 2.0), ("2.5", 2.5), (".5", 0.5), ("2,5", 2.5), ("2,25", 2.25), ("1,0000", 1.0),
+    ("1,000", 1000.0), ("12,345", 12345.0), ("1,000,000", 1000000.0), ("1,000.5", 1000.5),
+    ("1/2", 0.5), ("1 1/2", 1.5), ("½", 0.5), ("1½", 1.5),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == pytest.approx(expected)
+
+
+def test_thousands_separator_is_not_a_decimal_point():
+    assert lex_quantity("1,000 g sugar") == Quantity(1000.0, None, "g", "sugar")
+    assert lex_quantity("1,5 kg potatoes") == Quantity(1.5, None, "kg", "potatoes")
+
+
+@pytest.mark.parametrize("line", ["1/0 cup milk", "1 0/0 cup milk", "1-1/0 cup milk"])
+def test_zero_denominator_leaves_a_name_only_line(line):
+    assert parse_number(line.split(" cup")[0].split("-")[-1]) is None
+    assert lex_quantity(line) == Quantity(None, None, None, line)
+    ingredient = RecipeParser().parse("Ingredients:\n" + line)["ingredients"][0]
+    assert ingredient["amount"] is None and ingredient["name"] == line
+
+
+def test_units_and_conversions():
+    assert canonical_unit("Tablespoons") == "tbsp"
+    assert canonical_unit("T") == "tbsp" and canonical_unit("t") == "tsp"
+    assert canonical_unit("smidgen") == "smidgen"
+    assert unit_kind("cup") == "volume" and unit_kind("lb") == "weight" and unit_kind("clove") is None
+    assert convert(1, "kg", "g") == pytest.approx(1000)
+    assert convert(3, "tsp", "tbsp") == pytest.approx(1, rel=1e-4)
+    assert convert(1, "cup", "g") is None
+    assert convert_temperature(212, "°F", "celsius") == pytest.approx(100)
+    assert convert_temperature(180, "C", "F") == pytest.approx(356)
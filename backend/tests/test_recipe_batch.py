@@ -0,0 +1,99 @@
+"""Tests for RecipeBatchAnalyzer streaming, backpressure and cancellation"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import recipe_batch
+from recipe_batch import RecipeBatchAnalyzer
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def analyze_in_worker(recipe_text, analysis_type):
+        with lock:
+            calls.append(recipe_text)
+        time.sleep(0.005)
+        if "burnt" in recipe_text:
+            raise ValueError("burnt")
+        return {"recipe": recipe_text, "type": analysis_type}
+
+    # Threads stand in for the worker processes
+    monkeypatch.setattr(recipe_batch, "_analyze_in_worker", analyze_in_worker)
+    batch = RecipeBatchAnalyzer(max_workers=2, max_in_flight=2)
+    batch._executor = ThreadPoolExecutor(max_workers=2)
+    batch.is_running = True
+    batch.calls = calls
+    yield batch
+    batch._executor.shutdown(wait=True)
+
+
+def _source(texts, produced):
+    async def records():
+        for number, text in enumerate(texts):
+            produced.append(number)
+            yield {"id": f"r{number}", "recipe_text": text}
+    return records()
+
+
+def test_every_record_gets_one_result(batch):
+    texts = ["Mix flour.", "", "burnt toast", "Boil pasta."]
+
+    async def run():
+        return [result async for result in batch.analyze_stream(_source(texts, []), analysis_type="nutrition")]
+
+    results = sorted(asyncio.run(run()), key=lambda result: result["index"])
+    assert [result["id"] for result in results] == ["r0", "r1", "r2", "r3"]
+    assert results[0]["analysis"] == {"recipe": "Mix flour.", "type": "nutrition"}
+    assert results[1]["error"] == "recipe_text is required"
+    assert results[2]["error"] == "burnt"
+    assert "analysis" in results[3]
+
+
+def test_slow_reader_stops_new_submissions(batch):
+    produced = []
+
+    async def run():
+        stream = batch.analyze_stream(_source([f"Recipe {number}." for number in range(50)], produced))
+        await stream.__anext__()
+        await asyncio.sleep(0.1)
+        # One result consumed: at most max_in_flight more slots, plus the record waiting for one
+        pulled, analyzed = len(produced), len(batch.calls)
+        await stream.aclose()
+        return pulled, analyzed
+
+    pulled, analyzed = asyncio.run(run())
+    assert pulled <= 1 + batch.max_in_flight + 1
+    assert analyzed <= 1 + batch.max_in_flight
+
+
+def test_closing_the_stream_cancels_pending_work(batch):
+    produced = []
+
+    async def run():
+        stream = batch.analyze_stream(_source([f"Recipe {number}." for number in range(50)], produced))
+        async for _ in stream:
+            break
+        await stream.aclose()
+        pulled = len(produced)
+        await asyncio.sleep(0.1)
+        return pulled, len(produced), len(batch.calls)
+
+    pulled, pulled_later, analyzed = asyncio.run(run())
+    assert pulled_later == pulled < 50
+    assert analyzed <= 1 + batch.max_in_flight
+
+
+def test_stream_needs_a_running_pool():
+    async def run():
+        async for _ in RecipeBatchAnalyzer(max_workers=1).analyze_stream(_source(["Mix."], [])):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
@@ -0,0 +1,36 @@
+"""Tests for recipe corpus reading shared by the offline tools"""
+
+import json
+
+from cuisine_classifier import read_labeled
+from recipe_corpus import compose_recipe_text, read_corpus
+
+
+def test_read_jsonl_composes_missing_text(tmp_path):
+    path = tmp_path / "recipes.jsonl"
+    records = [
+        {"id": "a", "recipe_text": "Toast the bread."},
+        {"ingredients": ["2 eggs", "butter"], "instructions": "Fry the eggs."},
+        {"id": "c"},
+    ]
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n\n", encoding="utf-8")
+
+    assert list(read_corpus(str(path), "recipe_text", "id")) == [
+        ("a", "Toast the bread."),
+        ("1", "Ingredients:\n2 eggs\nbutter\nInstructions:\nFry the eggs."),
+        ("c", ""),
+    ]
+
+
+def test_read_csv_and_labeled_records(tmp_path):
+    path = tmp_path / "recipes.csv"
+    path.write_text("recipe_text,cuisine\nStir fry with soy sauce,chinese\nPlain rice,\n", encoding="utf-8")
+
+    assert list(read_corpus(str(path), "recipe_text", "id")) == [
+        ("0", "Stir fry with soy sauce"), ("1", "Plain rice")
+    ]
+    assert list(read_labeled(str(path), "recipe_text", "cuisine")) == [("Stir fry with soy sauce", "chinese")]
+
+
+def test_compose_recipe_text_without_sections():
+    assert compose_recipe_text({"name": "Soup"}) == ""
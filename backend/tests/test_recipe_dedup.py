@@ -0,0 +1,108 @@
+"""Tests for RecipeDedupIndex and duplicate checks in RecipeBatchAnalyzer.analyze_stream"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import recipe_batch
+from recipe_batch import RecipeBatchAnalyzer
+from recipe_dedup import RecipeDedupIndex, recipe_features
+from recipe_parser import RecipeParser
+
+PANCAKES = """Ingredients:
+- 1 cup flour
+- 2 eggs
+- 1 cup milk
+- 1 tbsp sugar
+
+Instructions:
+1. Whisk the flour, sugar, eggs and milk into a smooth batter.
+2. Pour ladles of batter onto a hot greased pan.
+3. Flip when bubbles form and cook until golden on both sides."""
+
+# The same recipe doubled and reformatted
+PANCAKES_DOUBLED = """INGREDIENTS
+* 2 cups flour
+* 4 eggs
+* 2 cups milk
+* 2 tbsp sugar
+
+DIRECTIONS
+Step 1: Whisk the flour, sugar, eggs and milk into a smooth batter.
+Step 2: Pour ladles of batter onto a hot greased pan.
+Step 3: Flip when bubbles form and cook until golden on both sides."""
+
+SOUP = """Ingredients:
+- 2 tomatoes
+- 1 onion
+- 2 cups vegetable stock
+
+Instructions:
+1. Chop the onion and tomatoes.
+2. Simmer everything in the stock for 20 minutes, then blend."""
+
+
+def _parse(text):
+    return RecipeParser().parse(text)
+
+
+def test_features_ignore_amounts_and_formatting():
+    assert recipe_features(_parse(PANCAKES)) == recipe_features(_parse(PANCAKES_DOUBLED))
+    assert recipe_features({"ingredients": [], "instructions": []}) == set()
+
+
+def test_find_or_add_reports_the_earlier_duplicate():
+    index = RecipeDedupIndex()
+    assert index.find_or_add("pancakes", _parse(PANCAKES)) is None
+    assert index.find_or_add("soup", _parse(SOUP)) is None
+    duplicate_id, similarity = index.find_or_add("doubled", _parse(PANCAKES_DOUBLED))
+    assert duplicate_id == "pancakes" and similarity == 1.0
+    assert len(index) == 2
+    assert index.query({"ingredients": [], "instructions": []}) == []
+
+
+def test_signatures_match_one_at_a_time():
+    index = RecipeDedupIndex()
+    feature_sets = [recipe_features(_parse(text)) for text in (PANCAKES, SOUP)] + [set()]
+    batch = index.signatures(feature_sets)
+    for features, signature in zip(feature_sets, batch):
+        assert (index.signature(features) == signature).all()
+
+
+def test_cluster_groups_duplicates_in_corpus_order():
+    corpus = [("a", _parse(PANCAKES)), ("b", _parse(SOUP)), ("c", _parse(PANCAKES_DOUBLED))]
+    assert RecipeDedupIndex().cluster(corpus) == [["a", "c"]]
+
+
+def _analyze_stream(monkeypatch, records, **options):
+    monkeypatch.setattr(recipe_batch, "_analyze_in_worker", lambda text, analysis_type: {"type": analysis_type})
+    batch = RecipeBatchAnalyzer(max_workers=2)
+    batch._executor = ThreadPoolExecutor(max_workers=2)
+    batch.is_running = True
+
+    async def stream():
+        async def read():
+            for record in records:
+                yield record
+        return [result async for result in batch.analyze_stream(read(), **options)]
+
+    try:
+        return sorted(asyncio.run(stream()), key=lambda result: result["index"])
+    finally:
+        batch._executor.shutdown()
+
+
+def test_analyze_stream_skips_later_duplicates(monkeypatch):
+    records = [{"id": "first", "recipe_text": PANCAKES}, {"id": "soup", "recipe_text": SOUP},
+               {"id": "copy", "recipe_text": PANCAKES_DOUBLED}, {"id": "empty", "recipe_text": " "}]
+    first, soup, copy, empty = _analyze_stream(monkeypatch, records, dedup=True)
+    assert first["analysis"] == {"type": "general"} and "analysis" in soup
+    assert copy["duplicate_of"] == {"index": 0, "id": "first"} and copy["similarity"] == 1.0
+    assert empty["error"] == "recipe_text is required"
+
+
+def test_analyze_stream_rejects_invalid_recipes_before_indexing(monkeypatch):
+    burnt = PANCAKES.replace("hot greased pan", "greased pan and bake at 5000°F")
+    records = [{"id": "burnt", "recipe_text": burnt}, {"id": "good", "recipe_text": PANCAKES}]
+    burnt, good = _analyze_stream(monkeypatch, records, dedup=True, validate=True)
+    assert burnt["rejected"]["valid"] is False
+    assert "duplicate_of" not in good and good["validation"]["valid"] and "analysis" in good
@@ -0,0 +1,72 @@
+"""
+Golden-output tests for RecipeParser.parse
+
+Each golden/recipe_parser/<name>.txt recipe is parsed and compared with
+<name>.json. After an intended parser change, regenerate the expected
+outputs with UPDATE_GOLDEN=1 and review the diff.
+"""
+
+import json
+import os
+
+import pytest
+
+from recipe_parser import RecipeParser, recipe_windows
+from result_cache import ResultCache
+from conversation_context import approximate_token_count
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden", "recipe_parser")
+GOLDEN_RECIPES = sorted(name[:-len(".txt")] for name in os.listdir(GOLDEN_DIR) if name.endswith(".txt"))
+
+
+def _read(name: str, extension: str) -> str:
+    with open(os.path.join(GOLDEN_DIR, name + extension), encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("name", GOLDEN_RECIPES)
+def test_parse_matches_golden_output(name):
+    parsed = RecipeParser().parse(_read(name, ".txt"))
+    path = os.path.join(GOLDEN_DIR, name + ".json")
+    if os.environ.get("UPDATE_GOLDEN"):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(parsed, file, indent=2, ensure_ascii=False)
+            file.write("\n")
+    assert parsed == json.loads(_read(name, ".json"))
+
+
+@pytest.mark.parametrize("name", GOLDEN_RECIPES)
+def test_cached_parse_matches_uncached(name):
+    text = _read(name, ".txt")
+    parser = RecipeParser(ResultCache())
+    assert parser.parse(text) == RecipeParser().parse(text)
+    # A second parse is served from the cache and must not change
+    assert parser.parse(text) == RecipeParser().parse(text)
+
+
+def test_cached_ingredients_are_copies():
+    parser = RecipeParser(ResultCache())
+    text = _read("pancakes", ".txt")
+    parser.parse(text)["ingredients"][0]["name"] = "changed"
+    assert parser.parse(text)["ingredients"][0]["name"] == "flour"
+
+
+def test_confident_ingredient_lines():
+    parser = RecipeParser()
+    assert parser.parse_ingredient_line_confidently("2 cups flour")["unit"] == "cup"
+    assert parser.parse_ingredient_line_confidently("salt to taste")["name"] == "salt"
+    for line in ["fresh basil", "2. Mix well", "Step 2 stir", "30 minutes later remove"]:
+        assert parser.parse_ingredient_line_confidently(line) is None
+
+
+def test_recipe_windows_keep_every_line_within_budget():
+    text = "Ingredients:\n" + "\n".join(f"{i} cups bean {i}" for i in range(40)) + \
+        "\nInstructions:\n" + "\n".join(f"Stir the pot and simmer for {i} minutes." for i in range(40))
+    windows = recipe_windows(text, 60, approximate_token_count)
+    assert len(windows) > 1
+    for window in windows:
+        assert sum(approximate_token_count(line) + 1 for line in window.split("\n")) <= 60
+    lines = [line for line in text.split("\n") if not line.endswith(":")]
+    assert all(any(line in window.split("\n") for window in windows) for line in lines)
+    # Split sections repeat their header
+    assert all(window.startswith(("Ingredients:", "Instructions:")) for window in windows)
@@ -0,0 +1,35 @@
+"""Tests for RecipeRecommender inputs, time limits and cooking_minutes"""
+
+import pytest
+
+from recipe_recommender import RecipeRecommender, cooking_minutes
+
+RECIPES = [
+    {"name": "Omelette", "ingredients": ["eggs", "butter"], "cooking_time": "10 minutes"},
+    {"name": "Frittata", "ingredients": ["eggs", "potato"], "cooking_time": "1 hour"},
+]
+
+
+@pytest.mark.parametrize("cooking_time, expected", [
+    ("25 minutes", 25.0), ("1-2 hours", 60.0), ("1 hour 30 mins", 90.0), (40, 40.0), ("40", 40.0),
+    (" 12.5 ", 12.5), ("quick", None), (None, None),
+])
+def test_cooking_minutes(cooking_time, expected):
+    assert cooking_minutes(cooking_time) == expected
+
+
+@pytest.mark.parametrize("max_cooking_time, expected", [
+    ("30 minutes", ["Omelette"]), (30, ["Omelette"]), ("30", ["Omelette"]),
+    ("2 hours", ["Omelette", "Frittata"]), ("quick", ["Omelette", "Frittata"]),
+])
+def test_max_cooking_time(max_cooking_time, expected):
+    recommendations = RecipeRecommender(RECIPES).recommend(["eggs"], {"max_cooking_time": max_cooking_time})
+    assert sorted(recipe["name"] for recipe in recommendations) == sorted(expected)
+
+
+def test_available_ingredients_as_comma_separated_string():
+    recommender = RecipeRecommender(RECIPES)
+    from_string = recommender.recommend("eggs, butter")
+    assert from_string == recommender.recommend(["eggs", "butter"])
+    assert from_string[0]["name"] == "Omelette"
+    assert from_string[0]["missing"] == []
@@ -0,0 +1,64 @@
+"""Tests for RecipeScaler.scale_recipes"""
+
+import pytest
+
+from recipe_scaler import RecipeScaler, format_amount
+
+
+def _displays(result):
+    return [ingredient["display"] for ingredient in result["ingredients"]]
+
+
+def test_scales_to_target_servings_with_kitchen_fractions():
+    [result] = RecipeScaler().scale_recipes(
+        [{"id": "a", "servings": 4, "ingredients": ["1 cup flour", "3 eggs", "salt to taste"]}],
+        target_servings=6
+    )
+    assert result["scaled"] and result["servings"] == 6 and result["scale"] == pytest.approx(1.5)
+    assert _displays(result) == ["1 1/2 cups flour", "5 eggs", "salt to taste"]
+
+
+def test_counted_items_round_to_whole_or_half_units():
+    ingredients = ["3 eggs", "2-3 cloves garlic", "1 can tomatoes", "1 stick butter", "1 onion", "1 pinch salt"]
+    [scaled_up, scaled_down] = RecipeScaler().scale_recipes(
+        [{"id": "up", "servings": 4, "target_servings": 10, "ingredients": ingredients},
+         {"id": "down", "servings": 4, "target_servings": 2, "ingredients": ingredients}]
+    )
+    assert _displays(scaled_up) == ["8 eggs", "5-8 cloves garlic", "2 1/2 cans tomatoes", "2 1/2 sticks butter",
+                                    "3 onion", "2 1/2 pinches salt"]
+    assert _displays(scaled_down) == ["2 eggs", "1-2 cloves garlic", "1/2 can tomatoes", "1/2 stick butter",
+                                      "1/2 onion", "1/2 pinch salt"]
+
+
+def test_reads_servings_from_recipe_text_and_converts_units():
+    text = "Serves 2\n\nIngredients:\n- 1 lb chicken\n- 2 tbsp oil\n\nInstructions:\n1. Cook."
+    [result] = RecipeScaler().scale_recipes([{"recipe_text": text, "target_servings": 4}], unit_system="metric")
+    assert result["servings"] == 4 and result["scale"] == pytest.approx(2)
+    assert _displays(result) == ["907 g chicken", "59 ml oil"]
+
+
+def test_recipe_without_servings_is_not_scaled():
+    recipes = [{"id": "unknown", "ingredients": ["2 cups rice"]},
+               {"id": "known", "servings": 2, "ingredients": ["2 cups rice"]}]
+    unknown, known = RecipeScaler().scale_recipes(recipes, target_servings=4)
+    assert unknown["scaled"] is False and unknown["servings"] is None and unknown["scale"] == 1.0
+    assert "error" in unknown and _displays(unknown) == ["2 cups rice"]
+    assert known["scaled"] and known["servings"] == 4 and _displays(known) == ["4 cups rice"]
+
+
+def test_explicit_scale_needs_no_servings():
+    [result] = RecipeScaler().scale_recipes([{"scale": 0.5, "ingredients": ["1 tbsp sugar"]}])
+    assert result["scaled"] and result["servings"] is None
+    assert _displays(result) == ["1/2 tbsp sugar"]
+
+
+def test_unknown_unit_system_is_rejected():
+    with pytest.raises(ValueError):
+        RecipeScaler().scale_recipes([{"ingredients": ["1 cup milk"]}], unit_system="imperial")
+
+
+@pytest.mark.parametrize("amount, metric, expected", [
+    (1.5, False, "1 1/2"), (0.25, False, "1/4"), (2.0, False, "2"), (0.3, False, "0.3"), (12.5, True, "12.5"),
+])
+def test_format_amount(amount, metric, expected):
+    assert format_amount(amount, metric) == expected
@@ -0,0 +1,66 @@
+"""Tests for RecipeValidator rules and scores"""
+
+import pytest
+
+from recipe_parser import RecipeParser
+from recipe_validator import RecipeValidator
+
+
+def _validate(ingredients="- 1 cup flour\n- 2 eggs", instructions="1. Mix well.", servings="Serves 4\n\n"):
+    text = f"{servings}Ingredients:\n{ingredients}\n\nInstructions:\n{instructions}"
+    return RecipeValidator().validate(RecipeParser().parse(text))
+
+
+def _rules(result):
+    return [violation["rule"] for violation in result["violations"]]
+
+
+def test_clean_recipe_scores_one():
+    result = _validate(instructions="1. Preheat the oven to 350°F.\n2. Bake for 25 minutes.")
+    assert result == {"score": 1.0, "valid": True, "violations": []}
+
+
+@pytest.mark.parametrize("step, rules", [
+    ("Bake at 3500F for 20 minutes.", ["temperature_out_of_range"]),
+    ("Bake at 3500 °F for 20 minutes.", ["temperature_out_of_range"]),
+    ("Bake at 350F for 20 minutes.", []),
+    ("Bake at 180 C for 20 minutes.", []),
+    ("Roast at 200 celsius for 20 minutes.", []),
+    ("Preheat the oven to 120 degrees.", ["oven_temperature_too_low"]),
+    ("Add 2 c sugar and bake for 20 minutes.", []),
+    ("Simmer for 30 hours.", ["impossible_time"]),
+    ("Chill for 30 hours.", []),
+    ("Bake for 0 minutes.", ["zero_time"]),
+])
+def test_instruction_rules(step, rules):
+    assert _rules(_validate(instructions=step)) == rules
+
+
+def test_poultry_must_reach_a_safe_temperature():
+    result = _validate(ingredients="- 1 lb chicken", instructions="Roast until a thermometer registers 140°F.")
+    assert _rules(result) == ["unsafe_poultry_temperature"] and not result["valid"]
+
+
+@pytest.mark.parametrize("ingredients, rules", [
+    ("- 2 handfuls of spinach", ["unknown_unit"]),
+    ("- 1 knob butter", ["unknown_unit"]),
+    ("- 2 nubs of ginger", ["unknown_unit"]),
+    ("- 2 lengths of lemongrass\n- 4 leaves of basil", ["unknown_unit"]),
+    ("- 1 head of garlic\n- 1 bunch cilantro\n- 2 large eggs\n- 3 cloves garlic", []),
+    ("- 0 cups flour", ["impossible_amount"]),
+    ("- 20 lb potatoes", ["serving_size_out_of_range"]),
+])
+def test_ingredient_rules(ingredients, rules):
+    assert _rules(_validate(ingredients=ingredients)) == rules
+
+
+def test_batch_scores_and_acceptance():
+    parser, validator = RecipeParser(), RecipeValidator()
+    recipes = [parser.parse(text) for text in (
+        "Ingredients:\n- 1 cup rice\n\nInstructions:\n1. Simmer for 20 minutes.",
+        "Ingredients:\n- 1 handful rice\n\nInstructions:\n1. Bake at 5000°F for 0 minutes.",
+    )]
+    good, bad = validator.validate_batch(recipes)
+    assert validator.accepts(good) and good["score"] == 1.0
+    assert not validator.accepts(bad) and bad["score"] == 0.4
+    assert sorted(_rules(bad)) == ["temperature_out_of_range", "unknown_unit", "zero_time"]
@@ -0,0 +1,56 @@
+"""Tests for TechniqueMatcher stemming and technique detection"""
+
+import pytest
+
+from technique_matcher import TechniqueMatcher, fold_text, stem, stem_tokens
+
+TECHNIQUES = {
+    "baking": {"description": "Dry heat", "tips": ["Preheat"], "equipment": ["oven", "baking sheet"]},
+    "frying": {"description": "Hot oil", "tips": [], "equipment": ["pan"]},
+    "deep frying": {"description": "Submerged in oil", "tips": [], "equipment": ["pot", "thermometer"]},
+    "sautéing": {"description": "Quick, hot pan", "tips": [], "equipment": ["pan"], "aliases": ["pan fry"]},
+    "stir frying": {"description": "Wok", "tips": [], "equipment": ["wok"]},
+}
+
+
+@pytest.mark.parametrize("words, expected", [
+    (["bake", "baked", "baking"], "bak"),
+    (["fry", "fried", "frying"], "fry"),
+    (["chop", "chopped"], "chop"),
+    (["saute", "sauteed", "sauteing"], "saut"),
+    (["grill", "grilled"], "grill"),
+    (["dress", "dressed"], "dress"),
+])
+def test_inflections_share_a_stem(words, expected):
+    assert {stem(word) for word in words} == {expected}
+
+
+def test_stem_tokens_fold_accents_and_case():
+    assert fold_text("Sautéed") == "sauteed"
+    assert stem_tokens("Sautéed ONIONS, then Baked!") == ["saut", "onion", "then", "bak"]
+
+
+def test_match_finds_techniques_in_order_with_step_positions():
+    matcher = TechniqueMatcher(TECHNIQUES)
+    steps = ["Sauté the onions.", "Bake for 20 minutes.", "Meanwhile, deep-fry the potatoes.",
+             "Pan-fry the fish, then bake it again."]
+    assert matcher.match(steps) == [
+        {"name": "sautéing", "positions": [0, 3]},
+        {"name": "baking", "positions": [1, 3]},
+        {"name": "deep frying", "positions": [2]},
+    ]
+
+
+def test_longest_phrase_wins_over_its_last_word():
+    matcher = TechniqueMatcher(TECHNIQUES)
+    assert matcher.match_step("Stir-fry the vegetables, then fry the egg") == ["stir frying", "frying"]
+    assert matcher.match_step("Stir the sauce") == []
+
+
+def test_analyze_describes_techniques_and_dedupes_equipment():
+    techniques, equipment = TechniqueMatcher(TECHNIQUES).analyze(["Fry the onions.", "Saute the garlic.",
+                                                                  "Bake the pie."])
+    assert [technique["name"] for technique in techniques] == ["frying", "sautéing", "baking"]
+    assert techniques[2] == {"name": "baking", "description": "Dry heat", "tips": ["Preheat"],
+                             "equipment": ["oven", "baking sheet"], "positions": [2]}
+    assert equipment == ["pan", "oven", "baking sheet"]
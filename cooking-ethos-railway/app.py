@@ -13,6 +13,8 @@ from typing import Dict, List, Optional, Any
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+from pantry_index import PantryIndex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -167,6 +169,33 @@ INGREDIENT_DATABASE = {
     }
 }
 
+# Recipe database for pantry queries ("what can I make with ...")
+RECIPE_DATABASE = [
+    {"name": "Pancakes", "ingredients": ["flour", "eggs", "milk", "butter", "sugar", "baking powder", "salt"]},
+    {"name": "French Toast", "ingredients": ["bread", "eggs", "milk", "butter", "cinnamon", "sugar"]},
+    {"name": "Custard", "ingredients": ["eggs", "milk", "sugar", "vanilla"]},
+    {"name": "Flan", "ingredients": ["eggs", "milk", "sugar", "vanilla"]},
+    {"name": "Vanilla Ice Cream", "ingredients": ["milk", "cream", "eggs", "sugar", "vanilla"]},
+    {"name": "Butter Cake", "ingredients": ["flour", "butter", "sugar", "eggs", "milk", "baking powder"]},
+    {"name": "Sugar Cookies", "ingredients": ["flour", "butter", "sugar", "eggs", "vanilla", "salt"]},
+    {"name": "Bread Pudding", "ingredients": ["bread", "eggs", "milk", "sugar", "butter", "cinnamon"]},
+    {"name": "Scrambled Eggs", "ingredients": ["eggs", "butter", "milk", "salt"]},
+    {"name": "Garlic Butter Chicken", "ingredients": ["chicken", "butter", "garlic", "salt"]},
+    {"name": "Roast Chicken", "ingredients": ["chicken", "onion", "garlic", "butter", "salt"]},
+    {"name": "Chicken Tomato Stew", "ingredients": ["chicken", "tomato", "onion", "garlic", "salt"]},
+    {"name": "Tomato Sauce", "ingredients": ["tomato", "onion", "garlic", "salt", "sugar"]},
+    {"name": "Tomato Soup", "ingredients": ["tomato", "onion", "garlic", "butter", "milk", "salt"]},
+    {"name": "Spaghetti Bolognese", "ingredients": ["ground beef", "tomato", "onion", "garlic", "pasta", "salt"]},
+    {"name": "Hamburgers", "ingredients": ["ground beef", "onion", "salt", "bread"]},
+    {"name": "Meatballs", "ingredients": ["ground beef", "bread", "eggs", "garlic", "onion", "salt"]},
+    {"name": "Tacos", "ingredients": ["ground beef", "tortillas", "tomato", "onion", "cheese"]},
+    {"name": "Caramelized Onions", "ingredients": ["onion", "butter", "salt", "sugar"]},
+    {"name": "Garlic Bread", "ingredients": ["bread", "butter", "garlic", "salt"]}
+]
+
+# Ingredient -> recipe bitsets over RECIPE_DATABASE
+PANTRY_INDEX = PantryIndex(RECIPE_DATABASE)
+
 # Cooking tips database
 COOKING_TIPS = {
     "general": [
@@ -347,11 +376,12 @@ def generate_cooking_response(message: str, source: str = "cooking_with") -> Dic
         common_ingredients = list(INGREDIENT_DATABASE.keys())
         found_ingredients = []
         for ing in common_ingredients:
-            if ing in message_lower:
+            if ing.replace("_", " ") in message_lower:
                 found_ingredients.append(ing)
+        pantry = PANTRY_INDEX.ingredients_in(message_lower)
         
-        if found_ingredients:
-            if len(found_ingredients) == 1:
+        if found_ingredients or pantry:
+            if len(found_ingredients) == 1 and len(pantry) <= 1:
                 # Single ingredient
                 ingredient_info = INGREDIENT_DATABASE[found_ingredients[0]]
                 response = f"With {ingredient_info['name']}, you can: {', '.join(ingredient_info['cooking_methods'])}. {ingredient_info['tips'][0]}"
@@ -361,10 +391,19 @@ def generate_cooking_response(message: str, source: str = "cooking_with") -> Dic
                     f"Storage tips for {ingredient_info['name']}"
                 ]
             else:
-                # Multiple ingredients - suggest recipes
-                ingredient_names = [INGREDIENT_DATABASE[ing]['name'] for ing in found_ingredients]
-                response = f"Great combination! With {', '.join(ingredient_names)}, you can make: pancakes, French toast, custard, ice cream, cake, cookies, bread pudding, or flan. These ingredients are perfect for baking and desserts!"
-                suggestions = ["Pancake recipes", "French toast ideas", "Custard recipes", "Baking tips"]
+                # Multiple ingredients - suggest the recipes they cover best
+                matches = PANTRY_INDEX.find(pantry, max_missing=2, limit=5)
+                if matches:
+                    dishes = [
+                        f"{match['recipe']['name']} (you'll also need {', '.join(match['missing'])})" if match["missing"]
+                        else f"{match['recipe']['name']} (you have everything)"
+                        for match in matches
+                    ]
+                    response = f"Great combination! With {', '.join(pantry)}, you can make: {'; '.join(dishes)}."
+                    suggestions = [f"{match['recipe']['name']} recipe" for match in matches[:3]] + ["Ingredient substitutions"]
+                else:
+                    response = f"I don't have a recipe that uses {', '.join(pantry)} with only a few extra ingredients. Try adding a staple like eggs, butter or onion!"
+                    suggestions = ["Recipe search", "Ingredient substitutions", "Pantry staples"]
         else:
             response = "I can help you find recipes and cooking ideas! What specific ingredients are you working with?"
             suggestions = ["Recipe search", "Ingredient substitutions", "Cooking techniques"]